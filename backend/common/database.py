@@ -0,0 +1,111 @@
+import logging
+import os
+import time
+from collections import deque
+from typing import Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+def _env(prefix: str, name: str, default: str) -> str:
+    # 서비스별 설정(예: WORKOUT_DB_POOL_SIZE)이 있으면 우선, 없으면 공통 DB_* 값
+    return os.getenv(f"{prefix}{name}", os.getenv(f"DB_{name}", default))
+
+def _env_bool(prefix: str, name: str, default: str) -> bool:
+    return _env(prefix, name, default).lower() in ("1", "true", "yes")
+
+class PoolStats:
+    """Checkout wait times for one engine's pool, recorded by its instrumented pool class."""
+
+    def __init__(self, size: int = 1000):
+        self._waits = deque(maxlen=size)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float):
+        self.checkouts += 1
+        self._waits.append(seconds)
+        self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self) -> dict:
+        waits = sorted(self._waits)
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(sum(waits) / len(waits) * 1000, 3) if waits else 0.0,
+            "p95_wait_ms": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 3) if waits else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+def _instrumented_pool_class(stats: PoolStats):
+    # 풀이 recreate()돼도 같은 클래스로 만들어지므로 통계가 이어진다
+    class InstrumentedPool(AsyncAdaptedQueuePool):
+        def _do_get(self):
+            started = time.monotonic()
+            try:
+                connection = super()._do_get()
+            except PoolTimeoutError:
+                stats.timeouts += 1
+                raise
+            stats.record(time.monotonic() - started)
+            return connection
+
+    return InstrumentedPool
+
+def create_engine_from_env(url: str, prefix: str = "DB_") -> AsyncEngine:
+    """Build an async engine tuned from the environment.
+
+    Pool settings are read from ``{prefix}POOL_SIZE`` etc., falling back to
+    the shared ``DB_*`` variables. SQLite URLs (tests, local runs) keep
+    SQLAlchemy's default pool since they don't accept queue-pool options.
+    """
+    url = make_url(url)
+    echo = _env_bool(prefix, "ECHO", "false")
+    if echo and os.getenv("APP_ENV", "").lower() == "production":
+        logger.warning("DB echo requested in production; ignoring")
+        echo = False
+    options = {"echo": echo}
+
+    if url.get_backend_name() != "sqlite":
+        stats = PoolStats()
+        options.update(
+            poolclass=_instrumented_pool_class(stats),
+            pool_size=int(_env(prefix, "POOL_SIZE", "5")),
+            max_overflow=int(_env(prefix, "MAX_OVERFLOW", "10")),
+            pool_timeout=float(_env(prefix, "POOL_TIMEOUT", "30")),
+            pool_recycle=int(_env(prefix, "POOL_RECYCLE", "1800")),
+            pool_pre_ping=_env_bool(prefix, "POOL_PRE_PING", "true"),
+        )
+    else:
+        stats = None
+
+    if url.get_driver_name() == "asyncpg":
+        # PgBouncer(transaction 모드) 뒤에서는 0으로 설정해야 한다
+        cache_size = int(_env(prefix, "STATEMENT_CACHE_SIZE", "100"))
+        url = url.update_query_dict({"prepared_statement_cache_size": str(cache_size)})
+        options["connect_args"] = {"statement_cache_size": cache_size}
+
+    engine = create_async_engine(url, **options)
+    engine.sync_engine.pool_stats = stats
+    return engine
+
+def pool_status(engine: AsyncEngine) -> dict:
+    """Live pool occupancy plus checkout wait statistics for ``engine``."""
+    pool = engine.sync_engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(0, pool.overflow()),
+        )
+    stats: Optional[PoolStats] = getattr(engine.sync_engine, "pool_stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
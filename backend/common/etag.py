@@ -0,0 +1,38 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# 사용자별 응답이므로 공유 캐시에는 저장하지 않고, 매번 ETag로 재검증하도록
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts) -> str:
+    """Strong ETag for a response identified by ``parts`` (version stamps + request parameters).
+
+    Only the stamp is hashed, never the body, so it can be computed before
+    running the query that would produce the body.
+    """
+    digest = hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+def matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match는 약한 비교 (W/ 접두어 무시)
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+def conditional(request: Request, response: Response, *parts) -> Optional[Response]:
+    """Tag ``response`` with the ETag for ``parts``; return a ``304`` if the client already has it.
+
+    Endpoints return the ``304`` as-is and otherwise carry on building the
+    body, which goes out with the ETag set here.
+    """
+    etag = make_etag(*parts)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,219 @@
+import importlib.util
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+import httpx
+from cachetools import LRUCache
+
+from backend.common.resilience import (
+    DEADLINE_HEADER,
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceededError,
+    HedgeStats,
+    LatencyTracker,
+    hedged,
+    remaining_budget,
+)
+
+logger = logging.getLogger(__name__)
+
+def _parse_host_timeouts(raw: Optional[str]) -> Dict[str, float]:
+    """Parse ``"localhost:8000=5,127.0.0.1:8001=2.5"`` into ``{host: seconds}``."""
+    host_timeouts = {}
+    for item in (raw or "").split(","):
+        if "=" not in item:
+            continue
+        host, seconds = item.rsplit("=", 1)
+        host_timeouts[host.strip()] = float(seconds)
+    return host_timeouts
+
+class ServiceHTTPClient:
+    """One pooled ``httpx.AsyncClient`` per service for inter-service calls.
+
+    The client is opened in the FastAPI lifespan and shared by every call
+    site, so loopback requests reuse warm keep-alive connections instead of
+    paying a TCP handshake each time.
+
+    Every request is also bounded by the caller's deadline (and forwards the
+    remaining budget in ``X-Request-Deadline-Ms``), goes through a circuit
+    breaker keyed by ``endpoint``, and can opt in to hedging with
+    ``hedge=True``. Only use hedging for idempotent reads.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 10.0,
+        connect_timeout: float = 2.0,
+        host_timeouts: Optional[Dict[str, float]] = None,
+        http2: bool = False,
+        breaker_failure_rate: float = 0.5,
+        breaker_min_requests: int = 20,
+        breaker_window: float = 30.0,
+        breaker_open_seconds: float = 15.0,
+        hedging_enabled: bool = True,
+        hedge_min_delay: float = 0.05,
+        hedge_default_delay: float = 0.2,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.connect_timeout = connect_timeout
+        self.host_timeouts = host_timeouts or {}
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; falling back to HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self.breaker_options = {
+            "failure_rate": breaker_failure_rate,
+            "min_requests": breaker_min_requests,
+            "window_seconds": breaker_window,
+            "open_seconds": breaker_open_seconds,
+        }
+        self.hedging_enabled = hedging_enabled
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_default_delay = hedge_default_delay
+        # endpoint 이름별 상태 (이름을 넘기지 않은 호출이 많아도 메모리가 무한히 늘지 않도록 LRU)
+        self._breakers = LRUCache(maxsize=256)
+        self._latencies = LRUCache(maxsize=256)
+        self.hedge_stats = HedgeStats()
+        self.deadline_rejections = 0
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+            timeout=float(os.getenv("HTTP_TIMEOUT", "10")),
+            connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "2")),
+            host_timeouts=_parse_host_timeouts(os.getenv("HTTP_HOST_TIMEOUTS")),
+            http2=os.getenv("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes"),
+            breaker_failure_rate=float(os.getenv("HTTP_BREAKER_FAILURE_RATE", "0.5")),
+            breaker_min_requests=int(os.getenv("HTTP_BREAKER_MIN_REQUESTS", "20")),
+            breaker_window=float(os.getenv("HTTP_BREAKER_WINDOW", "30")),
+            breaker_open_seconds=float(os.getenv("HTTP_BREAKER_OPEN_SECONDS", "15")),
+            hedging_enabled=os.getenv("HTTP_HEDGING_ENABLED", "true").lower() in ("1", "true", "yes"),
+            hedge_min_delay=float(os.getenv("HTTP_HEDGE_MIN_DELAY", "0.05")),
+            hedge_default_delay=float(os.getenv("HTTP_HEDGE_DEFAULT_DELAY", "0.2")),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # lifespan 밖(스크립트, 테스트)에서 호출되는 경우를 위해 필요할 때 생성
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, http2=self.http2)
+        return self._client
+
+    async def start(self):
+        _ = self.client
+        logger.info(f"HTTP client started (limits={self.limits}, http2={self.http2})")
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    def timeout_for(self, url) -> httpx.Timeout:
+        url = httpx.URL(url)
+        host = f"{url.host}:{url.port}" if url.port else url.host
+        seconds = self.host_timeouts.get(host, self.host_timeouts.get(url.host))
+        if seconds is None:
+            return self.timeout
+        return httpx.Timeout(seconds, connect=min(seconds, self.connect_timeout))
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(**self.breaker_options)
+        return breaker
+
+    def _latency(self, endpoint: str) -> LatencyTracker:
+        tracker = self._latencies.get(endpoint)
+        if tracker is None:
+            tracker = self._latencies[endpoint] = LatencyTracker()
+        return tracker
+
+    def hedge_delay(self, endpoint: str) -> float:
+        tracker = self._latency(endpoint)
+        # 표본이 적을 때는 p95가 의미 없으므로 기본값 사용
+        p95 = tracker.percentile(0.95) if len(tracker) >= 20 else None
+        return max(self.hedge_min_delay, p95 if p95 is not None else self.hedge_default_delay)
+
+    async def request(self, method: str, url: str, endpoint: Optional[str] = None, hedge: bool = False, **kwargs) -> httpx.Response:
+        if endpoint is None:
+            parsed = httpx.URL(url)
+            endpoint = f"{method.upper()} {parsed.host}{parsed.path}"
+
+        timeout = kwargs.pop("timeout", None) or self.timeout_for(url)
+        budget = timeout.read
+        remaining = remaining_budget()
+        if remaining is not None:
+            if remaining <= 0:
+                self.deadline_rejections += 1
+                raise DeadlineExceededError(endpoint)
+            budget = min(budget, remaining) if budget is not None else remaining
+            timeout = httpx.Timeout(
+                min(timeout.read or remaining, remaining),
+                connect=min(timeout.connect or remaining, remaining),
+            )
+        headers = dict(kwargs.pop("headers", None) or {})
+        if budget is not None:
+            headers[DEADLINE_HEADER] = str(int(budget * 1000))
+
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            raise CircuitOpenError(endpoint, breaker.retry_after())
+
+        send_method = getattr(self.client, method.lower())
+        tracker = self._latency(endpoint)
+
+        async def send() -> httpx.Response:
+            started = time.monotonic()
+            response = await send_method(url, headers=headers, timeout=timeout, **kwargs)
+            tracker.record(time.monotonic() - started)
+            return response
+
+        try:
+            if hedge and self.hedging_enabled and breaker.state == "closed":
+                response = await hedged(send, self.hedge_delay(endpoint), self.hedge_stats)
+            else:
+                response = await send()
+        except httpx.TransportError:
+            breaker.record(False)
+            raise
+        except BaseException:
+            # 취소 등 호출 대상의 상태와 무관한 예외는 결과로 세지 않고 half-open 프로브 슬롯만 돌려준다
+            breaker.release()
+            raise
+        breaker.record(response.status_code < 500)
+        return response
+
+    def metrics(self) -> dict:
+        return {
+            "breakers": {endpoint: breaker.snapshot() for endpoint, breaker in self._breakers.items()},
+            "latency_p95": {endpoint: tracker.percentile(0.95) for endpoint, tracker in self._latencies.items()},
+            "hedges": self.hedge_stats.snapshot(),
+            "deadline_rejections": self.deadline_rejections,
+        }
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
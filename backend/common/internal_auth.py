@@ -0,0 +1,20 @@
+import hmac
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+# 서비스 간 내부 호출(/internal/*)에 사용하는 공유 비밀 헤더
+INTERNAL_TOKEN_HEADER = "X-Internal-Token"
+
+def get_internal_token() -> Optional[str]:
+    return os.getenv("INTERNAL_SERVICE_TOKEN")
+
+def internal_headers() -> dict:
+    token = get_internal_token()
+    return {INTERNAL_TOKEN_HEADER: token} if token else {}
+
+async def verify_internal_token(x_internal_token: Optional[str] = Header(None)):
+    expected = get_internal_token()
+    if not expected or not x_internal_token or not hmac.compare_digest(expected, x_internal_token):
+        raise HTTPException(status_code=403, detail="Internal endpoint")
@@ -0,0 +1,39 @@
+import os
+from typing import Optional
+
+from cachetools import TTLCache
+
+class RecentWrites:
+    """Users who wrote in the last ``window`` seconds, whose reads must stay on the primary.
+
+    Replica lag is usually well under a second; pinning a user's reads for a
+    short window after their own writes hides it from them without sending
+    everyone else's reads to the primary. The marker is per process, so it
+    covers the common case of a client hitting the same worker right after
+    a write.
+    """
+
+    def __init__(self, window: float = 5, maxsize: int = 100000):
+        self._marks = TTLCache(maxsize=maxsize, ttl=window)
+        self.pinned_reads = 0
+        self.replica_reads = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(window=float(os.getenv("READ_YOUR_WRITES_WINDOW", "5")))
+
+    def mark(self, *uids: Optional[str]):
+        for uid in uids:
+            if uid:
+                self._marks[uid] = True
+
+    def is_pinned(self, uid: str) -> bool:
+        pinned = uid in self._marks
+        if pinned:
+            self.pinned_reads += 1
+        else:
+            self.replica_reads += 1
+        return pinned
+
+    def stats(self) -> dict:
+        return {"pinned_reads": self.pinned_reads, "replica_reads": self.replica_reads, "marked_users": len(self._marks)}
@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+
+logger = logging.getLogger(__name__)
+
+# 호출자에게 남은 시간 예산(ms). 받은 서비스는 이 안에서 처리하고 하위 호출에도 남은 예산을 전달한다
+DEADLINE_HEADER = "X-Request-Deadline-Ms"
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+class ServiceUnavailableError(HTTPException):
+    """A downstream call was refused locally (open breaker or exhausted deadline) without touching the network."""
+
+    def __init__(self, endpoint: str, status_code: int = 503, reason: str = "Service temporarily unavailable", headers: Optional[dict] = None):
+        super().__init__(status_code=status_code, detail=f"{reason}: {endpoint}", headers=headers)
+        self.endpoint = endpoint
+
+class CircuitOpenError(ServiceUnavailableError):
+    def __init__(self, endpoint: str, retry_after: int = 1):
+        # 차단기가 다시 프로브를 허용할 때까지 남은 초
+        super().__init__(endpoint, 503, "Circuit open", headers={"Retry-After": str(retry_after)})
+
+class DeadlineExceededError(ServiceUnavailableError):
+    def __init__(self, endpoint: str):
+        super().__init__(endpoint, 504, "Deadline exceeded")
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left before the current request's deadline, or ``None`` when the caller set none."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+def set_deadline(seconds: float):
+    return _deadline.set(time.monotonic() + seconds)
+
+class DeadlineMiddleware:
+    """Run each request under the caller's ``X-Request-Deadline-Ms`` budget.
+
+    Downstream calls are capped to what is left of the budget, and a handler
+    that has not started its response when the budget runs out is cancelled
+    and answered with ``504``. A streamed body already under way is not cut off.
+
+    Plain ASGI rather than ``@app.middleware("http")``: the latter waits for
+    the handler to finish even after the middleware has returned a response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        raw = Headers(scope=scope).get(DEADLINE_HEADER)
+        try:
+            budget = float(raw) / 1000 if raw is not None else None
+        except ValueError:
+            budget = None
+        if budget is None:
+            return await self.app(scope, receive, send)
+        if budget <= 0:
+            # 호출자가 이미 포기한 요청은 처리하지 않는다
+            return await _deadline_exceeded(scope, receive, send)
+
+        started = asyncio.Event()
+
+        async def send_and_mark(message):
+            if message["type"] == "http.response.start":
+                started.set()
+            await send(message)
+
+        token = set_deadline(budget)
+        try:
+            handler = asyncio.ensure_future(self.app(scope, receive, send_and_mark))
+        finally:
+            _deadline.reset(token)
+        response_started = asyncio.ensure_future(started.wait())
+        try:
+            await asyncio.wait({handler, response_started}, timeout=budget, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            response_started.cancel()
+        if not handler.done() and not started.is_set():
+            handler.cancel()
+            try:
+                await handler
+            except asyncio.CancelledError:
+                pass
+            logger.warning(f"Request exceeded its deadline of {budget * 1000:.0f}ms: {scope['method']} {scope['path']}")
+            return await _deadline_exceeded(scope, receive, send)
+        await handler
+
+async def _deadline_exceeded(scope, receive, send):
+    await JSONResponse(status_code=504, content={"detail": "Deadline exceeded"})(scope, receive, send)
+
+def install_deadline_middleware(app: FastAPI):
+    app.add_middleware(DeadlineMiddleware)
+
+class CircuitBreaker:
+    """Rolling-window error-rate breaker for one downstream endpoint.
+
+    Opens when at least ``min_requests`` calls in the last ``window_seconds``
+    failed at ``failure_rate`` or more, rejects calls for ``open_seconds``,
+    then lets a single probe through (half-open) to decide whether to close.
+    """
+
+    def __init__(self, failure_rate: float = 0.5, min_requests: int = 20, window_seconds: float = 30, open_seconds: float = 15):
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.state = "closed"
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._outcomes = deque()
+        self._probe_in_flight = False
+
+    def _trim(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.state == "open":
+            if now - self.opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self.state = "half_open"
+            self._probe_in_flight = False
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                self.rejected += 1
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record(self, ok: bool):
+        now = time.monotonic()
+        if self.state == "half_open":
+            self._probe_in_flight = False
+            if ok:
+                self.state = "closed"
+                self._outcomes.clear()
+            else:
+                self._open(now)
+            return
+        self._outcomes.append((now, ok))
+        self._trim(now)
+        failures = sum(1 for _, outcome in self._outcomes if not outcome)
+        if len(self._outcomes) >= self.min_requests and failures / len(self._outcomes) >= self.failure_rate:
+            self._open(now)
+
+    def release(self):
+        self._probe_in_flight = False
+
+    def retry_after(self) -> int:
+        """Whole seconds until a rejected caller may try again (the half-open probe window)."""
+        if self.state != "open":
+            return 1
+        return max(1, math.ceil(self.open_seconds - (time.monotonic() - self.opened_at)))
+
+    def _open(self, now: float):
+        if self.state != "open":
+            self.times_opened += 1
+            logger.warning(f"Circuit breaker opened ({self.times_opened} times so far)")
+        self.state = "open"
+        self.opened_at = now
+        self._outcomes.clear()
+
+    def snapshot(self) -> dict:
+        self._trim(time.monotonic())
+        return {
+            "state": self.state,
+            "window_requests": len(self._outcomes),
+            "window_failures": sum(1 for _, outcome in self._outcomes if not outcome),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+class LatencyTracker:
+    """Recent latencies of one endpoint, used to pick the hedging delay."""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def __len__(self):
+        return len(self._samples)
+
+class HedgeStats:
+    def __init__(self):
+        self.requests = 0
+        self.sent = 0
+        self.won = 0
+
+    def snapshot(self) -> dict:
+        return {"requests": self.requests, "sent": self.sent, "won": self.won}
+
+async def hedged(send: Callable[[], Awaitable], delay: float, stats: HedgeStats):
+    """Run ``send``; if it hasn't finished after ``delay`` seconds, race a second copy and keep the first success."""
+    stats.requests += 1
+    first = asyncio.ensure_future(send())
+    tasks = [first]
+    try:
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+
+        stats.sent += 1
+        second = asyncio.ensure_future(send())
+        tasks.append(second)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is second:
+                        stats.won += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        # 진 쪽(또는 호출자가 취소된 경우 둘 다)은 정리
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,37 @@
+from sqlalchemy import DateTime
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+
+# ON CONFLICT 구문을 지원하는 dialect별 insert (운영은 PostgreSQL, 테스트는 SQLite)
+_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+def dialect_insert(db, table):
+    """Return an ``INSERT`` for ``table`` that supports ``on_conflict_do_*`` on ``db``'s dialect."""
+    dialect_name = db.get_bind().dialect.name
+    try:
+        return _INSERTS[dialect_name](table)
+    except KeyError:
+        raise NotImplementedError(f"Upserts are not supported on dialect {dialect_name!r}")
+
+class clock_timestamp(GenericFunction):
+    """Current wall-clock time, for ``updated_at`` columns that back a ``max(updated_at)`` version stamp.
+
+    PostgreSQL's ``now()`` is fixed at transaction start, so a transaction that
+    commits late could stamp its rows older than ones already committed - and
+    older than a stamp a client has already cached. ``clock_timestamp()`` is
+    read when the statement runs, leaving only the statement-to-commit gap.
+    """
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+@compiles(clock_timestamp)
+def _compile_clock_timestamp(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+@compiles(clock_timestamp, "postgresql")
+def _compile_clock_timestamp_postgresql(element, compiler, **kw):
+    return "clock_timestamp()"
@@ -2,6 +2,7 @@ import httpx
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
 import logging
+from . import utils
 
 logger = logging.getLogger(__name__)
 
@@ -14,26 +15,25 @@ async def get_weekly_session_counts(user_id: str, end_date: datetime, token: str
     start_date = get_monday(end_date - timedelta(weeks=3))
     logger.info(f"Fetching session counts for user {user_id} from {start_date} to {end_date}")
     
-    async with httpx.AsyncClient() as client:
-        try:
-            headers = {"Authorization": token}
-            url = f"{WORKOUT_SERVICE_URL}/api/session_counts/{user_id}"
-            params = {"start_date": start_date.isoformat(), "end_date": end_date.isoformat()}
-            logger.info(f"Sending request to: {url} with params: {params}")
-            
-            response = await client.get(url, params=params, headers=headers)
-            response.raise_for_status()
-            session_counts = response.json()
-            logger.info(f"Received session counts: {session_counts}")
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error occurred: {e.response.status_code} {e.response.text}")
-            raise
-        except httpx.RequestError as e:
-            logger.error(f"Request error occurred: {str(e)}")
-            raise
-        except Exception as e:
-            logger.error(f"Unexpected error occurred: {str(e)}")
-            raise
+    try:
+        headers = {"Authorization": token}
+        url = f"{WORKOUT_SERVICE_URL}/api/session_counts/{user_id}"
+        params = {"start_date": start_date.isoformat(), "end_date": end_date.isoformat()}
+        logger.info(f"Sending request to: {url} with params: {params}")
+        
+        response = await utils.http_client.get(url, params=params, headers=headers, endpoint="session_counts", hedge=True)
+        response.raise_for_status()
+        session_counts = response.json()
+        logger.info(f"Received session counts: {session_counts}")
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTP error occurred: {e.response.status_code} {e.response.text}")
+        raise
+    except httpx.RequestError as e:
+        logger.error(f"Request error occurred: {str(e)}")
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error occurred: {str(e)}")
+        raise
 
     total_sessions = sum(session_counts.values())
     
@@ -46,12 +46,13 @@ async def get_weekly_session_counts(user_id: str, end_date: datetime, token: str
     return weekly_counts
 
 async def get_last_session_update(user_id: str) -> datetime:
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{WORKOUT_SERVICE_URL}/api/last-session-update/{user_id}")
-            response.raise_for_status()
-            last_updated = datetime.fromisoformat(response.json()["last_updated"])
-            return last_updated
-        except Exception as e:
-            logger.error(f"Error fetching last session update: {str(e)}")
-            raise
\ No newline at end of file
+    try:
+        response = await utils.http_client.get(
+            f"{WORKOUT_SERVICE_URL}/api/last-session-update/{user_id}", endpoint="last_session_update", hedge=True
+        )
+        response.raise_for_status()
+        last_updated = datetime.fromisoformat(response.json()["last_updated"])
+        return last_updated
+    except Exception as e:
+        logger.error(f"Error fetching last session update: {str(e)}")
+        raise
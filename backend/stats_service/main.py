@@ -2,16 +2,25 @@
 
 from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 import httpx
 from datetime import datetime, timedelta
 import logging
 from . import schemas, crud, utils
+from backend.common.internal_auth import verify_internal_token
+from backend.common.resilience import install_deadline_middleware
 from typing import Dict, Optional, List
 
 
-app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await utils.http_client.start()
+    yield
+    await utils.http_client.aclose()
+
+app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None, lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -22,6 +31,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 호출자가 보낸 deadline을 요청 컨텍스트에 설정 (하위 호출 타임아웃에 반영)
+install_deadline_middleware(app)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -74,6 +86,8 @@ async def get_last_updated(authorization: str = Header(None)):
         last_updated = await crud.get_last_session_update(current_user['id'])
         
         return {"last_updated": last_updated}
+    except HTTPException as he:
+        raise he
     except Exception as e:
         logger.error(f"Unexpected error occurred: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
@@ -107,6 +121,12 @@ async def get_weekly_progress(authorization: str = Header(None)):
             counts=[count["sessions"] for count in weekly_counts],
             goal=workout_goal
         )
+    except HTTPException as he:
+        raise he
     except Exception as e:
         logger.error(f"Unexpected error occurred: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+
+@app.get("/internal/metrics", include_in_schema=False, dependencies=[Depends(verify_internal_token)])
+async def get_internal_metrics():
+    return {"http_client": utils.http_client.metrics()}
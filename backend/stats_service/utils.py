@@ -7,11 +7,15 @@ import jwt
 from jwt.exceptions import PyJWTError, ExpiredSignatureError, InvalidTokenError
 import os
 import httpx
+from backend.common.http_client import ServiceHTTPClient
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 USER_SERVICE_URL = "http://localhost:8000"
 
+# Shared connection pool for calls to the other services (opened in main.py lifespan)
+http_client = ServiceHTTPClient.from_env()
+
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
@@ -67,17 +71,18 @@ async def get_current_user(token: str = None):
     
     
 async def get_member_me(token: str):
-    async with httpx.AsyncClient() as client:
-        headers = {"Authorization": token}
-        try:
-            response = await client.get(f"{USER_SERVICE_URL}/api/members/me/", headers=headers)
-            response.raise_for_status()
-            user_data = response.json()
-            logger.info(f"Received user data: {user_data}")
-            return user_data
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error occurred while fetching member data: {e.response.status_code} - {e.response.text}")
-            raise HTTPException(status_code=e.response.status_code, detail=f"Error fetching member data: {e.response.text}")
-        except Exception as e:
-            logger.error(f"Unexpected error occurred while fetching member data: {str(e)}")
-            raise HTTPException(status_code=500, detail="Unexpected error occurred")
\ No newline at end of file
+    headers = {"Authorization": token}
+    try:
+        response = await http_client.get(f"{USER_SERVICE_URL}/api/members/me/", headers=headers, hedge=True)
+        response.raise_for_status()
+        user_data = response.json()
+        logger.info(f"Received user data: {user_data}")
+        return user_data
+    except HTTPException:
+        raise
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTP error occurred while fetching member data: {e.response.status_code} - {e.response.text}")
+        raise HTTPException(status_code=e.response.status_code, detail=f"Error fetching member data: {e.response.text}")
+    except Exception as e:
+        logger.error(f"Unexpected error occurred while fetching member data: {str(e)}")
+        raise HTTPException(status_code=500, detail="Unexpected error occurred")
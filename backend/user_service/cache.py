@@ -0,0 +1,141 @@
+from cachetools import TTLCache, TLRUCache
+from sqlalchemy import inspect
+from typing import Awaitable, Callable, Dict, Optional, Union
+import asyncio
+import hashlib
+import logging
+import os
+import time
+
+from . import models
+from backend.common.read_your_writes import RecentWrites
+
+logger = logging.getLogger(__name__)
+
+class PrincipalCache:
+    """uid-keyed cache of the authenticated user's profile row.
+
+    Holds a plain copy of the row's column values (not the ORM instance, which
+    is bound to the request's session) and rebuilds a detached model on each
+    hit, so requests never share mutable state. ``fcm_tokens`` and
+    ``last_active`` change on their own schedule and are not needed to
+    authorize or render a profile, so they are left out. Write paths must
+    reload the row from their own session before modifying it.
+    """
+
+    EXCLUDED_COLUMNS = {"fcm_tokens", "last_active"}
+    MODELS = {"member": models.Member, "trainer": models.Trainer}
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            maxsize=int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000")),
+            ttl=float(os.getenv("PRINCIPAL_CACHE_TTL", "60")),
+        )
+
+    def get(self, uid: str, user_type: str) -> Optional[Union[models.Member, models.Trainer]]:
+        values = self._cache.get((uid, user_type))
+        if values is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.MODELS[user_type](**values)
+
+    def set(self, user: Union[models.Member, models.Trainer], user_type: str):
+        values = {
+            attr.key: getattr(user, attr.key)
+            for attr in inspect(user).mapper.column_attrs
+            if attr.key not in self.EXCLUDED_COLUMNS
+        }
+        self._cache[(user.uid, user_type)] = values
+
+    def invalidate(self, uid: str):
+        for user_type in self.MODELS:
+            self._cache.pop((uid, user_type), None)
+        logger.debug(f"Invalidated cached principal for uid={uid}")
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._cache)}
+
+principal_cache = PrincipalCache.from_env()
+
+class TokenCache:
+    """Verified Firebase ID token claims, keyed by a short SHA-256 digest of the token.
+
+    Entries live until the earlier of the token's ``exp`` and ``ttl`` seconds
+    after verification. The key space is split across ``shards`` independent
+    caches so eviction and expiry bookkeeping stay small per shard, and
+    concurrent verifications of the same token share one in-flight call.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 300, shards: int = 16):
+        self.ttl = ttl
+        per_shard = max(1, maxsize // shards)
+        self._shards = [
+            TLRUCache(maxsize=per_shard, ttu=self._expires_at, timer=time.time)
+            for _ in range(shards)
+        ]
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "10000")),
+            ttl=float(os.getenv("TOKEN_CACHE_TTL", "300")),
+            shards=int(os.getenv("TOKEN_CACHE_SHARDS", "16")),
+        )
+
+    def _expires_at(self, _key, claims: dict, now: float) -> float:
+        return min(now + self.ttl, claims.get("exp", now + self.ttl))
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+    def _shard(self, key: str) -> TLRUCache:
+        return self._shards[int(key[:8], 16) % len(self._shards)]
+
+    async def get_or_verify(self, token: str, verify: Callable[[str], Awaitable[dict]]) -> dict:
+        key = self.key(token)
+        shard = self._shard(key)
+        claims = shard.get(key)
+        if claims is not None:
+            self.hits += 1
+            return claims
+
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._verify_and_store(key, shard, token, verify))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # 한 호출자가 취소돼도 같은 토큰을 기다리는 다른 요청의 검증은 계속되도록 shield
+        return await asyncio.shield(task)
+
+    async def _verify_and_store(self, key: str, shard: TLRUCache, token: str, verify) -> dict:
+        claims = await verify(token)
+        shard[key] = claims
+        return claims
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": sum(len(shard) for shard in self._shards),
+        }
+
+token_cache = TokenCache.from_env()
+
+# 최근 쓰기를 한 사용자의 읽기는 잠시 primary로 고정 (복제 지연 은폐)
+recent_writes = RecentWrites.from_env()
@@ -1,13 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, or_, and_, update
+from sqlalchemy import select, delete, or_, and_, update, tuple_, union_all, literal, func
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException
 from datetime import datetime, timedelta 
-from . import models, schemas
+from . import models, schemas, workout_sync
+from .cache import principal_cache, recent_writes
+from backend.common.sql import clock_timestamp, dialect_insert
 import logging
 from firebase_admin import auth
 import asyncio
 from sqlalchemy.orm import joinedload
+from typing import List, Optional, Set, Tuple
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,6 +31,21 @@ async def get_trainer_by_email(db: AsyncSession, email: str):
     result = await db.execute(select(models.Trainer).filter(models.Trainer.email == email))
     return result.scalar_one_or_none()
 
+async def get_users_by_uids(db: AsyncSession, uids: List[str]):
+    if not uids:
+        return []
+    query = union_all(
+        select(models.Member.uid, literal(models.UserRole.member.value).label("role"), models.Member.first_name, models.Member.last_name)
+        .where(models.Member.uid.in_(uids)),
+        select(models.Trainer.uid, literal(models.UserRole.trainer.value).label("role"), models.Trainer.first_name, models.Trainer.last_name)
+        .where(models.Trainer.uid.in_(uids)),
+    )
+    result = await db.execute(query)
+    return [
+        schemas.UserProfileBasic(uid=uid, role=role, first_name=first_name, last_name=last_name)
+        for uid, role, first_name, last_name in result.all()
+    ]
+
 async def create_member(db: AsyncSession, member: schemas.UserCreate):
     db_member = models.Member(
         uid=member.uid,
@@ -78,11 +96,15 @@ async def update_member(db: AsyncSession, current_member: models.Member, member_
     return current_member
 
 async def update_trainer(db: AsyncSession, current_trainer: models.Trainer, trainer_update: dict):
+    # 인증 단계에서 캐시된(세션에 속하지 않은) 객체일 수 있으므로 현재 세션에서 다시 조회
+    trainer = await get_trainer_by_uid(db, current_trainer.uid)
     for key, value in trainer_update.items():
-        setattr(current_trainer, key, value)
+        setattr(trainer, key, value)
+    await _touch_mappings_on_profile_change(db, trainer.uid, trainer_update)
     await db.commit()
-    await db.refresh(current_trainer)
-    return current_trainer
+    await db.refresh(trainer)
+    principal_cache.invalidate(trainer.uid)
+    return trainer
 
 async def create_trainer_member_mapping_request(db: AsyncSession, current_user_uid: str, other_email: str, is_trainer: bool, initial_sessions: int):
     try:
@@ -113,16 +135,26 @@ async def create_trainer_member_mapping_request(db: AsyncSession, current_user_u
                 raise HTTPException(status_code=409, detail="Mapping already exists and is pending")
         
         new_status = models.MappingStatus.pending
-        db_mapping = models.TrainerMemberMap(
-            trainer_uid=trainer_uid,
-            member_uid=member_uid,
-            status=new_status,
-            requester_uid=current_user_uid,
-            remaining_sessions=initial_sessions
-        )
-        db.add(db_mapping)
+        if existing_mapping:
+            # (trainer_uid, member_uid)는 유일하므로 만료된 매핑은 새 요청으로 되살린다
+            db_mapping = existing_mapping
+            db_mapping.status = new_status
+            db_mapping.requester_uid = current_user_uid
+            db_mapping.remaining_sessions = initial_sessions
+            db_mapping.acceptance_date = None
+        else:
+            db_mapping = models.TrainerMemberMap(
+                trainer_uid=trainer_uid,
+                member_uid=member_uid,
+                status=new_status,
+                requester_uid=current_user_uid,
+                remaining_sessions=initial_sessions
+            )
+            db.add(db_mapping)
         await db.commit()
         await db.refresh(db_mapping)
+        recent_writes.mark(trainer_uid, member_uid)
+        workout_sync.publish_mapping(db_mapping)
         return db_mapping
     except HTTPException:
         await db.rollback()
@@ -132,6 +164,26 @@ async def create_trainer_member_mapping_request(db: AsyncSession, current_user_u
         logging.error(f"Unexpected error in create_trainer_member_mapping_request: {str(e)}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred")
 
+# my-mappings 응답에 실리는 상대방 프로필 필드
+MAPPING_PROFILE_FIELDS = {"email", "first_name", "last_name"}
+
+async def _touch_mappings_on_profile_change(db: AsyncSession, uid: str, changes: dict):
+    # 이름/이메일이 바뀌면 상대방의 my-mappings ETag도 바뀌도록 매핑 스탬프 갱신
+    if MAPPING_PROFILE_FIELDS & set(changes):
+        await db.execute(
+            update(models.TrainerMemberMap)
+            .where(or_(models.TrainerMemberMap.trainer_uid == uid, models.TrainerMemberMap.member_uid == uid))
+            .values(updated_at=clock_timestamp())
+        )
+
+async def get_mappings_stamp(db: AsyncSession, user_uid: str, is_trainer: bool) -> Tuple[int, Optional[datetime]]:
+    """``(count, max(updated_at))`` of a user's mappings - the version stamp behind the my-mappings ETag."""
+    owner = models.TrainerMemberMap.trainer_uid if is_trainer else models.TrainerMemberMap.member_uid
+    result = await db.execute(
+        select(func.count(), func.max(models.TrainerMemberMap.updated_at)).where(owner == user_uid)
+    )
+    return tuple(result.one())
+
 async def get_member_mappings(db: AsyncSession, user_uid: str, is_trainer: bool):
     if is_trainer:
         query = select(
@@ -203,6 +255,8 @@ async def remove_specific_mapping(db: AsyncSession, current_user_uid: str, other
 
         await db.delete(mapping_to_remove)
         await db.commit()
+        recent_writes.mark(mapping_to_remove.trainer_uid, mapping_to_remove.member_uid)
+        workout_sync.publish_mapping_delete(mapping_to_remove.id, mapping_to_remove.trainer_uid, mapping_to_remove.member_uid)
         return True
     except SQLAlchemyError as e:
         await db.rollback()
@@ -214,14 +268,21 @@ async def remove_specific_mapping(db: AsyncSession, current_user_uid: str, other
         raise
 
 async def delete_member(db: AsyncSession, member: models.Member):
+    # 인증 단계에서 캐시된(세션에 속하지 않은) 객체일 수 있으므로 현재 세션에서 다시 조회
+    member = await get_member_by_uid(db, member.uid)
     await db.execute(delete(models.TrainerMemberMap).where(models.TrainerMemberMap.member_uid == member.uid))
     await db.delete(member)
     await db.commit()
+    principal_cache.invalidate(member.uid)
+    workout_sync.publish_mapping_delete(member_uid=member.uid)
     
 async def delete_trainer(db: AsyncSession, trainer: models.Trainer):
+    trainer = await get_trainer_by_uid(db, trainer.uid)
     await db.execute(delete(models.TrainerMemberMap).where(models.TrainerMemberMap.trainer_uid == trainer.uid))
     await db.delete(trainer)
     await db.commit()
+    principal_cache.invalidate(trainer.uid)
+    workout_sync.publish_mapping_delete(trainer_uid=trainer.uid)
 
 async def get_specific_connected_member_info(db: AsyncSession, trainer_uid: str, member_email: str):
     query = select(models.Member).join(
@@ -251,23 +312,6 @@ async def get_specific_connected_member_info(db: AsyncSession, trainer_uid: str,
         }
     return None
 
-async def update_trainer_member_mapping_status(db: AsyncSession, mapping_id: int, new_status: schemas.MappingStatus):
-    try:
-        stmt = (
-            update(models.TrainerMemberMap)
-            .where(models.TrainerMemberMap.id == mapping_id)
-            .values(status=new_status)
-            .returning(models.TrainerMemberMap)
-        )
-        result = await db.execute(stmt)
-        updated_mapping = result.scalar_one_or_none()
-        await db.commit()
-        return updated_mapping
-    except Exception as e:
-        await db.rollback()
-        logging.error(f"Error in update_trainer_member_mapping_status: {str(e)}")
-        raise
-
 async def get_trainer_member_mapping_by_id(db: AsyncSession, mapping_id: int):
     try:
         query = select(models.TrainerMemberMap).where(models.TrainerMemberMap.id == mapping_id)
@@ -293,6 +337,44 @@ async def get_trainer_member_mapping(db: AsyncSession, trainer_uid: str, member_
         logging.error(f"Error in get_trainer_member_mapping: {str(e)}")
         raise
 
+async def get_accepted_mapping_pairs(db: AsyncSession, pairs: List[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+    if not pairs:
+        return set()
+    try:
+        query = select(models.TrainerMemberMap.trainer_uid, models.TrainerMemberMap.member_uid).where(
+            and_(
+                tuple_(models.TrainerMemberMap.trainer_uid, models.TrainerMemberMap.member_uid).in_(pairs),
+                models.TrainerMemberMap.status == models.MappingStatus.accepted
+            )
+        )
+        result = await db.execute(query)
+        return {(trainer_uid, member_uid) for trainer_uid, member_uid in result.all()}
+    except Exception as e:
+        logging.error(f"Error in get_accepted_mapping_pairs: {str(e)}")
+        raise
+
+async def get_mapping_snapshot_page(db: AsyncSession, after_id: int, limit: int):
+    """Keyset page of the mapping table, used by workout_service to rebuild its replica."""
+    result = await db.execute(
+        select(
+            models.TrainerMemberMap.id,
+            models.TrainerMemberMap.trainer_uid,
+            models.TrainerMemberMap.member_uid,
+            models.TrainerMemberMap.status,
+            models.TrainerMemberMap.remaining_sessions,
+        )
+        .where(models.TrainerMemberMap.id > after_id)
+        .order_by(models.TrainerMemberMap.id)
+        .limit(limit)
+    )
+    return [schemas.MappingReplicaRow(
+        id=row.id,
+        trainer_uid=row.trainer_uid,
+        member_uid=row.member_uid,
+        status=row.status,
+        remaining_sessions=row.remaining_sessions
+    ) for row in result.all()]
+
 async def get_remaining_sessions(db: AsyncSession, trainer_uid: str, member_uid: str):
     try:
         logging.info(f"Querying remaining sessions for trainer_uid: {trainer_uid}, member_uid: {member_uid}")
@@ -317,22 +399,30 @@ async def get_remaining_sessions(db: AsyncSession, trainer_uid: str, member_uid:
         logging.error(f"Error in get_remaining_sessions: {str(e)}", exc_info=True)
         raise
 
-async def update_sessions(db: AsyncSession, trainer_uid: str, member_uid: str, sessions_to_add: int):
-    try:
-        stmt = (
-            update(models.TrainerMemberMap)
-            .where(models.TrainerMemberMap.trainer_uid == trainer_uid)
-            .where(models.TrainerMemberMap.member_uid == member_uid)
-            .values(remaining_sessions=models.TrainerMemberMap.remaining_sessions + sessions_to_add)
-            .returning(models.TrainerMemberMap.remaining_sessions, models.TrainerMemberMap.status)
-        )
-        result = await db.execute(stmt)
-        new_remaining_sessions, current_status = result.first()
+async def _adjust_remaining_sessions(db: AsyncSession, trainer_uid: str, member_uid: str, sessions_to_add: int):
+    stmt = (
+        update(models.TrainerMemberMap)
+        .where(models.TrainerMemberMap.trainer_uid == trainer_uid)
+        .where(models.TrainerMemberMap.member_uid == member_uid)
+        .values(remaining_sessions=models.TrainerMemberMap.remaining_sessions + sessions_to_add)
+        .returning(models.TrainerMemberMap.id, models.TrainerMemberMap.remaining_sessions, models.TrainerMemberMap.status)
+    )
+    result = await db.execute(stmt)
+    row = result.first()
+    if row is None:
+        return None
+    mapping_id, new_remaining_sessions, current_status = row
 
-        if new_remaining_sessions == 0 and current_status != models.MappingStatus.expired:
-            asyncio.create_task(schedule_status_update(db, trainer_uid, member_uid))
+    if new_remaining_sessions == 0 and current_status != models.MappingStatus.expired:
+        asyncio.create_task(schedule_status_update(db, trainer_uid, member_uid))
+    return row
 
+async def update_sessions(db: AsyncSession, trainer_uid: str, member_uid: str, sessions_to_add: int):
+    try:
+        mapping_id, new_remaining_sessions, current_status = await _adjust_remaining_sessions(db, trainer_uid, member_uid, sessions_to_add)
         await db.commit()
+        recent_writes.mark(trainer_uid, member_uid)
+        workout_sync.publish_mapping_upsert(mapping_id, trainer_uid, member_uid, current_status, new_remaining_sessions)
         return new_remaining_sessions
     except SQLAlchemyError as e:
         await db.rollback()
@@ -343,6 +433,42 @@ async def update_sessions(db: AsyncSession, trainer_uid: str, member_uid: str, s
         logger.error(f"Unexpected error occurred: {str(e)}")
         raise
 
+async def apply_session_adjustments(db: AsyncSession, adjustments: List[schemas.SessionAdjustment]) -> List[schemas.SessionAdjustmentResult]:
+    """Apply remaining-session adjustments sent by workout_service's outbox, exactly once per idempotency key."""
+    results = []
+    changed = []
+    try:
+        for adjustment in adjustments:
+            # 처리된 키를 같은 트랜잭션에 기록해 재전송된 이벤트는 건너뛴다
+            stmt = (
+                dialect_insert(db, models.ProcessedEvent.__table__)
+                .values(idempotency_key=adjustment.idempotency_key, processed_at=datetime.utcnow())
+                .on_conflict_do_nothing(index_elements=[models.ProcessedEvent.idempotency_key])
+                .returning(models.ProcessedEvent.idempotency_key)
+            )
+            inserted = (await db.execute(stmt)).scalar_one_or_none()
+            if inserted is None:
+                results.append(schemas.SessionAdjustmentResult(idempotency_key=adjustment.idempotency_key, status="duplicate"))
+                continue
+
+            row = await _adjust_remaining_sessions(db, adjustment.trainer_uid, adjustment.member_uid, adjustment.sessions_to_add)
+            if row is None:
+                logger.warning(f"No mapping for session adjustment {adjustment.idempotency_key}")
+                results.append(schemas.SessionAdjustmentResult(idempotency_key=adjustment.idempotency_key, status="not_found"))
+                continue
+            changed.append((adjustment, row))
+            results.append(schemas.SessionAdjustmentResult(idempotency_key=adjustment.idempotency_key, status="applied"))
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error applying session adjustments: {str(e)}")
+        raise
+
+    for adjustment, (mapping_id, new_remaining_sessions, current_status) in changed:
+        recent_writes.mark(adjustment.trainer_uid, adjustment.member_uid)
+        workout_sync.publish_mapping_upsert(mapping_id, adjustment.trainer_uid, adjustment.member_uid, current_status, new_remaining_sessions)
+    return results
+
 async def schedule_status_update(db: AsyncSession, trainer_uid: str, member_uid: str):
     await asyncio.sleep(2 * 60 * 60)  # Sleep for 2 hours
     await update_trainer_member_mapping_status(db, trainer_uid, member_uid, models.MappingStatus.expired)
@@ -358,6 +484,9 @@ async def update_trainer_member_mapping_status(db: AsyncSession, mapping_id: int
         result = await db.execute(stmt)
         updated_mapping = result.scalar_one_or_none()
         await db.commit()
+        if updated_mapping:
+            recent_writes.mark(updated_mapping.trainer_uid, updated_mapping.member_uid)
+            workout_sync.publish_mapping(updated_mapping)
         return updated_mapping
     except Exception as e:
         await db.rollback()
@@ -365,11 +494,14 @@ async def update_trainer_member_mapping_status(db: AsyncSession, mapping_id: int
         raise
         
 async def update_member(db: AsyncSession, member: models.Member, member_update: schemas.MemberUpdate):
+    member = await get_member_by_uid(db, member.uid)
     update_data = member_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(member, key, value)
+    await _touch_mappings_on_profile_change(db, member.uid, update_data)
     await db.commit()
     await db.refresh(member)
+    principal_cache.invalidate(member.uid)
     return member
 
 async def get_trainer_assigned_members(db: AsyncSession, trainer_uid: str):
@@ -1,7 +1,8 @@
 import os
 from dotenv import load_dotenv
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from backend.common.database import create_engine_from_env
 
 load_dotenv(override=True)
 SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_USER_URL", "sqlite+aiosqlite:///./test.db")
@@ -9,15 +10,21 @@ SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_USER_URL", "sqlite+aios
 if not SQLALCHEMY_DATABASE_URL:
     raise ValueError("SQLALCHEMY_DATABASE_URL is not set in the environment or .env file")
 
-engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL,
-    echo=True,
-)
+# 풀 크기/타임아웃/echo 등은 USER_DB_* 또는 DB_* 환경 변수로 조정
+engine = create_engine_from_env(SQLALCHEMY_DATABASE_URL, "USER_DB_")
 
 AsyncSession = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+# 읽기 전용 복제본 (설정되지 않으면 primary를 그대로 사용)
+SQLALCHEMY_DATABASE_REPLICA_URL = os.getenv("SQLALCHEMY_DATABASE_USER_REPLICA_URL")
+read_engine = create_engine_from_env(SQLALCHEMY_DATABASE_REPLICA_URL, "USER_DB_REPLICA_") if SQLALCHEMY_DATABASE_REPLICA_URL else engine
+
+ReadAsyncSession = sessionmaker(
+    read_engine, class_=AsyncSession.class_, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 async def get_db():
@@ -1,14 +1,20 @@
 import logging
-from fastapi import FastAPI, APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, status, BackgroundTasks, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Annotated, Union, Optional, Tuple
 from . import crud, models, schemas, utils
-from .database import get_db
-from . import fcm_token_management
+from .database import get_db, engine, read_engine
+from . import fcm_token_management, workout_sync
+from .cache import principal_cache, token_cache, recent_writes
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from firebase_admin import auth, db, messaging
 from firebase_admin_init import initialize_firebase
 from fastapi_utils.tasks import repeat_every
+from backend.common.internal_auth import verify_internal_token
+from backend.common.resilience import install_deadline_middleware
+from backend.common.database import pool_status
+from backend.common.etag import conditional
 import uuid
 import time
 import asyncio
@@ -31,7 +37,14 @@ formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(messag
 console.setFormatter(formatter)
 logging.getLogger('').addHandler(console)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await workout_sync.http_client.start()
+    await remove_inactive_tokens_task()
+    yield
+    await workout_sync.http_client.aclose()
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -40,8 +53,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["ETag"],  # 조건부 요청(If-None-Match)을 브라우저 클라이언트에서도 쓸 수 있도록
 )
 
+# 호출자가 보낸 deadline을 요청 컨텍스트에 설정 (하위 호출 타임아웃에 반영)
+install_deadline_middleware(app)
+
 router = APIRouter()
 
 @router.post("/api/users/", response_model=schemas.UserCreate)
@@ -109,6 +126,18 @@ async def read_trainer_uid(uid: str, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Trainer not found")
     return db_trainer
 
+@router.post("/api/users/byuids", response_model=List[schemas.UserProfileBasic])
+async def read_users_by_uids(
+    request: schemas.UserUidsRequest,
+    current_user: Annotated[Tuple[Union[models.Member, models.Trainer], str], Depends(utils.get_current_user)],
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        return await crud.get_users_by_uids(db, list(dict.fromkeys(request.uids)))
+    except Exception as e:
+        logger.error(f"Error fetching users by uids: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error fetching users")
+
 @router.get("/api/trainers/me/", response_model=schemas.Trainer)
 async def read_trainer_me(
     current_user: Annotated[Tuple[Union[models.Member, models.Trainer], str], Depends(utils.get_current_user)],
@@ -226,11 +255,17 @@ async def update_trainer_member_mapping_status(
     
 @router.get("/api/my-mappings/", response_model=List[Union[schemas.MemberMappingInfoWithSessions, schemas.TrainerMappingInfo]])
 async def read_my_mappings(
+    request: Request,
+    response: Response,
     current_user: Annotated[Tuple[Union[models.Member, models.Trainer], str], Depends(utils.get_current_user)],
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(utils.get_read_db)
 ):
     user, user_type = current_user
     is_trainer = user_type == 'trainer'
+    stamp = await crud.get_mappings_stamp(db, user.uid, is_trainer)
+    not_modified = conditional(request, response, "my-mappings", user_type, user.uid, *stamp)
+    if not_modified:
+        return not_modified
     mappings = await crud.get_member_mappings(db, user.uid, is_trainer)
     return mappings
 
@@ -533,6 +568,27 @@ async def check_trainer_member_mapping(
         logger.error(f"Error checking trainer-member mapping: {str(e)}")
         raise HTTPException(status_code=500, detail="Error checking trainer-member mapping")
 
+@router.post("/api/check-trainer-member-mappings", response_model=schemas.MappingCheckBatchResponse)
+async def check_trainer_member_mappings(
+    request: schemas.MappingCheckBatchRequest,
+    current_user: Annotated[Tuple[Union[models.Member, models.Trainer], str], Depends(utils.get_current_user)],
+    db: AsyncSession = Depends(get_db)
+):
+    user, user_type = current_user
+    if user_type != 'trainer' or any(pair.trainer_uid != user.uid for pair in request.pairs):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    try:
+        pairs = [(pair.trainer_uid, pair.member_uid) for pair in request.pairs]
+        accepted = await crud.get_accepted_mapping_pairs(db, pairs)
+        return {"results": [
+            {"trainer_uid": trainer_uid, "member_uid": member_uid, "exists": (trainer_uid, member_uid) in accepted}
+            for trainer_uid, member_uid in pairs
+        ]}
+    except Exception as e:
+        logger.error(f"Error checking trainer-member mappings: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error checking trainer-member mappings")
+
 @router.get("/api/trainer/{trainer_uid}/assigned-members", response_model=List[schemas.MemberBasicInfo])
 async def get_trainer_assigned_members(
     trainer_uid: str,
@@ -550,8 +606,45 @@ async def get_trainer_assigned_members(
         logger.error(f"Error fetching assigned members: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching assigned members: {str(e)}")
     
-# 비활성 토큰 제거 작업 (백그라운드 태스크로 실행)
-@app.on_event("startup")
+@router.get("/internal/trainer-member-mappings", response_model=schemas.MappingSnapshotPage, include_in_schema=False, dependencies=[Depends(verify_internal_token)])
+async def get_mapping_snapshot(
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        generated_at = time.time()
+        mappings = await crud.get_mapping_snapshot_page(db, after_id, limit)
+        next_after_id = mappings[-1].id if len(mappings) == limit else None
+        return {"generated_at": generated_at, "mappings": mappings, "next_after_id": next_after_id}
+    except Exception as e:
+        logger.error(f"Error building mapping snapshot: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error building mapping snapshot")
+
+@router.post("/internal/remaining-sessions/adjustments", response_model=schemas.SessionAdjustmentResults, include_in_schema=False, dependencies=[Depends(verify_internal_token)])
+async def apply_session_adjustments(
+    batch: schemas.SessionAdjustmentBatch,
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        results = await crud.apply_session_adjustments(db, batch.events)
+        return {"results": results}
+    except Exception as e:
+        logger.error(f"Error applying session adjustments: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error applying session adjustments")
+
+@router.get("/internal/metrics", include_in_schema=False, dependencies=[Depends(verify_internal_token)])
+async def get_internal_metrics():
+    return {
+        "http_client": workout_sync.http_client.metrics(),
+        "principal_cache": principal_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "db_pool": pool_status(engine),
+        "db_read_pool": pool_status(read_engine) if read_engine is not engine else None,
+        "read_routing": recent_writes.stats(),
+    }
+
+# 비활성 토큰 제거 작업 (lifespan에서 시작되는 백그라운드 태스크)
 @repeat_every(seconds=60*60*24)  # 매일 실행
 async def remove_inactive_tokens_task():
     async with AsyncSession(get_db()) as db:
@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, ARRAY, Enum as SQLAlchemyEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, ARRAY, Index, UniqueConstraint, Enum as SQLAlchemyEnum
 from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy.sql import func
+from backend.common.sql import clock_timestamp
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from enum import Enum as PyEnum
 from datetime import datetime
@@ -53,9 +55,24 @@ class TrainerMemberMap(Base):
     requester_uid = Column(String)
     remaining_sessions = Column(Integer, default=0)
     acceptance_date = Column(DateTime, nullable=True)
+    # 매핑 또는 상대방 프로필이 바뀔 때 갱신 (my-mappings ETag의 버전 스탬프)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=clock_timestamp(), nullable=False)
     trainer = relationship("Trainer", back_populates="member_mappings")
     member = relationship("Member", back_populates="trainer_mappings")
-    
+
+    # 트레이너-회원 쌍당 매핑은 하나 (만료된 매핑은 새 요청 시 재사용)
+    __table_args__ = (
+        UniqueConstraint("trainer_uid", "member_uid", name="uq_trainer_member_mapping_pair"),
+        Index("ix_trainer_member_mapping_member_status", "member_uid", "status"),
+        Index("ix_trainer_member_mapping_trainer_status", "trainer_uid", "status"),
+    )
+
+class ProcessedEvent(Base):
+    # 다른 서비스에서 받은 이벤트의 멱등성 키 (재전송 시 중복 적용 방지)
+    __tablename__ = "processed_events"
+    idempotency_key = Column(String, primary_key=True)
+    processed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
 class WorkoutGoalMap(Base):
     __tablename__ = "workout_goal_mapping"
     workout_goal = Column(Integer, primary_key=True, index=True)
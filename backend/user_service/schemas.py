@@ -1,4 +1,4 @@
-from typing import List, Union, Optional
+from typing import List, Union, Optional, Literal
 from pydantic import BaseModel, Field, ConfigDict
 from enum import Enum
 from datetime import datetime
@@ -150,4 +150,54 @@ class MemberBasicInfo(BaseModel):
     last_name: str
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class TrainerMemberPair(BaseModel):
+    trainer_uid: str
+    member_uid: str
+
+class MappingCheckBatchRequest(BaseModel):
+    pairs: List[TrainerMemberPair] = Field(..., max_length=500)
+
+class MappingCheckResult(TrainerMemberPair):
+    exists: bool
+
+class MappingCheckBatchResponse(BaseModel):
+    results: List[MappingCheckResult]
+
+class UserUidsRequest(BaseModel):
+    uids: List[str] = Field(..., max_length=500)
+
+class UserProfileBasic(BaseModel):
+    uid: str
+    role: UserRole
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+
+class MappingReplicaRow(BaseModel):
+    id: int
+    trainer_uid: str
+    member_uid: str
+    status: MappingStatus
+    remaining_sessions: Optional[int] = None
+
+class MappingSnapshotPage(BaseModel):
+    generated_at: float
+    mappings: List[MappingReplicaRow]
+    next_after_id: Optional[int] = None
+
+class SessionAdjustment(BaseModel):
+    idempotency_key: str
+    trainer_uid: str
+    member_uid: str
+    sessions_to_add: int
+
+class SessionAdjustmentBatch(BaseModel):
+    events: List[SessionAdjustment] = Field(..., max_length=500)
+
+class SessionAdjustmentResult(BaseModel):
+    idempotency_key: str
+    status: Literal["applied", "duplicate", "not_found"]
+
+class SessionAdjustmentResults(BaseModel):
+    results: List[SessionAdjustmentResult]
@@ -1,17 +1,15 @@
 from firebase_admin import auth
-from cachetools import TTLCache
-from datetime import timedelta
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from .database import get_db
+from . import database
 from sqlalchemy.ext.asyncio import AsyncSession
 from . import crud
+from .cache import principal_cache, token_cache, recent_writes
+import asyncio
 import logging
 
 
-# 토큰 검증 결과를 캐시하기 위한 TTLCache 설정
-# 최대 1000개의 항목을 저장하고, 각 항목은 5분 동안 유효
-token_cache = TTLCache(maxsize=1000, ttl=timedelta(minutes=5).total_seconds())
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 # 로깅 설정
@@ -23,19 +21,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def _verify_id_token(token: str) -> dict:
+    # firebase_admin 검증은 동기 함수(공개키 HTTP 조회 포함)라 이벤트 루프를 막지 않도록 스레드에서 실행
+    return await asyncio.to_thread(auth.verify_id_token, token)
+
 async def verify_token(token: str):
-    if token in token_cache:
-        return token_cache[token]
-    
     try:
-        decoded_token = auth.verify_id_token(token)
-        # 캐시에 검증된 토큰 정보 저장
-        token_cache[token] = decoded_token
-        return decoded_token
+        # 검증 결과는 token_cache에 토큰 만료(exp)와 TTL 중 이른 시각까지 캐시
+        return await token_cache.get_or_verify(token, _verify_id_token)
     except Exception as e:
         # 토큰 검증 실패 시 예외 처리
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
+            status_code=401,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
@@ -53,20 +50,37 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
         if uid is None or user_type is None:
             raise HTTPException(status_code=401, detail="Invalid token")
         
+        if user_type not in ('member', 'trainer'):
+            raise HTTPException(status_code=401, detail="Invalid user type")
+
+        # 캐시된 사용자 정보가 있으면 DB 조회 생략
+        user = principal_cache.get(str(uid), user_type)
+        if user is not None:
+            return user, user_type
+
         # 사용자 정보 데이터베이스에서 조회
         if user_type == 'member':
             user = await crud.get_member_by_uid(db, str(uid))
-        elif user_type == 'trainer':
-            user = await crud.get_trainer_by_uid(db, str(uid))
         else:
-            raise HTTPException(status_code=401, detail="Invalid user type")
+            user = await crud.get_trainer_by_uid(db, str(uid))
         
         logging.info(f"User from database: {user}")
         
         if user is None:
             raise HTTPException(status_code=401, detail="User not found")
         
+        principal_cache.set(user, user_type)
         return user, user_type
     except Exception as e:
         logging.error(f"Error in get_current_user: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=401, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=401, detail=str(e))
+
+async def get_read_db(current_user: tuple = Depends(get_current_user)):
+    # 최근에 쓰기를 한 사용자는 복제 지연을 피하기 위해 primary에서 읽는다
+    user, _ = current_user
+    if recent_writes.is_pinned(user.uid):
+        session_factory = database.AsyncSession
+    else:
+        session_factory = database.ReadAsyncSession
+    async with session_factory() as session:
+        yield session
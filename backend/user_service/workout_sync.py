@@ -0,0 +1,60 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from backend.common.http_client import ServiceHTTPClient
+from backend.common.internal_auth import internal_headers
+
+logger = logging.getLogger(__name__)
+
+WORKOUT_SERVICE_URL = os.getenv("WORKOUT_SERVICE_URL", "http://localhost:8001")
+
+# Shared connection pool for calls to workout_service (opened in main.py lifespan)
+http_client = ServiceHTTPClient.from_env()
+
+# 실행 중인 알림 태스크가 GC되지 않도록 참조 유지
+_pending_tasks = set()
+
+async def _post(path: str, payload: dict):
+    try:
+        response = await http_client.post(f"{WORKOUT_SERVICE_URL}{path}", json=payload, headers=internal_headers())
+        response.raise_for_status()
+    except Exception as e:
+        # 알림 실패는 사용자 요청을 실패시키지 않는다 (workout_service의 주기적 재동기화가 복구)
+        logger.warning(f"Failed to notify workout service ({path}): {str(e)}")
+
+# 알림은 workout_service 워커 하나에만 도달한다 (다른 워커의 매핑 캐시는 MAPPING_CACHE_TTL 안에서만 최신이 아닐 수 있음)
+def _schedule(path: str, payload: dict):
+    task = asyncio.create_task(_post(path, payload))
+    _pending_tasks.add(task)
+    task.add_done_callback(_pending_tasks.discard)
+
+def _status_value(status) -> str:
+    return getattr(status, "value", status)
+
+def publish_mapping_upsert(mapping_id: int, trainer_uid: str, member_uid: str, status, remaining_sessions: Optional[int]):
+    """Push the current state of one mapping to workout_service's local replica."""
+    _schedule("/internal/mapping-replica/events", {"events": [{
+        "op": "upsert",
+        "id": mapping_id,
+        "trainer_uid": trainer_uid,
+        "member_uid": member_uid,
+        "status": _status_value(status),
+        "remaining_sessions": remaining_sessions,
+        "source_ts": time.time(),
+    }]})
+
+def publish_mapping(mapping):
+    publish_mapping_upsert(mapping.id, mapping.trainer_uid, mapping.member_uid, mapping.status, mapping.remaining_sessions)
+
+def publish_mapping_delete(mapping_id: Optional[int] = None, trainer_uid: Optional[str] = None, member_uid: Optional[str] = None):
+    """Remove one mapping (by id) or every mapping of a trainer and/or member from the replica."""
+    _schedule("/internal/mapping-replica/events", {"events": [{
+        "op": "delete",
+        "id": mapping_id,
+        "trainer_uid": trainer_uid,
+        "member_uid": member_uid,
+        "source_ts": time.time(),
+    }]})
@@ -0,0 +1,300 @@
+from aiocache import caches
+from aiocache.serializers import MsgPackSerializer
+from cachetools import TTLCache
+from pydantic import TypeAdapter
+from backend.common.read_your_writes import RecentWrites
+from backend.workout_service import database
+from typing import Any, Optional, Tuple
+import functools
+import inspect
+import logging
+import msgpack
+import os
+
+logger = logging.getLogger(__name__)
+
+class MappingAuthCache:
+    """In-process cache of trainer→member authorization results.
+
+    Both outcomes are cached: accepted mappings for ``ttl`` seconds and
+    missing/non-accepted ones for the (shorter) ``negative_ttl``. user_service
+    pushes each mapping change as a replica event to one workout_service
+    worker, which drops its own entries; every other worker keeps its cached
+    result until the TTL runs out, so with several workers the TTLs are the
+    real staleness bound.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 300, negative_ttl: float = 60):
+        self._allowed = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._denied = TTLCache(maxsize=maxsize, ttl=negative_ttl)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            maxsize=int(os.getenv("MAPPING_CACHE_SIZE", "10000")),
+            ttl=float(os.getenv("MAPPING_CACHE_TTL", "300")),
+            negative_ttl=float(os.getenv("MAPPING_CACHE_NEGATIVE_TTL", "60")),
+        )
+
+    def get(self, trainer_uid: str, member_uid: str) -> Optional[bool]:
+        key = (trainer_uid, member_uid)
+        if key in self._allowed:
+            self.hits += 1
+            return True
+        if key in self._denied:
+            self.hits += 1
+            return False
+        self.misses += 1
+        return None
+
+    def set(self, trainer_uid: str, member_uid: str, exists: bool):
+        key = (trainer_uid, member_uid)
+        self._allowed.pop(key, None)
+        self._denied.pop(key, None)
+        if exists:
+            self._allowed[key] = True
+        else:
+            self._denied[key] = False
+
+    def invalidate(self, trainer_uid: Optional[str] = None, member_uid: Optional[str] = None) -> int:
+        removed = 0
+        for cache in (self._allowed, self._denied):
+            for key in list(cache.keys()):
+                if (trainer_uid is None or key[0] == trainer_uid) and (member_uid is None or key[1] == member_uid):
+                    cache.pop(key, None)
+                    removed += 1
+        logger.info(f"Invalidated {removed} mapping cache entries (trainer_uid={trainer_uid}, member_uid={member_uid})")
+        return removed
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "allowed_entries": len(self._allowed),
+            "denied_entries": len(self._denied),
+        }
+
+class SessionDetailCache:
+    """In-process LRU of serialized ``SessionDetail`` payloads keyed by session_id.
+
+    Entries keep the owning ``member_uid`` so callers can authorize every hit
+    without rebuilding the detail, and the catalog version the workout names
+    were resolved against, so a catalog reload retires them.
+
+    Each entry also keeps the session's generation, a counter in the shared
+    read cache backend (``session_generation:{session_id}``). ``invalidate``
+    increments it after ``save_session`` commits, which retires every
+    worker's copy on its next lookup when ``READ_CACHE_BACKEND=redis``. With
+    the per-worker ``memory`` backend only the saving worker sees the bump,
+    so ``ttl`` (a few seconds by default) is how long other workers can serve
+    the pre-save detail. A reader takes ``generation`` before querying and
+    passes it to ``set``, so a read that raced a save is not cached either.
+    """
+
+    def __init__(self, maxsize: int = 2000, ttl: float = 5, alias: str = "default"):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self.stale_sets = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            maxsize=int(os.getenv("SESSION_DETAIL_CACHE_SIZE", "2000")),
+            ttl=float(os.getenv("SESSION_DETAIL_CACHE_TTL", "5")),
+        )
+
+    @property
+    def cache(self):
+        return caches.get(self.alias)
+
+    async def generation(self, session_id: int) -> Optional[int]:
+        """Current generation of ``session_id``, or ``None`` if the shared backend is unavailable (don't cache then)."""
+        try:
+            return await self.cache.get(f"session_generation:{session_id}", default=0, loads_fn=_tag_version)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Session detail generation unavailable for {session_id}: {str(e)}")
+            return None
+
+    def get(self, session_id: int, catalog_version: Optional[int], generation: Optional[int]) -> Optional[Tuple[str, bytes]]:
+        entry = self._entries.get(session_id)
+        if generation is None or entry is None or entry[:2] != (catalog_version, generation):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[2], entry[3]
+
+    async def set(self, session_id: int, catalog_version: Optional[int], member_uid: str, payload: bytes, generation: Optional[int]) -> bool:
+        # 조회를 시작한 뒤 세션이 저장됐다면 읽은 내용이 이미 낡았을 수 있으므로 버린다
+        if generation is None or await self.generation(session_id) != generation:
+            self.stale_sets += 1
+            return False
+        self._entries[session_id] = (catalog_version, generation, member_uid, payload)
+        return True
+
+    async def invalidate(self, session_id: int):
+        self._entries.pop(session_id, None)
+        key = f"session_generation:{session_id}"
+        try:
+            await self.cache.increment(key)
+            # 마지막 저장 이후 ttl이 지나면 이전 세대의 항목은 어느 워커에도 남아 있지 않다
+            await self.cache.expire(key, int(self.ttl * 2) + 1)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Failed to bump session detail generation for {session_id}: {str(e)}")
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "stale_sets": self.stale_sets, "errors": self.errors, "entries": len(self._entries)}
+
+class BinaryMsgPackSerializer(MsgPackSerializer):
+    """msgpack serializer whose stored bytes reach ``loads`` undecoded.
+
+    aiocache's Redis backend decodes fetched values with the serializer's
+    ``encoding`` before ``loads``, which breaks on msgpack with the stock
+    utf-8 default; with ``encoding=None`` the stock ``loads`` would in turn
+    return strings as bytes. Strings are always decoded here instead.
+    """
+    DEFAULT_ENCODING = None
+
+    def loads(self, value):
+        if value is None:
+            return None
+        return msgpack.loads(value, raw=False, use_list=self.use_list)
+
+# crud 읽기 캐시 백엔드: memory(워커별) 또는 redis(워커 간 공유, redis 패키지 필요)
+READ_CACHE_BACKENDS = {
+    "memory": "aiocache.SimpleMemoryCache",
+    "redis": "aiocache.RedisCache",
+}
+
+def read_cache_config() -> dict:
+    backend = os.getenv("READ_CACHE_BACKEND", "memory")
+    config = {
+        "cache": READ_CACHE_BACKENDS[backend],
+        "serializer": {"class": BinaryMsgPackSerializer},
+        "namespace": "workout",
+    }
+    if backend == "redis":
+        config.update(
+            endpoint=os.getenv("READ_CACHE_REDIS_HOST", "127.0.0.1"),
+            port=int(os.getenv("READ_CACHE_REDIS_PORT", "6379")),
+            db=int(os.getenv("READ_CACHE_REDIS_DB", "0")),
+        )
+    return config
+
+caches.set_config({"default": read_cache_config()})
+
+def _tag_version(value) -> Optional[int]:
+    # 태그 버전은 increment로만 쓰므로 msgpack이 아니라 정수(Redis는 b"3")로 저장된다
+    return None if value is None else int(value)
+
+def _reads_replica(db) -> bool:
+    # 복제본이 따로 설정되지 않았으면 read_engine이 곧 primary
+    return database.read_engine is not database.engine and getattr(db, "bind", None) is database.read_engine
+
+class TaggedReadCache:
+    """Read-through cache for crud reads, tagged by ``member_uid``.
+
+    Entry keys embed the member's current tag version (``tag:{member_uid}``,
+    kept in the same cache). ``invalidate`` increments it, so every entry
+    written under the old version becomes unreachable at once and ages out
+    after ``ttl``. Values are stored as msgpack of the pydantic JSON-mode
+    dump and validated back into the declared result type. Cache errors fall
+    through to the database.
+
+    Only reads on a primary session fill the cache. A replica may still be
+    behind a write whose tag bump has already happened (``recent_writes``
+    only pins the writer's own worker to the primary), and its result would
+    otherwise be stored under the new version for every worker until ``ttl``.
+    Replica reads still use entries that are there.
+    """
+
+    def __init__(self, alias: str = "default", ttl: float = 120):
+        self.alias = alias
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.replica_reads = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(ttl=float(os.getenv("READ_CACHE_TTL", "120")))
+
+    @property
+    def cache(self):
+        return caches.get(self.alias)
+
+    async def invalidate(self, *member_uids: Optional[str]):
+        for member_uid in {uid for uid in member_uids if uid}:
+            try:
+                await self.cache.increment(f"tag:{member_uid}")
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Failed to invalidate read cache for member {member_uid}: {str(e)}")
+
+    def cached(self, result_type: Any, tag: str = "member_uid"):
+        """Decorate an ``async def f(db, ...)`` crud read; ``tag`` names the member_uid argument."""
+        adapter = TypeAdapter(result_type)
+
+        def decorator(func):
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                member_uid = bound.arguments[tag]
+                params = ":".join(str(value) for name, value in bound.arguments.items() if name not in ("db", tag))
+                try:
+                    version = await self.cache.get(f"tag:{member_uid}", default=0, loads_fn=_tag_version)
+                    key = f"{func.__name__}:{member_uid}:{version}:{params}"
+                    payload = await self.cache.get(key)
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning(f"Read cache unavailable for {func.__name__}: {str(e)}")
+                    return adapter.validate_python(await func(*args, **kwargs), from_attributes=True)
+
+                if payload is not None:
+                    self.hits += 1
+                    return adapter.validate_python(payload)
+                self.misses += 1
+                value = adapter.validate_python(await func(*args, **kwargs), from_attributes=True)
+                if _reads_replica(bound.arguments.get("db")):
+                    # 지연된 복제본의 결과를 새 태그 버전으로 저장하지 않도록
+                    self.replica_reads += 1
+                    return value
+                try:
+                    await self.cache.set(key, adapter.dump_python(value, mode="json"), ttl=self.ttl)
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning(f"Failed to fill read cache for {func.__name__}: {str(e)}")
+                return value
+            return wrapper
+        return decorator
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors, "replica_reads": self.replica_reads}
+
+mapping_cache = MappingAuthCache.from_env()
+
+# 회원 단위로 무효화되는 crud 읽기 캐시 (퀘스트, 운동 기록, 세션 통계)
+read_cache = TaggedReadCache.from_env()
+
+# 저장된 세션 상세 응답 (직렬화된 JSON 바이트)
+session_detail_cache = SessionDetailCache.from_env()
+
+# 표시 이름(트레이너/회원) 단기 캐시 - 이름 변경이 짧은 시간 안에 반영되도록 TTL을 짧게 유지
+user_name_cache = TTLCache(
+    maxsize=int(os.getenv("USER_NAME_CACHE_SIZE", "5000")),
+    ttl=float(os.getenv("USER_NAME_CACHE_TTL", "60")),
+)
+
+# 최근 쓰기를 한 사용자의 읽기는 잠시 primary로 고정 (복제 지연 은폐)
+recent_writes = RecentWrites.from_env()
@@ -0,0 +1,142 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from fastapi_utils.tasks import repeat_every
+from typing import Dict, List, NamedTuple, Optional
+import asyncio
+import logging
+import os
+import time
+
+from backend.workout_service import database, models
+from backend.workout_service.search import WorkoutSearchIndex
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = float(os.getenv("CATALOG_REFRESH_INTERVAL", "60"))
+
+class CatalogEntry(NamedTuple):
+    workout_key: int
+    workout_id: int
+    workout_name: str
+    workout_part_id: int
+    workout_part: str
+    low_met: Optional[float]
+    mid_met: Optional[float]
+    high_met: Optional[float]
+    sec_per_rep: Optional[float]
+
+class WorkoutCatalog:
+    """In-memory copy of the workout reference tables (workouts, parts, key map, session types).
+
+    Loaded once and reloaded only when ``catalog_version.version`` moves; a
+    trigger on the catalog tables bumps it on every change. Lookups never
+    touch the database.
+    """
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self.loaded_at: Optional[float] = None
+        self.reloads = 0
+        self._entries: Dict[int, CatalogEntry] = {}
+        self._parts: Dict[int, str] = {}
+        self._session_types: Dict[int, str] = {}
+        self._search_index = WorkoutSearchIndex([])
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    async def _current_version(self, db: AsyncSession) -> int:
+        result = await db.execute(select(models.CatalogVersion.version).where(models.CatalogVersion.id == 1))
+        return result.scalar_one_or_none() or 0
+
+    async def load(self, db: AsyncSession):
+        version = await self._current_version(db)
+        rows = await db.execute(
+            select(models.WorkoutKeyNameMap, models.Workouts, models.WorkoutParts)
+            .join(models.Workouts, models.WorkoutKeyNameMap.workout_id == models.Workouts.workout_id)
+            .join(models.WorkoutParts, models.WorkoutKeyNameMap.workout_part_id == models.WorkoutParts.workout_part_id)
+            .order_by(models.WorkoutKeyNameMap.workout_key_id)
+        )
+        entries = {
+            key.workout_key_id: CatalogEntry(
+                workout_key=key.workout_key_id,
+                workout_id=workout.workout_id,
+                workout_name=workout.workout_name,
+                workout_part_id=part.workout_part_id,
+                workout_part=part.workout_part_name,
+                low_met=workout.low_met,
+                mid_met=workout.mid_met,
+                high_met=workout.high_met,
+                sec_per_rep=workout.sec_per_rep,
+            )
+            for key, workout, part in rows.all()
+        }
+        parts = await db.execute(select(models.WorkoutParts).order_by(models.WorkoutParts.workout_part_id))
+        session_types = await db.execute(select(models.SessionTypeMap))
+
+        # 새 구조를 다 만든 뒤 한 번에 교체 (조회 중인 요청은 이전 스냅샷을 그대로 본다)
+        self._entries = entries
+        self._search_index = WorkoutSearchIndex(entries.values())
+        self._parts = {part.workout_part_id: part.workout_part_name for part in parts.scalars().all()}
+        self._session_types = {row.session_type_id: row.session_type for row in session_types.scalars().all()}
+        self.version = version
+        self.loaded_at = time.time()
+        self.reloads += 1
+        logger.info(f"Workout catalog loaded: version {version}, {len(entries)} workouts")
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if self.loaded:
+            return
+        async with self._lock:
+            if not self.loaded:
+                await self.load(db)
+
+    async def refresh_if_changed(self, db: AsyncSession) -> bool:
+        if self.loaded and await self._current_version(db) == self.version:
+            return False
+        async with self._lock:
+            await self.load(db)
+        return True
+
+    def entry(self, workout_key: int) -> Optional[CatalogEntry]:
+        return self._entries.get(workout_key)
+
+    def workout_name(self, workout_key: int) -> Optional[str]:
+        entry = self._entries.get(workout_key)
+        return entry.workout_name if entry else None
+
+    def session_type(self, session_type_id: int) -> Optional[str]:
+        return self._session_types.get(session_type_id)
+
+    def workouts_by_part(self, workout_part_id: Optional[int] = None) -> Dict[str, List[dict]]:
+        workouts_by_part = {
+            name: [] for part_id, name in self._parts.items()
+            if workout_part_id is None or part_id == workout_part_id
+        }
+        for entry in self._entries.values():
+            if workout_part_id is None or entry.workout_part_id == workout_part_id:
+                workouts_by_part[entry.workout_part].append(_workout_info(entry))
+        return workouts_by_part
+
+    def search(self, term: str, workout_part_id: Optional[int] = None, limit: Optional[int] = None) -> List[dict]:
+        return [_workout_info(entry) for entry in self._search_index.search(term, workout_part_id, limit)]
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "workouts": len(self._entries),
+            "loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+        }
+
+def _workout_info(entry: CatalogEntry) -> dict:
+    return {"workout_key": entry.workout_key, "workout_name": entry.workout_name, "workout_part": entry.workout_part}
+
+catalog = WorkoutCatalog()
+
+@repeat_every(seconds=REFRESH_INTERVAL, logger=logger)
+async def refresh_periodically():
+    async with database.AsyncSession() as db:
+        await catalog.refresh_if_changed(db)
@@ -1,58 +1,136 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload, joinedload
-from sqlalchemy import update, delete, and_, func
-from backend.workout_service import models, schemas
+from sqlalchemy import insert, update, delete, and_, or_, func, tuple_, case
+from backend.workout_service import models, schemas, utils, mapping_replica, outbox
+from backend.workout_service.cache import mapping_cache, recent_writes, session_detail_cache, read_cache
+from backend.workout_service.catalog import catalog
+from backend.workout_service.loaders import UserNameLoader
+from backend.common.sql import clock_timestamp, dialect_insert
+from backend.common.resilience import ServiceUnavailableError
+import base64
 import logging
 import httpx
 from datetime import datetime
-from aiocache import cached, caches
-from aiocache.serializers import JsonSerializer
 from collections import defaultdict
 from fastapi import HTTPException
-from typing import Union, List, Dict, Optional, Tuple
+from typing import AsyncIterator, Union, List, Dict, Optional, Tuple
 from firebase_admin import auth
 
 logger = logging.getLogger(__name__)
 
 USER_SERVICE_URL = "http://127.0.0.1:8000"
 
-caches.set_config({
-    'default': {
-        'cache': "aiocache.SimpleMemoryCache",
-        'serializer': {
-            'class': "aiocache.serializers.JsonSerializer"
-        }
-    }
-})
+# user_service의 /api/check-trainer-member-mappings가 한 번에 받는 최대 쌍 수
+MAPPING_CHECK_BATCH_SIZE = 500
 
 async def check_trainer_member_mapping(trainer_uid: str, member_uid: str, token: str):
-    async with httpx.AsyncClient() as client:
-        headers = {"Authorization": f"Bearer {token}"}
-        try:
-            url = f"{USER_SERVICE_URL}/api/check-trainer-member-mapping/{trainer_uid}/{member_uid}"
-            logger.info(f"Checking trainer-member mapping: trainer_uid={trainer_uid}, member_uid={member_uid}")
-            logger.debug(f"Sending request to: {url}")
-            response = await client.get(url, headers=headers)
-            logger.debug(f"Response status: {response.status_code}")
-            logger.debug(f"Response content: {response.text}")
-            
-            if response.status_code == 404:
-                logger.warning(f"Mapping not found for trainer {trainer_uid} and member {member_uid}")
-                return False
-            
+    cached_result = mapping_cache.get(trainer_uid, member_uid)
+    if cached_result is not None:
+        logger.debug(f"Mapping cache hit for trainer {trainer_uid} and member {member_uid}: {cached_result}")
+        return cached_result
+
+    local_result = await mapping_replica.is_accepted(trainer_uid, member_uid)
+    if local_result is not None:
+        mapping_cache.set(trainer_uid, member_uid, local_result)
+        return local_result
+
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        url = f"{USER_SERVICE_URL}/api/check-trainer-member-mapping/{trainer_uid}/{member_uid}"
+        logger.info(f"Checking trainer-member mapping: trainer_uid={trainer_uid}, member_uid={member_uid}")
+        logger.debug(f"Sending request to: {url}")
+        response = await utils.http_client.get(url, headers=headers, endpoint="check_trainer_member_mapping", hedge=True)
+        logger.debug(f"Response status: {response.status_code}")
+        logger.debug(f"Response content: {response.text}")
+        
+        if response.status_code == 404:
+            logger.warning(f"Mapping not found for trainer {trainer_uid} and member {member_uid}")
+            mapping_cache.set(trainer_uid, member_uid, False)
+            return False
+        
+        response.raise_for_status()
+        result = response.json()
+        logger.debug(f"Trainer-member mapping check result: {result}")
+        mapping_exists = result.get("exists", False)
+        logger.info(f"Mapping exists for trainer {trainer_uid} and member {member_uid}: {mapping_exists}")
+        mapping_cache.set(trainer_uid, member_uid, mapping_exists)
+        return mapping_exists
+    except ServiceUnavailableError as e:
+        # 차단기 열림(503, Retry-After)/시간 예산 소진(504)은 의도된 빠른 실패이므로 상태 그대로 전달
+        logger.warning(f"Trainer-member mapping check refused locally: {e.detail}")
+        raise
+    except HTTPException:
+        raise
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTP error occurred while checking trainer-member mapping: {e.response.status_code} - {e.response.text}")
+        raise HTTPException(status_code=e.response.status_code, detail=f"Error checking trainer-member mapping: {e.response.text}")
+    except Exception as e:
+        logger.error(f"Unexpected error occurred while checking trainer-member mapping: {str(e)}")
+        raise HTTPException(status_code=500, detail="Unexpected error occurred")
+
+async def check_trainer_member_mappings(pairs: List[Tuple[str, str]], token: str) -> Dict[Tuple[str, str], bool]:
+    """Authorize several (trainer_uid, member_uid) pairs with one user_service call per ``MAPPING_CHECK_BATCH_SIZE`` misses."""
+    results = {}
+    misses = []
+    for pair in dict.fromkeys(pairs):
+        cached_result = mapping_cache.get(*pair)
+        if cached_result is None:
+            misses.append(pair)
+        else:
+            results[pair] = cached_result
+    if not misses:
+        return results
+
+    accepted = await mapping_replica.accepted_pairs(misses)
+    if accepted is not None:
+        for pair in misses:
+            mapping_cache.set(*pair, pair in accepted)
+            results[pair] = pair in accepted
+        return results
+
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        url = f"{USER_SERVICE_URL}/api/check-trainer-member-mappings"
+        logger.info(f"Checking {len(misses)} trainer-member mappings in batches of {MAPPING_CHECK_BATCH_SIZE}")
+        for start in range(0, len(misses), MAPPING_CHECK_BATCH_SIZE):
+            batch = misses[start:start + MAPPING_CHECK_BATCH_SIZE]
+            payload = {"pairs": [{"trainer_uid": trainer_uid, "member_uid": member_uid} for trainer_uid, member_uid in batch]}
+            response = await utils.http_client.post(url, json=payload, headers=headers, endpoint="check_trainer_member_mappings", hedge=True)
             response.raise_for_status()
-            result = response.json()
-            logger.debug(f"Trainer-member mapping check result: {result}")
-            mapping_exists = result.get("exists", False)
-            logger.info(f"Mapping exists for trainer {trainer_uid} and member {member_uid}: {mapping_exists}")
-            return mapping_exists
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error occurred while checking trainer-member mapping: {e.response.status_code} - {e.response.text}")
-            raise HTTPException(status_code=e.response.status_code, detail=f"Error checking trainer-member mapping: {e.response.text}")
-        except Exception as e:
-            logger.error(f"Unexpected error occurred while checking trainer-member mapping: {str(e)}")
-            raise HTTPException(status_code=500, detail="Unexpected error occurred")
+            for result in response.json()["results"]:
+                pair = (result["trainer_uid"], result["member_uid"])
+                mapping_cache.set(*pair, result["exists"])
+                results[pair] = result["exists"]
+        return results
+    except ServiceUnavailableError as e:
+        # 차단기 열림(503, Retry-After)/시간 예산 소진(504)은 의도된 빠른 실패이므로 상태 그대로 전달
+        logger.warning(f"Trainer-member mappings check refused locally: {e.detail}")
+        raise
+    except HTTPException:
+        raise
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTP error occurred while checking trainer-member mappings: {e.response.status_code} - {e.response.text}")
+        raise HTTPException(status_code=e.response.status_code, detail=f"Error checking trainer-member mappings: {e.response.text}")
+    except Exception as e:
+        logger.error(f"Unexpected error occurred while checking trainer-member mappings: {str(e)}")
+        raise HTTPException(status_code=500, detail="Unexpected error occurred")
+
+async def get_assigned_member_uids(trainer_uid: str, token: str) -> List[str]:
+    """Accepted members of a trainer, read from the local replica when it is in sync."""
+    member_uids = await mapping_replica.get_assigned_member_uids(trainer_uid)
+    if member_uids is not None:
+        return member_uids
+
+    # 복제본이 아직 준비되지 않았으면 User Service에서 할당된 멤버 목록 가져오기
+    response = await utils.http_client.get(
+        f"{USER_SERVICE_URL}/api/trainer/{trainer_uid}/assigned-members",
+        headers={"Authorization": f"Bearer {token}"},
+        endpoint="trainer_assigned_members",
+        hedge=True
+    )
+    response.raise_for_status()
+    return [member['uid'] for member in response.json()]
 
 async def create_session(
     db: AsyncSession,
@@ -101,6 +179,7 @@ async def create_session(
         db.add(new_session)
         await db.commit()
         await db.refresh(new_session)
+        await read_cache.invalidate(member_uid)
         
         return new_session
     except ValueError as ve:
@@ -114,6 +193,180 @@ async def create_session(
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error creating session: {str(e)}")
 
+async def _sync_session_sets(db: AsyncSession, session_data: schemas.SessionSave) -> Tuple[int, int]:
+    """Bring a session's stored sets in line with ``session_data``, touching only rows that differ.
+
+    Returns ``(upserted, deleted)`` row counts. New and changed sets go out as
+    one multi-row ``INSERT ... ON CONFLICT DO UPDATE``; removed sets as one ``DELETE``.
+    """
+    session_id = session_data.session_id
+    result = await db.execute(
+        select(models.Session.workout_key, models.Session.set_num, models.Session.weight, models.Session.reps, models.Session.rest_time)
+        .where(models.Session.session_id == session_id)
+    )
+    existing = {(row.workout_key, row.set_num): (row.weight, row.reps, row.rest_time) for row in result.all()}
+
+    incoming = {}
+    for exercise in session_data.exercises:
+        for set_data in exercise.sets:
+            incoming[(exercise.workout_key, set_data.set_num)] = (set_data.weight, set_data.reps, set_data.rest_time)
+
+    changed = [
+        {"session_id": session_id, "workout_key": key[0], "set_num": key[1], "weight": values[0], "reps": values[1], "rest_time": values[2]}
+        for key, values in incoming.items() if existing.get(key) != values
+    ]
+    removed = [key for key in existing if key not in incoming]
+
+    if removed:
+        await db.execute(
+            delete(models.Session).where(
+                models.Session.session_id == session_id,
+                tuple_(models.Session.workout_key, models.Session.set_num).in_(removed),
+            )
+        )
+    if changed:
+        stmt = dialect_insert(db, models.Session.__table__).values(changed)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[models.Session.session_id, models.Session.workout_key, models.Session.set_num],
+            set_={
+                "weight": stmt.excluded.weight,
+                "reps": stmt.excluded.reps,
+                "rest_time": stmt.excluded.rest_time,
+            },
+        ))
+    return len(changed), len(removed)
+
+def estimated_1rm(weight: float, reps: int) -> float:
+    # Epley 공식 (1회 이하는 중량 그대로)
+    return weight if reps <= 1 else weight * (1 + reps / 30)
+
+PERSONAL_RECORD_FIELDS = (
+    "best_weight", "best_weight_reps", "best_weight_session_id",
+    "best_e1rm", "best_e1rm_session_id",
+    "best_volume", "best_volume_session_id",
+)
+
+def _session_bests(sets) -> Dict[int, dict]:
+    """Per-exercise bests within one session, from ``(workout_key, weight, reps)`` tuples."""
+    bests = {}
+    for workout_key, weight, reps in sets:
+        # 0회 세트(미수행 기록)는 기록으로 치지 않는다
+        if reps <= 0:
+            continue
+        best = bests.setdefault(workout_key, {"best_weight": weight, "best_weight_reps": reps, "best_e1rm": 0.0, "best_volume": 0.0})
+        if (weight, reps) > (best["best_weight"], best["best_weight_reps"]):
+            best["best_weight"], best["best_weight_reps"] = weight, reps
+        best["best_e1rm"] = max(best["best_e1rm"], estimated_1rm(weight, reps))
+        best["best_volume"] += weight * reps
+    return bests
+
+def _merge_bests(record: Optional[dict], bests: dict, session_id: int) -> dict:
+    """Fold one session's bests into a personal record; ties keep the existing (earlier) session."""
+    if record is None:
+        return {**bests, "best_weight_session_id": session_id, "best_e1rm_session_id": session_id, "best_volume_session_id": session_id}
+    merged = dict(record)
+    if (bests["best_weight"], bests["best_weight_reps"]) > (record["best_weight"], record["best_weight_reps"]):
+        merged.update(best_weight=bests["best_weight"], best_weight_reps=bests["best_weight_reps"], best_weight_session_id=session_id)
+    if bests["best_e1rm"] > record["best_e1rm"]:
+        merged.update(best_e1rm=bests["best_e1rm"], best_e1rm_session_id=session_id)
+    if bests["best_volume"] > record["best_volume"]:
+        merged.update(best_volume=bests["best_volume"], best_volume_session_id=session_id)
+    return merged
+
+async def _update_personal_records(db: AsyncSession, session: models.SessionIDMap, session_data: schemas.SessionSave) -> int:
+    """Fold a saved session into the member's personal records; returns the number of rows written.
+
+    New results only ever raise a record, so they are merged into the stored
+    row, and the upsert itself only takes a best (with its session) when it
+    beats the row it meets, so a concurrent first save of the same exercise
+    can't lower it. A record that was set by this same session may have been
+    lowered or removed by the re-save, so that exercise is recomputed from the
+    member's stored sets instead and written as-is under the row lock.
+    """
+    record = models.PersonalRecord
+    member_uid, session_id = session.member_uid, session.session_id
+    incoming = _session_bests(
+        (exercise.workout_key, set_data.weight, set_data.reps)
+        for exercise in session_data.exercises for set_data in exercise.sets
+    )
+    result = await db.execute(
+        select(record.workout_key, *(getattr(record, field) for field in PERSONAL_RECORD_FIELDS))
+        .where(
+            record.member_uid == member_uid,
+            or_(
+                record.workout_key.in_(list(incoming)),
+                record.best_weight_session_id == session_id,
+                record.best_e1rm_session_id == session_id,
+                record.best_volume_session_id == session_id,
+            ),
+        )
+        .with_for_update()
+    )
+    existing = {row.workout_key: {field: getattr(row, field) for field in PERSONAL_RECORD_FIELDS} for row in result.all()}
+
+    records = {}
+    stale = [
+        workout_key for workout_key, values in existing.items()
+        if session_id in (values["best_weight_session_id"], values["best_e1rm_session_id"], values["best_volume_session_id"])
+    ]
+    if stale:
+        history = await db.execute(
+            select(models.Session.session_id, models.Session.workout_key, models.Session.weight, models.Session.reps)
+            .join(models.SessionIDMap, models.Session.session_id == models.SessionIDMap.session_id)
+            .where(models.SessionIDMap.member_uid == member_uid, models.Session.workout_key.in_(stale))
+            .order_by(models.SessionIDMap.workout_date, models.Session.session_id)
+        )
+        sets_by_session = defaultdict(list)
+        for row in history.all():
+            sets_by_session[row.session_id].append((row.workout_key, row.weight, row.reps))
+        for past_session_id, sets in sets_by_session.items():
+            for workout_key, bests in _session_bests(sets).items():
+                records[workout_key] = _merge_bests(records.get(workout_key), bests, past_session_id)
+        # 세트가 하나도 남지 않은 운동의 기록은 삭제
+        gone = [workout_key for workout_key in stale if workout_key not in records]
+        if gone:
+            await db.execute(delete(record).where(record.member_uid == member_uid, record.workout_key.in_(gone)))
+
+    for workout_key, bests in incoming.items():
+        if workout_key not in records:
+            records[workout_key] = _merge_bests(existing.get(workout_key), bests, session_id)
+
+    changed = [
+        {"member_uid": member_uid, "workout_key": workout_key, **values}
+        for workout_key, values in records.items() if values != existing.get(workout_key)
+    ]
+    recomputed = [values for values in changed if values["workout_key"] in stale]
+    merged = [values for values in changed if values["workout_key"] not in stale]
+    if recomputed:
+        stmt = dialect_insert(db, record.__table__).values(recomputed)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[record.member_uid, record.workout_key],
+            set_={**{field: stmt.excluded[field] for field in PERSONAL_RECORD_FIELDS}, "updated_at": clock_timestamp()},
+        ))
+    if merged:
+        stmt = dialect_insert(db, record.__table__).values(merged)
+        new = stmt.excluded
+        # 충돌한 행보다 나은 값만 세션과 함께 반영 (동률이면 기존 세션 유지)
+        beats = {
+            ("best_weight", "best_weight_reps", "best_weight_session_id"): or_(
+                new.best_weight > record.best_weight,
+                and_(new.best_weight == record.best_weight, new.best_weight_reps > record.best_weight_reps),
+            ),
+            ("best_e1rm", "best_e1rm_session_id"): new.best_e1rm > record.best_e1rm,
+            ("best_volume", "best_volume_session_id"): new.best_volume > record.best_volume,
+        }
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[record.member_uid, record.workout_key],
+            set_={
+                **{
+                    field: case((condition, new[field]), else_=getattr(record, field))
+                    for fields, condition in beats.items() for field in fields
+                },
+                "updated_at": clock_timestamp(),
+            },
+        ))
+    return len(changed)
+
 async def save_session(db: AsyncSession, session_data: schemas.SessionSave, current_member: dict, authorization: str):
     logger.info(f"Starting save_session for session_id: {session_data.session_id}")
     
@@ -128,28 +381,13 @@ async def save_session(db: AsyncSession, session_data: schemas.SessionSave, curr
                 logger.error(f"Unauthorized save attempt for session: {session_data.session_id}")
                 raise HTTPException(status_code=403, detail="Not authorized to save this session")
             
-            # Check if session has already been saved
-            existing_sets = await db.execute(select(func.count()).select_from(models.Session).where(models.Session.session_id == session_data.session_id))
-            existing_sets_count = existing_sets.scalar()
-            
-            if existing_sets_count > 0:
-                logger.warning(f"Session {session_data.session_id} already has {existing_sets_count} sets. Deleting existing sets.")
-                await db.execute(delete(models.Session).where(models.Session.session_id == session_data.session_id))
-            
-            # Add new exercises and sets
-            for exercise in session_data.exercises:
-                for set_data in exercise.sets:
-                    new_set = models.Session(
-                        session_id=session_data.session_id,
-                        workout_key=exercise.workout_key,
-                        set_num=set_data.set_num,
-                        weight=set_data.weight,
-                        reps=set_data.reps,
-                        rest_time=set_data.rest_time
-                    )
-                    db.add(new_set)
-            
-            logger.info(f"Added {sum(len(exercise.sets) for exercise in session_data.exercises)} new sets for session {session_data.session_id}")
+            upserted, deleted = await _sync_session_sets(db, session_data)
+            logger.info(f"Session {session_data.session_id}: {upserted} sets inserted/updated, {deleted} sets removed")
+            if upserted or deleted:
+                # 세트만 바뀌어도 기록 조회 ETag가 바뀌도록 세션 스탬프 갱신
+                session.updated_at = clock_timestamp()
+                records = await _update_personal_records(db, session, session_data)
+                logger.info(f"Session {session_data.session_id}: {records} personal records updated")
             
             if session.session_type_id == 2:  # Quest session
                 quest = await db.get(models.Quest, session.quest_id)
@@ -158,8 +396,14 @@ async def save_session(db: AsyncSession, session_data: schemas.SessionSave, curr
                     logger.info(f"Updated quest status to COMPLETED for quest_id: {session.quest_id}")
             
             if session.is_pt:
-                await update_remaining_sessions(session.member_uid, session.trainer_uid, authorization)
-                logger.info(f"Updated remaining sessions for PT session: {session_data.session_id}")
+                # 남은 PT 횟수 차감은 같은 트랜잭션의 outbox에 기록하고 dispatcher가 user_service로 전달
+                await outbox.enqueue(
+                    db,
+                    outbox.pt_decrement_key(session.session_id),
+                    outbox.PT_SESSION_DECREMENT,
+                    {"trainer_uid": session.trainer_uid, "member_uid": session.member_uid, "sessions_to_add": -1},
+                )
+                logger.info(f"Queued remaining sessions decrement for PT session: {session_data.session_id}")
             
             await db.flush()
             await db.refresh(session)
@@ -168,37 +412,107 @@ async def save_session(db: AsyncSession, session_data: schemas.SessionSave, curr
             
             # Convert to Pydantic model for safe serialization
             response = schemas.SessionSaveResponse.from_orm(session)
-            return response
+            member_uid = session.member_uid
+            recent_writes.mark(current_member['uid'], member_uid)
         
         except Exception as e:
             logger.error(f"Error saving session {session_data.session_id}: {str(e)}")
             raise
 
-async def update_remaining_sessions(member_uid: str, trainer_uid: str, token: str):
-    async with httpx.AsyncClient() as client:
-        try:
-            url = f"{USER_SERVICE_URL}/api/trainer-member-mapping/{member_uid}/update-sessions"
-            data = {"sessions_to_add": -1}  # Decrease by 1
-            headers = {"Authorization": f"Bearer {token}"}
-            response = await client.patch(url, json=data, headers=headers)
-            response.raise_for_status()
-            result = response.json()
-            logger.info(f"Updated remaining sessions for member {member_uid} and trainer {trainer_uid}: {result}")
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error occurred while updating remaining sessions: {e.response.status_code} - {e.response.text}")
-            raise HTTPException(status_code=e.response.status_code, detail=f"Error updating remaining sessions: {e.response.text}")
-        except Exception as e:
-            logger.error(f"Unexpected error occurred while updating remaining sessions: {str(e)}")
-            raise HTTPException(status_code=500, detail="Unexpected error occurred")
+    # 커밋 이후에 공유 세대를 올린다. 다른 워커의 항목도 다음 조회에서 버려지고,
+    # 커밋 전에 이전 내용을 읽은 조회는 잡아 둔 세대가 달라져 있으므로 캐시하지 못한다
+    await session_detail_cache.invalidate(session_data.session_id)
+    await read_cache.invalidate(member_uid)
+    return response
+
+def encode_session_cursor(workout_date: datetime, session_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{workout_date.isoformat()}|{session_id}".encode()).decode()
+
+def decode_session_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        workout_date, session_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(workout_date), int(session_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+async def get_session_history(
+    db: AsyncSession,
+    member_uid: Optional[str] = None,
+    trainer_uid: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = 50,
+    member_uids: Optional[List[str]] = None,
+    per_member_limit: Optional[int] = None,
+) -> Tuple[List[schemas.SessionWithSets], Optional[str]]:
+    """Sessions with their sets, newest first, in at most two queries.
+
+    Pages are keyed on ``(workout_date, session_id)``: pass the returned
+    cursor back to get the next (older) page; it is ``None`` on the last page.
+    ``limit=None`` returns everything in range in one go. ``member_uids``
+    merges several members' histories into one feed, and ``per_member_limit``
+    keeps only each member's most recent sessions in it.
+    """
+    conditions = []
+    if member_uid is not None:
+        conditions.append(models.SessionIDMap.member_uid == member_uid)
+    if member_uids is not None:
+        conditions.append(models.SessionIDMap.member_uid.in_(member_uids))
+    if trainer_uid is not None:
+        conditions.append(models.SessionIDMap.trainer_uid == trainer_uid)
+    if start_date is not None:
+        conditions.append(models.SessionIDMap.workout_date >= start_date)
+    if end_date is not None:
+        conditions.append(models.SessionIDMap.workout_date < end_date)
+    if per_member_limit is not None:
+        # 회원별 순위는 커서와 무관하게 전체 범위에서 매겨야 페이지를 넘겨도 회원당 개수가 유지된다
+        ranked = select(
+            models.SessionIDMap.session_id,
+            func.row_number().over(
+                partition_by=models.SessionIDMap.member_uid,
+                order_by=(models.SessionIDMap.workout_date.desc(), models.SessionIDMap.session_id.desc())
+            ).label('member_rank')
+        ).where(*conditions).subquery()
+        conditions.append(models.SessionIDMap.session_id.in_(
+            select(ranked.c.session_id).where(ranked.c.member_rank <= per_member_limit)
+        ))
+    if cursor is not None:
+        cursor_date, cursor_session_id = decode_session_cursor(cursor)
+        conditions.append(
+            tuple_(models.SessionIDMap.workout_date, models.SessionIDMap.session_id) < tuple_(cursor_date, cursor_session_id)
+        )
+
+    query = select(models.SessionIDMap).where(*conditions).order_by(
+        models.SessionIDMap.workout_date.desc(), models.SessionIDMap.session_id.desc()
+    )
+    if limit is not None:
+        # 한 행 더 읽어서 다음 페이지가 있는지 판단
+        query = query.limit(limit + 1)
+    sessions = (await db.execute(query)).scalars().all()
+
+    next_cursor = None
+    if limit is not None and len(sessions) > limit:
+        sessions = sessions[:limit]
+        next_cursor = encode_session_cursor(sessions[-1].workout_date, sessions[-1].session_id)
+
+    sets_by_session = defaultdict(list)
+    if sessions:
+        sets = await db.execute(
+            select(models.Session)
+            .where(models.Session.session_id.in_([session.session_id for session in sessions]))
+            .order_by(models.Session.session_id, models.Session.workout_key, models.Session.set_num)
+        )
+        for set in sets.scalars().all():
+            sets_by_session[set.session_id].append(schemas.SetResponse(
+                session_id=set.session_id,
+                workout_key=set.workout_key,
+                set_num=set.set_num,
+                weight=set.weight,
+                reps=set.reps,
+                rest_time=set.rest_time
+            ))
 
-    
-async def get_trainer_sessions(db: AsyncSession, trainer_uid: str):
-    query = select(models.SessionIDMap).options(
-        joinedload(models.SessionIDMap.sessions)
-    ).filter_by(trainer_uid=trainer_uid)
-    result = await db.execute(query)
-    sessions = result.unique().scalars().all()
-    
     return [schemas.SessionWithSets(
         session_id=session.session_id,
         workout_date=session.workout_date,
@@ -206,39 +520,77 @@ async def get_trainer_sessions(db: AsyncSession, trainer_uid: str):
         trainer_uid=session.trainer_uid,
         is_pt=session.is_pt,
         session_type_id=session.session_type_id,
-        sets=[schemas.SetResponse(
-            session_id=set.session_id,
-            workout_key=set.workout_key,
-            set_num=set.set_num,
-            weight=set.weight,
-            reps=set.reps,
-            rest_time=set.rest_time
-        ) for set in session.sessions]
-    ) for session in sessions]
+        sets=sets_by_session[session.session_id]
+    ) for session in sessions], next_cursor
+
+async def stream_session_history(
+    db: AsyncSession,
+    member_uid: Optional[str] = None,
+    trainer_uid: Optional[str] = None,
+    batch_size: int = 500,
+) -> AsyncIterator[schemas.SessionWithSets]:
+    """Yield every session with its sets, newest first, from one server-side cursor.
+
+    Rows are fetched ``batch_size`` at a time and only the session being
+    assembled is held in memory, so the full history is never materialized.
+    """
+    conditions = []
+    if member_uid is not None:
+        conditions.append(models.SessionIDMap.member_uid == member_uid)
+    if trainer_uid is not None:
+        conditions.append(models.SessionIDMap.trainer_uid == trainer_uid)
+
+    query = select(
+        models.SessionIDMap.session_id,
+        models.SessionIDMap.workout_date,
+        models.SessionIDMap.member_uid,
+        models.SessionIDMap.trainer_uid,
+        models.SessionIDMap.is_pt,
+        models.SessionIDMap.session_type_id,
+        models.Session.workout_key,
+        models.Session.set_num,
+        models.Session.weight,
+        models.Session.reps,
+        models.Session.rest_time,
+    ).outerjoin(
+        models.Session, models.Session.session_id == models.SessionIDMap.session_id
+    ).where(*conditions).order_by(
+        models.SessionIDMap.workout_date.desc(),
+        models.SessionIDMap.session_id.desc(),
+        models.Session.workout_key,
+        models.Session.set_num,
+    ).execution_options(yield_per=batch_size)
+
+    current = None
+    result = await db.stream(query)
+    async for row in result:
+        if current is None or current.session_id != row.session_id:
+            if current is not None:
+                yield current
+            current = schemas.SessionWithSets(
+                session_id=row.session_id,
+                workout_date=row.workout_date,
+                member_uid=row.member_uid,
+                trainer_uid=row.trainer_uid,
+                is_pt=row.is_pt,
+                session_type_id=row.session_type_id,
+                sets=[]
+            )
+        if row.set_num is not None:
+            current.sets.append(schemas.SetResponse(
+                session_id=row.session_id,
+                workout_key=row.workout_key,
+                set_num=row.set_num,
+                weight=row.weight,
+                reps=row.reps,
+                rest_time=row.rest_time
+            ))
+    if current is not None:
+        yield current
 
 async def get_sessions_by_member(db: AsyncSession, member_uid: str):
-    query = select(models.SessionIDMap).options(
-        joinedload(models.SessionIDMap.sessions)
-    ).filter_by(member_uid=member_uid)
-    result = await db.execute(query)
-    sessions = result.unique().scalars().all()
-    
-    return [schemas.SessionWithSets(
-        session_id=session.session_id,
-        workout_date=session.workout_date,
-        member_uid=session.member_uid,
-        trainer_uid=session.trainer_uid,
-        is_pt=session.is_pt,
-        session_type_id=session.session_type_id,
-        sets=[schemas.SetResponse(
-            session_id=set.session_id,
-            workout_key=set.workout_key,
-            set_num=set.set_num,
-            weight=set.weight,
-            reps=set.reps,
-            rest_time=set.rest_time
-        ) for set in session.sessions]
-    ) for session in sessions]
+    sessions, _ = await get_session_history(db, member_uid=member_uid, limit=None)
+    return sessions
     
 async def get_sets_by_session(db: AsyncSession, session_id: int):
     query = select(models.Session).filter_by(session_id=session_id)
@@ -247,44 +599,51 @@ async def get_sets_by_session(db: AsyncSession, session_id: int):
 
 async def create_quest(db: AsyncSession, quest_data: schemas.QuestCreate, trainer_uid: str):
     try:
-        new_quest = models.Quest(
-            trainer_uid=trainer_uid,
-            member_uid=quest_data.member_uid,
-            status=models.QuestStatus.NOT_STARTED 
+        # 퀘스트, 운동, 세트를 각각 한 번의 multi-row INSERT로 저장 (운동 수와 무관하게 왕복 3회)
+        result = await db.execute(
+            insert(models.Quest).values(
+                trainer_uid=trainer_uid,
+                member_uid=quest_data.member_uid,
+                status=models.QuestStatus.NOT_STARTED
+            ).returning(models.Quest.quest_id, models.Quest.workout_date)
         )
-        db.add(new_quest)
-        await db.flush()
-
-        for workout_data in quest_data.workouts:
-            new_workout = models.QuestWorkout(
-                quest_id=new_quest.quest_id,
-                workout_key=workout_data.workout_key,
-            )
-            db.add(new_workout)
-            await db.flush()
-
-            for set_data in workout_data.sets:
-                new_set = models.QuestWorkoutSet(
-                    quest_id=new_quest.quest_id,
-                    workout_key=new_workout.workout_key,
-                    set_number=set_data.set_number,
-                    weight=set_data.weight,
-                    reps=set_data.reps,
-                    rest_time=set_data.rest_time
-                )
-                db.add(new_set)
+        quest_id, workout_date = result.one()
+
+        if quest_data.workouts:
+            await db.execute(insert(models.QuestWorkout).values([
+                {"quest_id": quest_id, "workout_key": workout_data.workout_key}
+                for workout_data in quest_data.workouts
+            ]))
+        set_rows = [
+            {"quest_id": quest_id, "workout_key": workout_data.workout_key, **set_data.model_dump()}
+            for workout_data in quest_data.workouts
+            for set_data in workout_data.sets
+        ]
+        if set_rows:
+            await db.execute(insert(models.QuestWorkoutSet).values(set_rows))
 
         await db.commit()
+        recent_writes.mark(trainer_uid, quest_data.member_uid)
+        await read_cache.invalidate(quest_data.member_uid)
 
-        # Reload the quest with all related data
-        stmt = select(models.Quest).options(
-            selectinload(models.Quest.workouts).selectinload(models.QuestWorkout.sets)
-        ).where(models.Quest.quest_id == new_quest.quest_id)
-        result = await db.execute(stmt)
-        loaded_quest = result.scalar_one()
-
-        logger.info(f"Quest created: {loaded_quest.quest_id}")
-        return loaded_quest
+        logger.info(f"Quest created: {quest_id}")
+        # 다시 조회하지 않고 입력값과 반환된 키로 응답을 만든다
+        return schemas.Quest(
+            quest_id=quest_id,
+            trainer_uid=trainer_uid,
+            member_uid=quest_data.member_uid,
+            status=schemas.QuestStatus.NOT_STARTED,
+            created_at=workout_date,
+            workouts=[schemas.QuestWorkout(
+                quest_id=quest_id,
+                workout_key=workout_data.workout_key,
+                sets=[schemas.QuestWorkoutSet(
+                    quest_id=quest_id,
+                    workout_key=workout_data.workout_key,
+                    **set_data.model_dump()
+                ) for set_data in workout_data.sets]
+            ) for workout_data in quest_data.workouts]
+        )
     except Exception as e:
         logger.error(f"Error creating quest: {str(e)}")
         await db.rollback()
@@ -298,6 +657,7 @@ async def get_quests_by_trainer(db: AsyncSession, trainer_uid: str):
     result = await db.execute(stmt)
     return result.unique().scalars().all()
 
+@read_cache.cached(List[schemas.Quest])
 async def get_quests_by_member(db: AsyncSession, member_uid: str):
     stmt = select(models.Quest).options(
         selectinload(models.Quest.workouts).selectinload(models.QuestWorkout.sets)
@@ -305,6 +665,7 @@ async def get_quests_by_member(db: AsyncSession, member_uid: str):
     result = await db.execute(stmt)
     return result.scalars().all()
 
+@read_cache.cached(List[schemas.Quest])
 async def get_quests_by_trainer_and_member(db: AsyncSession, trainer_uid: str, member_uid: str):
     stmt = select(models.Quest).options(
         selectinload(models.Quest.workouts).selectinload(models.QuestWorkout.sets)
@@ -328,6 +689,8 @@ async def update_quests_status(db: AsyncSession, member_uid: str):
         
         result = await db.execute(stmt)
         await db.commit()
+        if result.rowcount:
+            await read_cache.invalidate(member_uid)
         
         logger.info(f"Updated {result.rowcount} quests to 'Deadline passed' for member {member_uid}")
     except Exception as e:
@@ -335,26 +698,6 @@ async def update_quests_status(db: AsyncSession, member_uid: str):
         await db.rollback()
         raise
 
-async def get_sessions_by_member(db: AsyncSession, member_uid: str):
-    query = select(models.SessionIDMap).filter_by(member_uid=member_uid)
-    result = await db.execute(query)
-    sessions = result.scalars().all()
-    
-    session_with_sets = []
-    for session in sessions:
-        sets = await get_sets_by_session(db, session.session_id)
-        session_with_sets.append(schemas.SessionWithSets(
-            session_id=session.session_id,
-            workout_date=session.workout_date,
-            member_uid=session.member_uid,
-            trainer_uid=session.trainer_uid,
-            is_pt=session.is_pt,
-            session_type_id=session.session_type_id,
-            sets=[schemas.SetResponse(**set.__dict__) for set in sets]
-        ))
-    
-    return session_with_sets
-
 async def delete_quest(db: AsyncSession, quest_id: int):
     try:
         # Delete associated QuestworkoutSets
@@ -364,12 +707,16 @@ async def delete_quest(db: AsyncSession, quest_id: int):
         await db.execute(delete(models.QuestWorkout).where(models.QuestWorkout.quest_id == quest_id))
 
         # Delete the Quest
-        result = await db.execute(delete(models.Quest).where(models.Quest.quest_id == quest_id))
+        result = await db.execute(
+            delete(models.Quest).where(models.Quest.quest_id == quest_id).returning(models.Quest.member_uid)
+        )
+        member_uid = result.scalar_one_or_none()
         await db.commit()
 
-        if result.rowcount == 0:
+        if member_uid is None:
             logger.info(f"No quest found with id {quest_id}")
             return False
+        await read_cache.invalidate(member_uid)
 
         logger.info(f"Quest deleted: id={quest_id}")
         return True
@@ -378,6 +725,7 @@ async def delete_quest(db: AsyncSession, quest_id: int):
         await db.rollback()
         raise
     
+@read_cache.cached(Dict[int, schemas.QuestWorkoutRecord])
 async def get_workout_records(db: AsyncSession, member_uid: str, workout_key: int):
     try:
         stmt = select(models.Quest, models.QuestWorkoutSet).join(
@@ -394,7 +742,7 @@ async def get_workout_records(db: AsyncSession, member_uid: str, workout_key: in
                 models.Quest.member_uid == member_uid,
                 models.QuestWorkoutSet.workout_key == workout_key
             )
-        ).order_by(models.Quest.created_at.desc(), models.QuestWorkoutSet.set_number)
+        ).order_by(models.Quest.workout_date.desc(), models.QuestWorkoutSet.set_number)
 
         result = await db.execute(stmt)
         records = result.all()
@@ -403,7 +751,7 @@ async def get_workout_records(db: AsyncSession, member_uid: str, workout_key: in
         
         for quest, workout_set in records:
             quest_id = quest.quest_id
-            structured_records[quest_id]["date"] = quest.created_at
+            structured_records[quest_id]["date"] = quest.workout_date
             structured_records[quest_id]["sets"].append({
                 "set_number": workout_set.set_number,
                 "weight": workout_set.weight,
@@ -418,141 +766,133 @@ async def get_workout_records(db: AsyncSession, member_uid: str, workout_key: in
         raise
     
 async def get_workout_name(db: AsyncSession, workout_key: int):
-    try:
-        stmt = select(models.WorkoutKeyNameMap).options(
-            joinedload(models.WorkoutKeyNameMap.workout)
-        ).where(models.WorkoutKeyNameMap.workout_key_id == workout_key)
-        
-        result = await db.execute(stmt)
-        workout_key_map = result.scalar_one_or_none()
-        
-        if workout_key_map and workout_key_map.workout:
-            return workout_key_map.workout.workout_name
-        else:
-            logger.warning(f"No workout found for workout_key: {workout_key}")
-            return None
-    except Exception as e:
-        logger.error(f"Error retrieving workout name: {str(e)}", exc_info=True)
-        raise
+    await catalog.ensure_loaded(db)
+    workout_name = catalog.workout_name(workout_key)
+    if workout_name is None:
+        logger.warning(f"No workout found for workout_key: {workout_key}")
+    return workout_name
     
+async def get_catalog_version(db: AsyncSession) -> Optional[int]:
+    await catalog.ensure_loaded(db)
+    return catalog.version
+
 async def get_workouts_by_part(db: AsyncSession, workout_part_id: int = None):
-    try:
-        stmt = select(models.WorkoutParts).options(
-            joinedload(models.WorkoutParts.workout_keys).joinedload(models.WorkoutKeyNameMap.workout)
-        )
-        
-        if workout_part_id:
-            stmt = stmt.where(models.WorkoutParts.workout_part_id == workout_part_id)
-        
-        result = await db.execute(stmt)
-        workout_parts = result.unique().scalars().all()
-        
-        workouts_by_part = {}
-        for part in workout_parts:
-            workouts = [
-                {
-                    "workout_key": key.workout_key_id,
-                    "workout_name": key.workout.workout_name,
-                    "workout_part": part.workout_part_name  # Add this line
-                }
-                for key in part.workout_keys
-            ]
-            workouts_by_part[part.workout_part_name] = workouts
-        
-        logger.info(f"Retrieved workouts by part{'s' if not workout_part_id else ''}")
-        return workouts_by_part
-    except Exception as e:
-        logger.error(f"Error retrieving workouts by part: {str(e)}", exc_info=True)
-        raise
+    await catalog.ensure_loaded(db)
+    workouts_by_part = catalog.workouts_by_part(workout_part_id)
+    logger.info(f"Retrieved workouts by part{'s' if not workout_part_id else ''}")
+    return workouts_by_part
+
+# (session_type_id, is_pt) → 통계 카테고리 (그 외 조합은 집계에서 제외)
+SESSION_CATEGORIES = {
+    (1, False): 'ai_sessions',
+    (3, False): 'custom_sessions',
+    (2, False): 'quest_sessions',
+    (3, True): 'pt_sessions',
+}
+
+def _member_sessions_in_range(member_uid: str, start_date: datetime, end_date: datetime):
+    return and_(
+        models.SessionIDMap.member_uid == member_uid,
+        models.SessionIDMap.workout_date >= start_date,
+        models.SessionIDMap.workout_date < end_date
+    )
 
+@read_cache.cached(Dict[str, int])
 async def get_session_counts(db: AsyncSession, member_uid: str, start_date: datetime, end_date: datetime):
-    query = select(models.SessionIDMap).where(
-        and_(
-            models.SessionIDMap.member_uid == member_uid,
-            models.SessionIDMap.workout_date >= start_date,
-            models.SessionIDMap.workout_date < end_date
-        )
-    )
+    query = select(
+        models.SessionIDMap.session_type_id, models.SessionIDMap.is_pt, func.count()
+    ).where(
+        _member_sessions_in_range(member_uid, start_date, end_date)
+    ).group_by(models.SessionIDMap.session_type_id, models.SessionIDMap.is_pt)
     result = await db.execute(query)
-    sessions = result.scalars().all()
-
-    counts = {
-        'ai_sessions': 0,
-        'custom_sessions': 0,
-        'quest_sessions': 0,
-        'pt_sessions': 0
-    }
-
-    for session in sessions:
-        if session.session_type_id == 1 and not session.is_pt:
-            counts['ai_sessions'] += 1
-        elif session.session_type_id == 3 and not session.is_pt:
-            counts['custom_sessions'] += 1
-        elif session.session_type_id == 2 and not session.is_pt:
-            counts['quest_sessions'] += 1
-        elif session.session_type_id == 3 and session.is_pt:
-            counts['pt_sessions'] += 1
 
+    counts = schemas.SessionCounts().model_dump()
+    for session_type_id, is_pt, count in result.all():
+        category = SESSION_CATEGORIES.get((session_type_id, bool(is_pt)))
+        if category:
+            counts[category] += count
     return counts
 
-async def get_last_session_update(db: AsyncSession, uie: str) -> datetime:
+async def get_session_count_buckets(db: AsyncSession, member_uid: str, start_date: datetime, end_date: datetime,
+                                    interval: str, tz: str) -> List[schemas.SessionCountBucket]:
+    """Per-day or per-week session counts by category, bucketed in the ``tz`` time zone (PostgreSQL only)."""
+    # 버킷 식은 서브쿼리에서 한 번만 계산 (GROUP BY에 바인드 파라미터가 든 식을 반복하지 않도록)
+    # tz 기준 현지 시각으로 자른 뒤 다시 timezone()을 씌워 timestamptz(해당 현지 자정의 절대 시각)로 돌려준다
+    sessions = select(
+        func.timezone(tz, func.date_trunc(interval, func.timezone(tz, models.SessionIDMap.workout_date))).label('bucket_start'),
+        models.SessionIDMap.session_type_id,
+        models.SessionIDMap.is_pt,
+    ).where(_member_sessions_in_range(member_uid, start_date, end_date)).subquery()
+    query = select(
+        sessions.c.bucket_start, sessions.c.session_type_id, sessions.c.is_pt, func.count()
+    ).group_by(
+        sessions.c.bucket_start, sessions.c.session_type_id, sessions.c.is_pt
+    ).order_by(sessions.c.bucket_start)
+    result = await db.execute(query)
+
+    buckets: Dict[datetime, schemas.SessionCountBucket] = {}
+    for bucket_start, session_type_id, is_pt, count in result.all():
+        category = SESSION_CATEGORIES.get((session_type_id, bool(is_pt)))
+        if not category:
+            continue
+        if bucket_start not in buckets:
+            buckets[bucket_start] = schemas.SessionCountBucket(bucket_start=bucket_start)
+        setattr(buckets[bucket_start], category, getattr(buckets[bucket_start], category) + count)
+    return list(buckets.values())
+
+async def get_last_session_update(db: AsyncSession, uid: str) -> datetime:
     query = select(func.max(models.SessionIDMap.workout_date)).where(models.SessionIDMap.member_uid == uid)
     result = await db.execute(query)
     last_updated = result.scalar_one_or_none()
     return last_updated or datetime.min
 
-async def search_workouts(db: AsyncSession, workout_name: str):
-    try:
-        stmt = select(models.WorkoutKeyNameMap).options(
-            joinedload(models.WorkoutKeyNameMap.workout),
-            joinedload(models.WorkoutKeyNameMap.workout_part)
-        ).join(models.Workouts).where(
-            func.lower(models.Workouts.workout_name).contains(func.lower(workout_name.replace(' ', '%')))
-        )
-        
-        result = await db.execute(stmt)
-        workout_key_maps = result.unique().scalars().all()
-        
-        if not workout_key_maps:
-            logger.warning(f"No workouts found for search term: {workout_name}")
-            return []
-
-        workouts = [
-            {
-                "workout_key": wkm.workout_key_id,
-                "workout_name": wkm.workout.workout_name,
-                "workout_part": wkm.workout_part.workout_part_name
-            }
-            for wkm in workout_key_maps
-        ]
-        
-        logger.info(f"Found {len(workouts)} workouts for search term: {workout_name}")
-        return workouts
-    except Exception as e:
-        logger.error(f"Error searching workouts: {str(e)}", exc_info=True)
-        raise
+async def get_personal_records(db: AsyncSession, member_uid: str) -> List[schemas.PersonalRecord]:
+    await catalog.ensure_loaded(db)
+    result = await db.execute(
+        select(models.PersonalRecord)
+        .where(models.PersonalRecord.member_uid == member_uid)
+        .order_by(models.PersonalRecord.workout_key)
+    )
+    return [
+        schemas.PersonalRecord.model_validate(row).model_copy(update={"workout_name": catalog.workout_name(row.workout_key)})
+        for row in result.scalars().all()
+    ]
+
+async def get_session_history_stamp(db: AsyncSession, member_uid: Optional[str] = None, trainer_uid: Optional[str] = None) -> Tuple[int, Optional[datetime]]:
+    """``(count, max(updated_at))`` of a member's or trainer's sessions - changes whenever their history does."""
+    query = select(func.count(), func.max(models.SessionIDMap.updated_at))
+    if member_uid is not None:
+        query = query.where(models.SessionIDMap.member_uid == member_uid)
+    if trainer_uid is not None:
+        query = query.where(models.SessionIDMap.trainer_uid == trainer_uid)
+    result = await db.execute(query)
+    return tuple(result.one())
+
+async def get_quests_stamp(db: AsyncSession, trainer_uid: Optional[str] = None, member_uid: Optional[str] = None) -> Tuple[int, Optional[datetime]]:
+    """``(count, max(updated_at))`` of the quests visible to a trainer or member (deletes change the count)."""
+    query = select(func.count(), func.max(models.Quest.updated_at))
+    if trainer_uid is not None:
+        query = query.where(models.Quest.trainer_uid == trainer_uid)
+    if member_uid is not None:
+        query = query.where(models.Quest.member_uid == member_uid)
+    result = await db.execute(query)
+    return tuple(result.one())
+
+async def search_workouts(db: AsyncSession, workout_name: str, workout_part_id: Optional[int] = None, limit: Optional[int] = None):
+    await catalog.ensure_loaded(db)
+    workouts = catalog.search(workout_name, workout_part_id, limit)
+    if not workouts:
+        logger.warning(f"No workouts found for search term: {workout_name}")
+        return []
+    logger.info(f"Found {len(workouts)} workouts for search term: {workout_name}")
+    return workouts
     
-async def get_trainer_name(token: str, trainer_uid: str):
-    async with httpx.AsyncClient() as client:
-        headers = {"Authorization": f"Bearer {token}"}
-        try:
-            url = f"{USER_SERVICE_URL}/api/trainers/byuid/{trainer_uid}"
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            trainer_data = response.json()
-            return f"{trainer_data['first_name']} {trainer_data['last_name']}"
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error occurred while fetching trainer name: {e.response.status_code} - {e.response.text}")
-            return None
-        except Exception as e:
-            logger.error(f"Unexpected error occurred while fetching trainer name: {str(e)}")
-            return None
-
-async def get_session_detail(db: AsyncSession, session_id: int, token: str):
+async def get_session_detail(db: AsyncSession, session_id: int, user_loader: UserNameLoader):
     try:
+        await catalog.ensure_loaded(db)
+        # 운동 이름/부위와 세션 종류는 메모리 카탈로그에서 (세션과 세트만 DB에서 조회)
         stmt = select(models.SessionIDMap).options(
-            joinedload(models.SessionIDMap.sessions).joinedload(models.Session.workout_key_name_map).joinedload(models.WorkoutKeyNameMap.workout),
-            joinedload(models.SessionIDMap.sessions).joinedload(models.Session.workout_key_name_map).joinedload(models.WorkoutKeyNameMap.workout_part)
+            joinedload(models.SessionIDMap.sessions)
         ).where(models.SessionIDMap.session_id == session_id)
 
         result = await db.execute(stmt)
@@ -565,10 +905,11 @@ async def get_session_detail(db: AsyncSession, session_id: int, token: str):
         for set_data in session.sessions:
             workout_key = set_data.workout_key
             if workout_key not in workouts:
+                entry = catalog.entry(workout_key)
                 workouts[workout_key] = {
                     "workout_key": workout_key,
-                    "workout_name": set_data.workout_key_name_map.workout.workout_name,
-                    "workout_part": set_data.workout_key_name_map.workout_part.workout_part_name,
+                    "workout_name": entry.workout_name if entry else "Unknown",
+                    "workout_part": entry.workout_part if entry else "Unknown",
                     "sets": []
                 }
             workouts[workout_key]["sets"].append({
@@ -578,12 +919,10 @@ async def get_session_detail(db: AsyncSession, session_id: int, token: str):
                 "rest_time": set_data.rest_time
             })
 
-        session_type = await db.execute(select(models.SessionTypeMap).where(models.SessionTypeMap.session_type_id == session.session_type_id))
-        session_type = session_type.scalar_one_or_none()
 
         trainer_name = None
         if session.trainer_uid:
-            trainer_name = await get_trainer_name(token, session.trainer_uid)
+            trainer_name = await user_loader.load(session.trainer_uid)
 
         return schemas.SessionDetail(
             session_id=session.session_id,
@@ -593,7 +932,7 @@ async def get_session_detail(db: AsyncSession, session_id: int, token: str):
             trainer_name=trainer_name,
             is_pt=session.is_pt,
             session_type_id=session.session_type_id,
-            session_type=session_type.session_type if session_type else "Unknown",
+            session_type=catalog.session_type(session.session_type_id) or "Unknown",
             workouts=[schemas.WorkoutDetail(**workout) for workout in workouts.values()]
         )
     except Exception as e:
@@ -0,0 +1,45 @@
+from typing import AsyncIterator
+import csv
+import io
+
+from backend.workout_service import schemas
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# CSV는 세트 한 줄씩 (세트가 없는 세션은 세트 칸을 비운 한 줄)
+CSV_COLUMNS = [
+    "session_id", "workout_date", "member_uid", "trainer_uid", "is_pt", "session_type_id",
+    "workout_key", "set_num", "weight", "reps", "rest_time",
+]
+
+async def ndjson_lines(sessions: AsyncIterator[schemas.SessionWithSets]) -> AsyncIterator[str]:
+    async for session in sessions:
+        yield session.model_dump_json() + "\n"
+
+def _csv_line(values) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+async def csv_lines(sessions: AsyncIterator[schemas.SessionWithSets]) -> AsyncIterator[str]:
+    yield _csv_line(CSV_COLUMNS)
+    async for session in sessions:
+        head = [
+            session.session_id, session.workout_date.isoformat(), session.member_uid,
+            session.trainer_uid or "", session.is_pt, session.session_type_id,
+        ]
+        if not session.sets:
+            yield _csv_line(head + [""] * 5)
+            continue
+        yield "".join(
+            _csv_line(head + [set.workout_key, set.set_num, set.weight, set.reps, set.rest_time])
+            for set in session.sets
+        )
+
+FORMATTERS = {
+    "ndjson": ndjson_lines,
+    "csv": csv_lines,
+}
@@ -0,0 +1,76 @@
+from fastapi import Header
+from typing import Dict, Iterable, List, Optional
+import asyncio
+import logging
+
+from backend.workout_service import utils
+from backend.workout_service.cache import user_name_cache
+
+logger = logging.getLogger(__name__)
+
+async def fetch_user_names(uids: List[str], token: str) -> Dict[str, str]:
+    """Resolve display names for ``uids`` with one call to user_service's bulk lookup."""
+    url = f"{utils.USER_SERVICE_URL}/api/users/byuids"
+    # 조회 전용 POST라 재전송해도 안전하므로 hedging 허용
+    response = await utils.http_client.post(
+        url, json={"uids": uids}, headers={"Authorization": f"Bearer {token}"}, endpoint="users_byuids", hedge=True
+    )
+    response.raise_for_status()
+    return {
+        user["uid"]: f"{user['first_name']} {user['last_name']}"
+        for user in response.json()
+    }
+
+class UserNameLoader:
+    """Request-scoped DataLoader for user display names.
+
+    ``load`` calls made in the same event-loop tick are gathered and resolved
+    with a single bulk request; names already in ``user_name_cache`` never
+    leave the process. Lookup failures resolve to ``None`` so a missing name
+    never fails the surrounding request.
+    """
+
+    def __init__(self, token: str):
+        self.token = token
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._queue: List[str] = []
+        self._dispatch_scheduled = False
+
+    async def load(self, uid: str) -> Optional[str]:
+        cached_name = user_name_cache.get(uid)
+        if cached_name is not None:
+            return cached_name
+
+        future = self._futures.get(uid)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[uid] = future
+            self._queue.append(uid)
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        return await future
+
+    async def load_many(self, uids: Iterable[str]) -> Dict[str, Optional[str]]:
+        uids = list(dict.fromkeys(uids))
+        names = await asyncio.gather(*(self.load(uid) for uid in uids))
+        return dict(zip(uids, names))
+
+    async def _dispatch(self):
+        uids, self._queue, self._dispatch_scheduled = self._queue, [], False
+        try:
+            names = await fetch_user_names(uids, self.token)
+        except Exception as e:
+            logger.error(f"Error fetching user names for {len(uids)} uids: {str(e)}")
+            names = {}
+        for uid in uids:
+            name = names.get(uid)
+            if name is not None:
+                user_name_cache[uid] = name
+            future = self._futures.pop(uid)
+            if not future.done():
+                future.set_result(name)
+
+async def get_user_loader(authorization: str = Header(...)) -> UserNameLoader:
+    return UserNameLoader(authorization.split(" ")[-1])
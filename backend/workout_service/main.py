@@ -1,18 +1,25 @@
-from fastapi import FastAPI, Depends, HTTPException, Request, Header, Path, Query
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, Header, Path, Query
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 from sqlalchemy.ext.asyncio import AsyncSession
-from backend.workout_service.database import get_db
-from backend.workout_service import crud, schemas, utils
+from backend.workout_service.database import get_db, engine, read_engine
+from backend.workout_service import crud, schemas, utils, loaders, mapping_replica, outbox, export, catalog
 from firebase_admin_init import initialize_firebase
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Union, Optional, Tuple, Annotated, Dict
+from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
+from typing import List, Union, Optional, Tuple, Annotated, Dict, Literal
 from datetime import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import logging
 import httpx
-from firebase_admin import auth, credentials
 import firebase_admin
 from backend.workout_service import models 
+from backend.workout_service.cache import mapping_cache, recent_writes, session_detail_cache, read_cache
+from backend.common.internal_auth import verify_internal_token
+from backend.common.resilience import ServiceUnavailableError, install_deadline_middleware
+from backend.common.database import pool_status
+from backend.common.etag import conditional
 
 initialize_firebase()
 USER_SERVICE_URL = "http://localhost:8000"
@@ -33,7 +40,20 @@ formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(messag
 console.setFormatter(formatter)
 logging.getLogger('').addHandler(console)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 서비스 간 호출용 커넥션 풀을 앱 수명 동안 유지
+    await utils.http_client.start()
+    # 매핑 복제본 전체 동기화 (시작 시 1회 + 주기적 재동기화)
+    await mapping_replica.resync_periodically()
+    # 운동 카탈로그 적재 (시작 시 1회 + 버전이 바뀌었을 때만 재적재)
+    await catalog.refresh_periodically()
+    outbox.dispatcher.start()
+    yield
+    await outbox.dispatcher.stop()
+    await utils.http_client.aclose()
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -42,8 +62,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Next-Cursor", "ETag"],  # 페이지네이션 커서/ETag를 브라우저 클라이언트에서 읽을 수 있도록
 )
 
+# 호출자가 보낸 deadline을 요청 컨텍스트에 설정 (하위 호출 타임아웃에 반영)
+install_deadline_middleware(app)
+
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
@@ -74,17 +98,6 @@ async def get_documentation():
 async def get_openapi_json():
     return app.openapi()
 
-async def get_current_user(authorization: str = Header(...)):
-    if not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Invalid authorization header")
-    token = authorization.split(" ")[1]
-    try:
-        decoded_token = auth.verify_id_token(token)
-        return decoded_token
-    except Exception as e:
-        logger.error(f"Error verifying token: {str(e)}")
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-
 @app.post("/api/create_session", response_model=schemas.SessionIDMap)
 async def create_session_endpoint(
     request: Request,
@@ -92,7 +105,7 @@ async def create_session_endpoint(
     quest_id: Optional[int] = Query(None, description="Quest ID. Required for session_type_id 2."),
     member_uid: Optional[str] = Query(None, description="Member ID. Required for trainers."),
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(utils.get_current_user)
 ):
     try:
         # Parse the request body as JSON
@@ -130,7 +143,7 @@ async def create_session_endpoint(
 @app.get("/api/get_oldest_not_started_quest", response_model=schemas.Quest)
 async def get_oldest_not_started_quest(
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(utils.get_current_user)
 ):
     try:
         quest = await crud.get_oldest_not_started_quest(db, current_user['uid'])
@@ -147,11 +160,12 @@ async def save_session(
     request: Request,
     session_data: schemas.SessionSave,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(utils.get_current_user)
 ):
     try:
         token = request.headers.get('Authorization').split(" ")[1]
         updated_session = await crud.save_session(db, session_data, current_user, token)
+        outbox.dispatcher.notify()
         return updated_session
     except HTTPException as he:
         raise he
@@ -163,25 +177,38 @@ async def get_session_detail(
     session_id: int,
     request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(utils.get_current_user),
+    user_loader: loaders.UserNameLoader = Depends(loaders.get_user_loader)
 ):
     try:
         token = request.headers.get('Authorization').split(" ")[1]
-        session_detail = await crud.get_session_detail(db, session_id, token)
-        if not session_detail:
-            raise HTTPException(status_code=404, detail="Session not found")
-
-        # Check authorization
-        if current_user['uid'] != session_detail.member_uid:
+        catalog_version = catalog.catalog.version
+        # 조회 전에 세대를 잡아 두어, 조회 중에 저장된 세션의 이전 내용은 캐시되지 않게 한다
+        generation = await session_detail_cache.generation(session_id)
+        cached = session_detail_cache.get(session_id, catalog_version, generation)
+        if cached:
+            member_uid, payload = cached
+        else:
+            session_detail = await crud.get_session_detail(db, session_id, user_loader)
+            if not session_detail:
+                raise HTTPException(status_code=404, detail="Session not found")
+            member_uid = session_detail.member_uid
+            payload = session_detail.model_dump_json().encode()
+            # 세트가 아직 없는 세션은 곧 저장될 가능성이 높아 캐시하지 않는다
+            if session_detail.workouts:
+                await session_detail_cache.set(session_id, catalog_version, member_uid, payload, generation)
+
+        # Check authorization (캐시 적중 시에도 매번 확인)
+        if current_user['uid'] != member_uid:
             if current_user['role'] != 'trainer':
                 raise HTTPException(status_code=403, detail="Not authorized to access this session")
             
             # If it's a trainer, check if they're assigned to this member
-            is_assigned = await crud.check_trainer_member_mapping(current_user['uid'], session_detail.member_uid, token)
+            is_assigned = await crud.check_trainer_member_mapping(current_user['uid'], member_uid, token)
             if not is_assigned:
                 raise HTTPException(status_code=403, detail="Not authorized to access this member's session")
 
-        return session_detail
+        return Response(content=payload, media_type="application/json")
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -193,7 +220,7 @@ async def create_quest_endpoint(
     request: Request,
     quest_data: schemas.QuestCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(utils.get_current_user)
 ):
     try:
         if current_user['role'] != 'trainer':
@@ -216,12 +243,20 @@ async def create_quest_endpoint(
 
 @app.get("/api/quests", response_model=List[schemas.Quest])
 async def read_quests(
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(utils.get_read_db),
+    current_user: dict = Depends(utils.get_current_user)
 ):
     try:
         logger.debug(f"Current user: {current_user}")
 
+        owner = {"trainer_uid" if current_user['role'] == 'trainer' else "member_uid": current_user['uid']}
+        stamp = await crud.get_quests_stamp(db, **owner)
+        not_modified = conditional(request, response, "quests", current_user['role'], current_user['uid'], *stamp)
+        if not_modified:
+            return not_modified
+
         if current_user['role'] == 'trainer':
             quests = await crud.get_quests_by_trainer(db, current_user['uid'])
         else:  # member
@@ -237,7 +272,7 @@ async def read_quests_for_member(
     request: Request,
     member_uid: str,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(utils.get_current_user)
 ):
     try:
         logger.debug(f"Current user: {current_user}")
@@ -264,7 +299,7 @@ async def read_quests_for_member(
 async def delete_quest(
     quest_id: int = Path(..., title="The ID of the quest to delete"),
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(utils.get_current_user)
 ):
     try:
         # Fetch the quest to check permissions
@@ -293,8 +328,8 @@ async def delete_quest(
 @app.get("/api/workout-records/{workout_key}", response_model=Dict[int, schemas.QuestWorkoutRecord])
 async def get_workout_records(
     workout_key: int = Path(..., title="The workout key of the workout"),
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    db: AsyncSession = Depends(utils.get_read_db),
+    current_user: dict = Depends(utils.get_current_user)
 ):
     try:
         records = await crud.get_workout_records(db, current_user['uid'], workout_key)
@@ -305,11 +340,35 @@ async def get_workout_records(
         logger.error(f"Error retrieving workout records: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error retrieving workout records: {str(e)}")
 
+@app.get("/api/personal-records/{member_uid}", response_model=List[schemas.PersonalRecord])
+async def get_personal_records(
+    request: Request,
+    member_uid: str,
+    db: AsyncSession = Depends(utils.get_read_db),
+    current_user: dict = Depends(utils.get_current_user)
+):
+    try:
+        if current_user['uid'] != member_uid:
+            if current_user['role'] != 'trainer':
+                raise HTTPException(status_code=403, detail="Not authorized to access this data")
+            token = request.headers.get('Authorization').split(" ")[1]
+            is_mapped = await crud.check_trainer_member_mapping(current_user['uid'], member_uid, token)
+            if not is_mapped:
+                raise HTTPException(status_code=403, detail="Not authorized to access this member's data")
+
+        # save_session이 갱신하는 personal_records를 (member_uid, workout_key) 기본키로 한 번에 조회
+        return await crud.get_personal_records(db, member_uid)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error retrieving personal records: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error retrieving personal records: {str(e)}")
+
 @app.get("/api/workout-name/{workout_key}", response_model=schemas.WorkoutName)
 async def get_workout_name(
     workout_key: int = Path(..., title="The workout key"),
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(utils.get_current_user)
 ):
     try:
         workout_name = await crud.get_workout_name(db, workout_key)
@@ -326,11 +385,13 @@ async def get_workout_name(
 @app.get("/api/search-workouts", response_model=List[schemas.WorkoutInfo])
 async def search_workouts(
     workout_name: str = Query(..., description="The name of the workout to search for"),
+    workout_part_id: Optional[int] = Query(None, description="Optional: Only return workouts for this part"),
+    limit: int = Query(20, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(utils.get_current_user)
 ):
     try:
-        workouts = await crud.search_workouts(db, workout_name)
+        workouts = await crud.search_workouts(db, workout_name, workout_part_id, limit)
         if not workouts:
             raise HTTPException(status_code=404, detail="No workouts found")
         
@@ -343,11 +404,19 @@ async def search_workouts(
 
 @app.get("/api/workouts-by-part", response_model=Dict[str, List[schemas.WorkoutInfo]])
 async def get_workouts_by_part(
+    request: Request,
+    response: Response,
     workout_part_id: int = Query(None, description="Optional: Filter by specific workout part ID"),
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    db: AsyncSession = Depends(utils.get_read_db),
+    current_user: dict = Depends(utils.get_current_user)
 ):
     try:
+        # 카탈로그 버전이 같으면 본문도 같다 (DB 조회 없이 304)
+        version = await crud.get_catalog_version(db)
+        not_modified = conditional(request, response, "workouts-by-part", version, workout_part_id)
+        if not_modified:
+            return not_modified
+
         workouts_by_part = await crud.get_workouts_by_part(db, workout_part_id)
         return workouts_by_part
     except HTTPException as he:
@@ -363,7 +432,7 @@ async def get_session_counts(
     start_date: datetime,
     end_date: datetime,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(utils.get_current_user)
 ):
     try:
         # Check if the current user is requesting their own data or if they're a trainer
@@ -379,14 +448,50 @@ async def get_session_counts(
 
         session_counts = await crud.get_session_counts(db, member_uid, start_date, end_date)
         return session_counts
+    except ServiceUnavailableError as e:
+        logger.warning(f"Session counts unavailable: {e.detail}")
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/session_counts/{member_uid}/buckets", response_model=List[schemas.SessionCountBucket])
+async def get_session_count_buckets(
+    request: Request,
+    member_uid: str,
+    start_date: datetime,
+    end_date: datetime,
+    interval: Literal['day', 'week'] = Query('day'),
+    tz: str = Query('UTC', description="IANA time zone used to cut day/week boundaries"),
+    db: AsyncSession = Depends(utils.get_read_db),
+    current_user: dict = Depends(utils.get_current_user)
+):
+    try:
+        try:
+            ZoneInfo(tz)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise HTTPException(status_code=422, detail=f"Unknown time zone: {tz}")
+
+        if current_user['uid'] != member_uid and current_user['role'] != 'trainer':
+            raise HTTPException(status_code=403, detail="Not authorized to access this data")
+
+        if current_user['role'] == 'trainer':
+            token = request.headers.get('Authorization').split(" ")[1]
+            is_mapped = await crud.check_trainer_member_mapping(current_user['uid'], member_uid, token)
+            if not is_mapped:
+                raise HTTPException(status_code=403, detail="Not authorized to access this member's data")
+
+        return await crud.get_session_count_buckets(db, member_uid, start_date, end_date, interval, tz)
+    except HTTPException as he:
+        raise he
     except Exception as e:
+        logger.error(f"Error retrieving session count buckets: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/last-session-update/{uid}")
 async def get_last_session_update(
     uid: str,
     db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(utils.get_current_user)
 ):
     try:
         if current_user['uid'] != uid and current_user['role'] != 'trainer':
@@ -400,40 +505,45 @@ async def get_last_session_update(
 @app.get("/api/trainer/assigned-members-sessions", response_model=List[schemas.SessionWithSets])
 async def get_trainer_assigned_members_sessions(
     request: Request,
-    current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    response: Response,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    per_member_limit: Optional[int] = Query(None, ge=1, description="Keep only each member's most recent sessions"),
+    current_user: dict = Depends(utils.get_current_user),
+    db: AsyncSession = Depends(utils.get_read_db)
 ):
     try:
         if current_user['role'] != 'trainer':
             raise HTTPException(status_code=403, detail="Only trainers can access this endpoint")
 
         token = request.headers.get('Authorization').split(" ")[1]
-        
-        # User Service에서 할당된 멤버 목록 가져오기
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{USER_SERVICE_URL}/api/trainer/{current_user['uid']}/assigned-members",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            response.raise_for_status()
-            assigned_members = response.json()
-
-        all_sessions = []
-        for member in assigned_members:
-            member_sessions = await crud.get_sessions_by_member(db, member['uid'])
-            for session in member_sessions:
-                sets = await crud.get_sets_by_session(db, session.session_id)
-                all_sessions.append(schemas.SessionWithSets(
-                    session_id=session.session_id,
-                    workout_date=session.workout_date,
-                    member_uid=session.member_uid,
-                    trainer_uid=session.trainer_uid,
-                    is_pt=session.is_pt,
-                    session_type_id=session.session_type_id,
-                    sets=[schemas.SetResponse(**set.__dict__) for set in sets]
-                ))
-
-        return all_sessions
+        member_uids = await crud.get_assigned_member_uids(current_user['uid'], token)
+        if not member_uids:
+            return []
+
+        # 담당 회원 전체를 한 번의 member_uid IN (...) 쿼리로 최신순 페이지 조회 (+ 세트 조회 1회)
+        sessions, next_cursor = await crud.get_session_history(
+            db,
+            member_uids=member_uids,
+            start_date=start_date,
+            end_date=end_date,
+            cursor=cursor,
+            limit=limit,
+            per_member_limit=per_member_limit,
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return sessions
+    except ServiceUnavailableError as e:
+        # 차단기 열림은 503(Retry-After), 시간 예산 소진은 504로 그대로 응답
+        logger.warning(f"Assigned members' sessions unavailable: {e.detail}")
+        raise
+    except HTTPException as he:
+        raise he
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error occurred while fetching assigned members: {e}")
         raise HTTPException(status_code=e.response.status_code, detail=f"Error fetching assigned members: {e.response.text}")
@@ -441,51 +551,109 @@ async def get_trainer_assigned_members_sessions(
         logger.error(f"Error fetching assigned members' sessions: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching assigned members' sessions: {str(e)}")
 
-@app.get("/api/session/{session_id}", response_model=schemas.SessionDetail)
-async def get_session_detail(
-    session_id: int,
-    request: Request,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+@app.get("/api/sessions/export")
+async def export_sessions(
+    format: Literal['ndjson', 'csv'] = Query('ndjson'),
+    current_user: dict = Depends(utils.get_current_user)
 ):
-    try:
-        session_detail = await crud.get_session_detail(db, session_id)
-        if not session_detail:
-            raise HTTPException(status_code=404, detail="Session not found")
-
-        # Check authorization
-        if current_user['uid'] != session_detail.member_uid:
-            if current_user['role'] != 'trainer':
-                raise HTTPException(status_code=403, detail="Not authorized to access this session")
-            
-            # If it's a trainer, check if they're assigned to this member
-            token = request.headers.get('Authorization').split(" ")[1]
-            is_assigned = await crud.check_trainer_member_mapping(current_user['uid'], session_detail.member_uid, token)
-            if not is_assigned:
-                raise HTTPException(status_code=403, detail="Not authorized to access this member's session")
-
-        return session_detail
-    except HTTPException as he:
-        raise he
-    except Exception as e:
-        logging.error(f"Error retrieving session detail: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error retrieving session detail: {str(e)}")
+    if current_user['role'] == 'trainer':
+        owner = {"trainer_uid": current_user['uid']}
+    else:  # member
+        owner = {"member_uid": current_user['uid']}
+    session_factory = utils.read_session_factory(current_user['uid'])
+
+    async def body():
+        # DB 세션은 응답 스트림 안에서 열고 닫는다 (yield 의존성은 스트리밍 전에 정리되므로)
+        try:
+            async with session_factory() as db:
+                async for chunk in export.FORMATTERS[format](crud.stream_session_history(db, **owner)):
+                    yield chunk
+        except Exception as e:
+            logger.error(f"Error exporting sessions for {current_user['uid']}: {str(e)}", exc_info=True)
+            raise
+
+    filename = f"sessions-{datetime.utcnow():%Y%m%d}.{format}"
+    return StreamingResponse(
+        body(),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 @app.get("/api/sessions", response_model=List[schemas.SessionWithSets])
 async def get_sessions(
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(utils.get_read_db),
+    current_user: dict = Depends(utils.get_current_user)
 ):
     try:
+        owner = {"trainer_uid" if current_user['role'] == 'trainer' else "member_uid": current_user['uid']}
+        stamp = await crud.get_session_history_stamp(db, **owner)
+        not_modified = conditional(
+            request, response, "sessions", current_user['role'], current_user['uid'], *stamp,
+            start_date, end_date, cursor, limit,
+        )
+        if not_modified:
+            return not_modified
+
         if current_user['role'] == 'trainer':
-            sessions = await crud.get_trainer_sessions(db, current_user['uid'])
+            sessions, next_cursor = await crud.get_session_history(
+                db, trainer_uid=current_user['uid'], start_date=start_date, end_date=end_date, cursor=cursor, limit=limit
+            )
         else:  # member
-            sessions = await crud.get_sessions_by_member(db, current_user['uid'])
+            sessions, next_cursor = await crud.get_session_history(
+                db, member_uid=current_user['uid'], start_date=start_date, end_date=end_date, cursor=cursor, limit=limit
+            )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return sessions
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         logger.error(f"Error fetching sessions: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching sessions")
 
+@app.post("/internal/mapping-replica/events", include_in_schema=False, dependencies=[Depends(verify_internal_token)])
+async def apply_mapping_replica_events(
+    payload: schemas.MappingReplicaEvents,
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        applied = await mapping_replica.apply_events(db, payload.events)
+        return {"applied": applied}
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error applying mapping replica events: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error applying mapping replica events")
+
+@app.post("/internal/mapping-replica/resync", include_in_schema=False, dependencies=[Depends(verify_internal_token)])
+async def resync_mapping_replica(db: AsyncSession = Depends(get_db)):
+    try:
+        return await mapping_replica.resync(db)
+    except Exception as e:
+        logger.error(f"Error resyncing mapping replica: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=502, detail="Error resyncing mapping replica")
+
+@app.get("/internal/metrics", include_in_schema=False, dependencies=[Depends(verify_internal_token)])
+async def get_internal_metrics():
+    return {
+        "http_client": utils.http_client.metrics(),
+        "mapping_cache": mapping_cache.stats(),
+        "session_detail_cache": session_detail_cache.stats(),
+        "read_cache": read_cache.stats(),
+        "catalog": catalog.catalog.stats(),
+        "mapping_replica": {"ready": mapping_replica.state.ready, "last_resync": mapping_replica.state.last_resync},
+        "outbox": outbox.dispatcher.stats(),
+        "db_pool": pool_status(engine),
+        "db_read_pool": pool_status(read_engine) if read_engine is not engine else None,
+        "read_routing": recent_writes.stats(),
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
@@ -0,0 +1,192 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import delete, update, and_, tuple_
+from fastapi_utils.tasks import repeat_every
+from typing import List, Optional, Set, Tuple
+import logging
+import os
+import time
+
+from backend.workout_service import database, models, schemas, utils
+from backend.workout_service.cache import mapping_cache
+from backend.common.internal_auth import internal_headers
+from backend.common.sql import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+RESYNC_INTERVAL = float(os.getenv("MAPPING_REPLICA_RESYNC_INTERVAL", "3600"))
+SNAPSHOT_PAGE_SIZE = 1000
+
+Replica = models.TrainerMemberMapReplica
+
+class ReplicaState:
+    def __init__(self):
+        # 첫 전체 동기화가 끝나기 전에는 로컬 테이블을 신뢰하지 않고 user_service로 폴백
+        self.synced_at: Optional[float] = None
+        self.last_resync: Optional[dict] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.synced_at is not None
+
+state = ReplicaState()
+
+def _upsert_statement(db: AsyncSession):
+    stmt = dialect_insert(db, Replica.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=[Replica.id],
+        set_={
+            "trainer_uid": stmt.excluded.trainer_uid,
+            "member_uid": stmt.excluded.member_uid,
+            "status": stmt.excluded.status,
+            "remaining_sessions": stmt.excluded.remaining_sessions,
+            "source_ts": stmt.excluded.source_ts,
+            "deleted": stmt.excluded.deleted,
+        },
+        # 늦게 도착한(더 오래된) 이벤트가 최신 상태를 덮어쓰지 않도록
+        where=Replica.source_ts <= stmt.excluded.source_ts,
+    )
+
+async def apply_events(db: AsyncSession, events: List[schemas.MappingReplicaEvent]) -> int:
+    """Apply mapping change events from user_service in one transaction."""
+    for event in events:
+        if event.op == "upsert":
+            await db.execute(_upsert_statement(db), [{
+                "id": event.id,
+                "trainer_uid": event.trainer_uid,
+                "member_uid": event.member_uid,
+                "status": event.status,
+                "remaining_sessions": event.remaining_sessions,
+                "source_ts": event.source_ts,
+                "deleted": False,
+            }])
+        elif event.id is not None and event.trainer_uid is not None and event.member_uid is not None:
+            # 로컬에 아직 없는 행이라도 tombstone을 남겨, 이 삭제보다 오래된 스냅샷이 되살리지 못하게 한다
+            await db.execute(_upsert_statement(db), [{
+                "id": event.id,
+                "trainer_uid": event.trainer_uid,
+                "member_uid": event.member_uid,
+                "status": event.status or "deleted",
+                "remaining_sessions": None,
+                "source_ts": event.source_ts,
+                "deleted": True,
+            }])
+        else:
+            conditions = [Replica.source_ts <= event.source_ts]
+            if event.id is not None:
+                conditions.append(Replica.id == event.id)
+            if event.trainer_uid is not None:
+                conditions.append(Replica.trainer_uid == event.trainer_uid)
+            if event.member_uid is not None:
+                conditions.append(Replica.member_uid == event.member_uid)
+            if len(conditions) == 1:
+                raise ValueError("delete event requires id, trainer_uid or member_uid")
+            await db.execute(update(Replica).where(and_(*conditions)).values(deleted=True, source_ts=event.source_ts))
+    await db.commit()
+
+    for event in events:
+        mapping_cache.invalidate(event.trainer_uid, event.member_uid)
+    return len(events)
+
+async def fetch_snapshot() -> Tuple[float, List[dict]]:
+    """Page through user_service's full mapping table. Returns (snapshot_ts, rows)."""
+    url = f"{utils.USER_SERVICE_URL}/internal/trainer-member-mappings"
+    rows = []
+    snapshot_ts = None
+    after_id = 0
+    while True:
+        response = await utils.http_client.get(
+            url, params={"after_id": after_id, "limit": SNAPSHOT_PAGE_SIZE}, headers=internal_headers()
+        )
+        response.raise_for_status()
+        page = response.json()
+        if snapshot_ts is None:
+            snapshot_ts = page["generated_at"]
+        rows.extend(page["mappings"])
+        if page["next_after_id"] is None:
+            return snapshot_ts, rows
+        after_id = page["next_after_id"]
+
+async def resync(db: AsyncSession) -> dict:
+    """Rebuild the replica from a full user_service snapshot, repairing any drift."""
+    snapshot_ts, rows = await fetch_snapshot()
+    snapshot_ids = {row["id"] for row in rows}
+
+    if rows:
+        upsert = _upsert_statement(db)
+        for start in range(0, len(rows), SNAPSHOT_PAGE_SIZE):
+            await db.execute(upsert, [
+                {**row, "source_ts": snapshot_ts, "deleted": False} for row in rows[start:start + SNAPSHOT_PAGE_SIZE]
+            ])
+
+    # 스냅샷 이후 도착한 이벤트로 생긴 행과 tombstone(source_ts가 더 큰 행)은 남겨두고,
+    # 스냅샷보다 오래된 tombstone은 스냅샷이 최신 상태이므로 함께 정리한다
+    existing = await db.execute(select(Replica.id).where(Replica.source_ts < snapshot_ts))
+    stale_ids = [row_id for row_id in existing.scalars().all() if row_id not in snapshot_ids]
+    for start in range(0, len(stale_ids), SNAPSHOT_PAGE_SIZE):
+        await db.execute(delete(Replica).where(Replica.id.in_(stale_ids[start:start + SNAPSHOT_PAGE_SIZE])))
+    await db.commit()
+
+    mapping_cache.invalidate()
+    state.synced_at = time.time()
+    state.last_resync = {"rows": len(rows), "removed": len(stale_ids), "synced_at": state.synced_at}
+    logger.info(f"Mapping replica resynced: {len(rows)} rows, {len(stale_ids)} stale rows removed")
+    return state.last_resync
+
+@repeat_every(seconds=RESYNC_INTERVAL, logger=logger)
+async def resync_periodically():
+    async with database.AsyncSession() as db:
+        await resync(db)
+
+async def is_accepted(trainer_uid: str, member_uid: str) -> Optional[bool]:
+    """Local authorization check. ``None`` means the replica can't answer and the caller should fall back."""
+    if not state.ready:
+        return None
+    try:
+        async with database.AsyncSession() as db:
+            result = await db.execute(
+                select(Replica.id).where(
+                    Replica.trainer_uid == trainer_uid,
+                    Replica.member_uid == member_uid,
+                    Replica.status == "accepted",
+                    Replica.deleted.is_(False),
+                ).limit(1)
+            )
+            return result.scalar_one_or_none() is not None
+    except Exception as e:
+        logger.error(f"Error reading mapping replica: {str(e)}")
+        return None
+
+async def accepted_pairs(pairs: List[Tuple[str, str]]) -> Optional[Set[Tuple[str, str]]]:
+    if not state.ready:
+        return None
+    try:
+        async with database.AsyncSession() as db:
+            result = await db.execute(
+                select(Replica.trainer_uid, Replica.member_uid).where(
+                    tuple_(Replica.trainer_uid, Replica.member_uid).in_(pairs),
+                    Replica.status == "accepted",
+                    Replica.deleted.is_(False),
+                )
+            )
+            return {tuple(row) for row in result.all()}
+    except Exception as e:
+        logger.error(f"Error reading mapping replica: {str(e)}")
+        return None
+
+async def get_assigned_member_uids(trainer_uid: str) -> Optional[List[str]]:
+    if not state.ready:
+        return None
+    try:
+        async with database.AsyncSession() as db:
+            result = await db.execute(
+                select(Replica.member_uid).where(
+                    Replica.trainer_uid == trainer_uid,
+                    Replica.status == "accepted",
+                    Replica.deleted.is_(False),
+                ).order_by(Replica.member_uid)
+            )
+            return list(result.scalars().all())
+    except Exception as e:
+        logger.error(f"Error reading mapping replica: {str(e)}")
+        return None
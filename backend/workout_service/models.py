@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum, Boolean, DateTime, UniqueConstraint, ForeignKeyConstraint
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum, Boolean, DateTime, UniqueConstraint, ForeignKeyConstraint, Index, JSON
 from sqlalchemy.orm import relationship, declarative_base
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, false
+from backend.common.sql import clock_timestamp
 from enum import Enum as PyEnum
 
 Base = declarative_base()
@@ -38,6 +39,17 @@ class WorkoutKeyNameMap(Base):
     workout_part = relationship('WorkoutParts', back_populates='workout_keys')
     sessions = relationship('Session', back_populates='workout_key_name_map')
 
+class CatalogVersion(Base):
+    """Single-row stamp bumped (by a DB trigger) whenever a catalog table changes.
+
+    ``catalog.WorkoutCatalog`` compares it to the version it loaded and only
+    reloads the reference tables when it has moved.
+    """
+    __tablename__ = 'catalog_version'
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
 class SessionIDMap(Base):
     __tablename__ = "session_id_mapping"
     session_id = Column(Integer, primary_key=True, index=True)
@@ -47,10 +59,17 @@ class SessionIDMap(Base):
     trainer_uid = Column(String, nullable=True)
     is_pt = Column(Boolean, nullable=False)
     quest_id = Column(Integer, ForeignKey('quests.quest_id'), nullable=True)
+    # 세션/세트가 바뀔 때마다 갱신 (기록 조회 ETag의 버전 스탬프)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=clock_timestamp(), nullable=False)
     # Relationships
     sessions = relationship('Session', back_populates='session_id_map')
     quest = relationship('Quest', back_populates='sessions')
 
+    __table_args__ = (
+        Index('ix_session_id_mapping_member_date', 'member_uid', 'workout_date'),
+        Index('ix_session_id_mapping_trainer_date', 'trainer_uid', 'workout_date'),
+    )
+
 class SessionTypeMap(Base):
     __tablename__ = "session_type_map"
     session_type_id = Column(Integer, primary_key=True, index=True)
@@ -68,6 +87,24 @@ class Session(Base):
     session_id_map = relationship('SessionIDMap', back_populates='sessions')
     workout_key_name_map = relationship('WorkoutKeyNameMap', back_populates='sessions')
     
+class PersonalRecord(Base):
+    """A member's best results for one exercise, across all saved session sets.
+
+    Maintained by ``save_session`` in the same transaction as the sets; each
+    best keeps the session it was set in. Estimated 1RM uses the Epley formula.
+    """
+    __tablename__ = 'personal_records'
+    member_uid = Column(String, primary_key=True)
+    workout_key = Column(Integer, ForeignKey('workout_key_name_map.workout_key_id'), primary_key=True)
+    best_weight = Column(Float, nullable=False)
+    best_weight_reps = Column(Integer, nullable=False)  # 최고 중량에서의 최다 반복
+    best_weight_session_id = Column(Integer, nullable=False)
+    best_e1rm = Column(Float, nullable=False)
+    best_e1rm_session_id = Column(Integer, nullable=False)
+    best_volume = Column(Float, nullable=False)  # 한 세션 안에서의 중량 x 반복 합
+    best_volume_session_id = Column(Integer, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=clock_timestamp(), nullable=False)
+
 class Quest(Base):
     __tablename__ = 'quests'
     quest_id = Column(Integer, primary_key=True, autoincrement=True)
@@ -75,10 +112,16 @@ class Quest(Base):
     member_uid = Column(String, nullable=False)
     status = Column(Enum(QuestStatus), default=QuestStatus.NOT_STARTED) 
     workout_date = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=clock_timestamp(), nullable=False)
     # Relationships
     workouts = relationship('QuestWorkout', back_populates='quest', cascade="all, delete-orphan")
     sessions = relationship('SessionIDMap', back_populates='quest')
 
+    __table_args__ = (
+        Index('ix_quests_member_status', 'member_uid', 'status'),
+        Index('ix_quests_trainer_member', 'trainer_uid', 'member_uid'),
+    )
+
 class QuestWorkout(Base):
     __tablename__ = 'quest_workouts'
     quest_id = Column(Integer, ForeignKey('quests.quest_id'), primary_key=True)
@@ -107,4 +150,49 @@ class QuestWorkoutSet(Base):
             ['quest_workouts.quest_id', 'quest_workouts.workout_key'],
             name='fk_quest_workout_set_workout'
         ),
-    )
\ No newline at end of file
+    )
+
+class TrainerMemberMapReplica(Base):
+    """Read-only copy of user_service's trainer_member_mapping.
+
+    Rows are written only by replica events from user_service and the periodic
+    resync; ``source_ts`` is the user_service timestamp of the change that
+    produced the row, so late or duplicated events never overwrite newer state.
+    Deletes leave a ``deleted`` tombstone carrying their ``source_ts`` so an
+    older snapshot can't bring the mapping back; resync purges tombstones once
+    a newer snapshot no longer lists the row.
+    """
+    __tablename__ = 'trainer_member_mapping_replica'
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    trainer_uid = Column(String, nullable=False)
+    member_uid = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    remaining_sessions = Column(Integer, nullable=True)
+    source_ts = Column(Float, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    __table_args__ = (
+        Index('ix_tmm_replica_trainer_member_status', 'trainer_uid', 'member_uid', 'status'),
+    )
+
+class OutboxEvent(Base):
+    """Side effects for other services, written in the same transaction as the change that causes them.
+
+    ``outbox.dispatcher`` delivers pending rows in batches; ``idempotency_key``
+    is unique so the same logical event is only ever enqueued once, and the
+    receiver uses it to ignore redeliveries.
+    """
+    __tablename__ = 'outbox_events'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    idempotency_key = Column(String, nullable=False, unique=True)
+    event_type = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('ix_outbox_events_pending', 'delivered_at', 'next_attempt_at'),
+    )
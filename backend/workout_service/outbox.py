@@ -0,0 +1,199 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import update, delete
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import os
+import time
+
+from backend.workout_service import database, models, utils
+from backend.common.internal_auth import internal_headers
+from backend.common.sql import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+PT_SESSION_DECREMENT = "pt_session_decrement"
+
+# 이벤트 종류별 user_service 수신 엔드포인트
+EVENT_ENDPOINTS = {
+    PT_SESSION_DECREMENT: "/internal/remaining-sessions/adjustments",
+}
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def pt_decrement_key(session_id: int) -> str:
+    return f"session:{session_id}:pt-decrement"
+
+async def enqueue(db: AsyncSession, idempotency_key: str, event_type: str, payload: dict):
+    """Add an event to the outbox as part of the caller's transaction (no-op if the key already exists)."""
+    stmt = dialect_insert(db, models.OutboxEvent.__table__).values(
+        idempotency_key=idempotency_key,
+        event_type=event_type,
+        payload=payload,
+        attempts=0,
+        next_attempt_at=_utcnow(),
+    ).on_conflict_do_nothing(index_elements=[models.OutboxEvent.idempotency_key])
+    await db.execute(stmt)
+
+class OutboxDispatcher:
+    """Background task that delivers pending outbox events to user_service in batches.
+
+    Rows are claimed by pushing ``next_attempt_at`` forward by ``lease_seconds``
+    in a short transaction, so no connection or row lock is held while the
+    HTTP call is in flight and several workers can dispatch side by side.
+    Failed batches are retried with exponential backoff.
+    """
+
+    def __init__(self, batch_size: int = 100, interval: float = 5, lease_seconds: float = 60,
+                 max_backoff: float = 300, retention_hours: float = 24 * 7):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.lease_seconds = lease_seconds
+        self.max_backoff = max_backoff
+        self.retention_hours = retention_hours
+        self.delivered = 0
+        self.failed = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._last_purge = 0.0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            batch_size=int(os.getenv("OUTBOX_BATCH_SIZE", "100")),
+            interval=float(os.getenv("OUTBOX_DISPATCH_INTERVAL", "5")),
+            retention_hours=float(os.getenv("OUTBOX_RETENTION_HOURS", str(24 * 7))),
+        )
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self):
+        """Wake the dispatcher right away instead of waiting for the next poll."""
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                claimed = await self.dispatch_once()
+                await self._purge_delivered()
+            except Exception as e:
+                logger.error(f"Outbox dispatch failed: {str(e)}", exc_info=True)
+                claimed = 0
+            if claimed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def dispatch_once(self) -> int:
+        async with database.AsyncSession() as db:
+            events = await self._claim_batch(db)
+        if not events:
+            return 0
+
+        by_type: Dict[str, List[models.OutboxEvent]] = defaultdict(list)
+        for event in events:
+            by_type[event.event_type].append(event)
+        for event_type, typed_events in by_type.items():
+            await self._deliver(event_type, typed_events)
+        return len(events)
+
+    async def _claim_batch(self, db: AsyncSession) -> List[models.OutboxEvent]:
+        now = _utcnow()
+        result = await db.execute(
+            select(models.OutboxEvent)
+            .where(models.OutboxEvent.delivered_at.is_(None), models.OutboxEvent.next_attempt_at <= now)
+            .order_by(models.OutboxEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        events = result.scalars().all()
+        for event in events:
+            event.next_attempt_at = now + timedelta(seconds=self.lease_seconds)
+        await db.commit()
+        return events
+
+    async def _deliver(self, event_type: str, events: List[models.OutboxEvent]):
+        ids = [event.id for event in events]
+        try:
+            path = EVENT_ENDPOINTS[event_type]
+            response = await utils.http_client.post(
+                f"{utils.USER_SERVICE_URL}{path}",
+                json={"events": [{"idempotency_key": event.idempotency_key, **event.payload} for event in events]},
+                headers=internal_headers(),
+            )
+            response.raise_for_status()
+            results = {result["idempotency_key"]: result["status"] for result in response.json()["results"]}
+        except Exception as e:
+            await self._mark_failed(events, str(e))
+            return
+
+        async with database.AsyncSession() as db:
+            await db.execute(
+                update(models.OutboxEvent)
+                .where(models.OutboxEvent.id.in_(ids))
+                .values(delivered_at=_utcnow())
+            )
+            for event in events:
+                status = results.get(event.idempotency_key)
+                if status not in ("applied", "duplicate"):
+                    # 재시도해도 결과가 같으므로 전달 완료로 처리하고 원인만 남긴다
+                    logger.warning(f"Outbox event {event.idempotency_key} was not applied: {status}")
+                    await db.execute(
+                        update(models.OutboxEvent)
+                        .where(models.OutboxEvent.id == event.id)
+                        .values(last_error=f"not applied: {status}")
+                    )
+            await db.commit()
+        self.delivered += len(events)
+
+    async def _mark_failed(self, events: List[models.OutboxEvent], error: str):
+        self.failed += len(events)
+        logger.warning(f"Failed to deliver {len(events)} outbox events: {error}")
+        now = _utcnow()
+        async with database.AsyncSession() as db:
+            for event in events:
+                backoff = min(2 ** (event.attempts + 1), self.max_backoff)
+                await db.execute(
+                    update(models.OutboxEvent)
+                    .where(models.OutboxEvent.id == event.id)
+                    .values(
+                        attempts=models.OutboxEvent.attempts + 1,
+                        next_attempt_at=now + timedelta(seconds=backoff),
+                        last_error=error[:500],
+                    )
+                )
+            await db.commit()
+
+    async def _purge_delivered(self):
+        if time.monotonic() - self._last_purge < 3600:
+            return
+        self._last_purge = time.monotonic()
+        cutoff = _utcnow() - timedelta(hours=self.retention_hours)
+        async with database.AsyncSession() as db:
+            await db.execute(
+                delete(models.OutboxEvent)
+                .where(models.OutboxEvent.delivered_at.is_not(None), models.OutboxEvent.delivered_at < cutoff)
+            )
+            await db.commit()
+
+    def stats(self) -> dict:
+        return {"delivered": self.delivered, "failed": self.failed}
+
+dispatcher = OutboxDispatcher.from_env()
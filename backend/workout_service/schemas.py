@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, List, Dict
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
+from typing import Optional, List, Dict, Literal
 from datetime import date, datetime
 from enum import Enum
 
@@ -88,7 +88,8 @@ class Quest(BaseModel):
     trainer_uid: str
     member_uid: str
     status: QuestStatus
-    created_at: datetime
+    # ORM Quest에는 created_at이 없으므로 workout_date에서 채운다
+    created_at: datetime = Field(validation_alias=AliasChoices("created_at", "workout_date"))
     workouts: List[QuestWorkout]
 
     class ConfigDict(ConfigDict):
@@ -129,6 +130,20 @@ class SessionSave(BaseModel):
     session_id: int
     exercises: List[ExerciseSave]
         
+class PersonalRecord(BaseModel):
+    workout_key: int
+    workout_name: Optional[str] = None
+    best_weight: float
+    best_weight_reps: int
+    best_weight_session_id: int
+    best_e1rm: float  # 추정 1RM (Epley)
+    best_e1rm_session_id: int
+    best_volume: float  # 한 세션 안의 중량 x 반복 합
+    best_volume_session_id: int
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
 class SessionSaveResponse(BaseModel):
     session_id: int
     workout_date: datetime
@@ -172,4 +187,26 @@ class SessionDetail(BaseModel):
     session_type: str
     workouts: List[WorkoutDetail]
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class SessionCounts(BaseModel):
+    ai_sessions: int = 0
+    custom_sessions: int = 0
+    quest_sessions: int = 0
+    pt_sessions: int = 0
+
+class SessionCountBucket(SessionCounts):
+    # 요청한 타임존 기준 일/주(월요일 시작)의 시작 시각
+    bucket_start: datetime
+
+class MappingReplicaEvent(BaseModel):
+    op: Literal["upsert", "delete"]
+    id: Optional[int] = None
+    trainer_uid: Optional[str] = None
+    member_uid: Optional[str] = None
+    status: Optional[str] = None
+    remaining_sessions: Optional[int] = None
+    source_ts: float
+
+class MappingReplicaEvents(BaseModel):
+    events: List[MappingReplicaEvent]
@@ -0,0 +1,166 @@
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import re
+
+# 오타 허용 기준 (pg_trgm 기본값과 같은 trigram 유사도)
+SIMILARITY_THRESHOLD = 0.3
+
+# 순위 구간: 낮을수록 먼저
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(5)
+
+# 편집 한 번(인접 문자 교환 포함)이 바꿀 수 있는 bigram 수의 상한
+GRAMS_PER_EDIT = 3
+
+def normalize(text: str) -> str:
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+def trigrams(text: str) -> Set[str]:
+    """pg_trgm-style trigrams: each word is padded with two leading and one trailing space."""
+    grams = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def leading_bigrams(word: str) -> Set[str]:
+    """Bigrams of ``word`` padded in front only, so a word's set contains those of each of its prefixes."""
+    padded = f" {word}"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+def _typo_budget(token: str) -> int:
+    # 짧은 단어는 오타 허용 없음, 4자 이상 1개, 8자 이상 2개
+    return 2 if len(token) >= 8 else 1 if len(token) >= 4 else 0
+
+def edit_distance(a: str, b: str) -> int:
+    """Optimal string alignment distance (insert/delete/substitute/swap adjacent)."""
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[len(b)]
+
+def _token_matches(token: str, word: str) -> bool:
+    if word.startswith(token):
+        return True
+    budget = _typo_budget(token)
+    if not budget or len(word) < len(token) - budget:
+        return False
+    # 단어 전체 또는 (자동완성 중인) 같은 길이의 접두어와 비교
+    if abs(len(word) - len(token)) <= budget and edit_distance(token, word) <= budget:
+        return True
+    return edit_distance(token, word[:len(token)]) <= budget
+
+class WorkoutSearchIndex:
+    """Trigram inverted index over workout names.
+
+    Candidates are the names sharing at least one trigram with the query;
+    each is ranked by how it matches (exact, prefix, every query word a
+    word prefix, substring, then typo-tolerant: trigram similarity or every
+    query word within a small edit distance of a name word) and by
+    similarity within a tier. Built once per catalog load and read-only
+    afterwards.
+    """
+
+    def __init__(self, entries: Iterable):
+        self._entries = {entry.workout_key: entry for entry in entries}
+        self._names: Dict[int, str] = {key: normalize(entry.workout_name) for key, entry in self._entries.items()}
+        self._grams: Dict[int, Set[str]] = {key: trigrams(name) for key, name in self._names.items()}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        for key, grams in self._grams.items():
+            for gram in grams:
+                self._postings[gram].add(key)
+        # 단어 사전: 접두어/오타 비교는 이름마다가 아니라 서로 다른 단어마다 한 번만
+        self._words: Dict[str, Set[int]] = defaultdict(set)
+        for key, name in self._names.items():
+            for word in name.split():
+                self._words[word].add(key)
+        # 접두어는 정렬된 단어 목록에서 이진 탐색, 오타 후보는 단어 단위 bigram postings로 거른다
+        self._sorted_words = sorted(self._words)
+        self._word_postings: Dict[str, Set[str]] = defaultdict(set)
+        self._words_by_length: Dict[int, List[str]] = defaultdict(list)
+        for word in self._sorted_words:
+            self._words_by_length[len(word)].append(word)
+            for gram in leading_bigrams(word):
+                self._word_postings[gram].add(word)
+
+    def _prefixed_words(self, token: str) -> List[str]:
+        words = []
+        for word in self._sorted_words[bisect_left(self._sorted_words, token):]:
+            if not word.startswith(token):
+                break
+            words.append(word)
+        return words
+
+    def _typo_candidates(self, token: str) -> Iterable[str]:
+        """Words that may be within the typo budget of ``token`` (never drops a real match).
+
+        A word within ``budget`` edits of the token, or with a prefix that is,
+        still shares all but ``GRAMS_PER_EDIT * budget`` of the token's
+        bigrams, so only words reaching that count need an edit distance.
+        (Trigrams would lose up to four per edit, too many for 8-letter words.)
+        """
+        budget = _typo_budget(token)
+        if not budget:
+            return ()
+        grams = leading_bigrams(token)
+        required = len(grams) - GRAMS_PER_EDIT * budget
+        if required <= 0:
+            # 거를 수 없을 만큼 짧으면 길이로만 거른다 (현재 오타 기준에서는 생기지 않음)
+            return [word for length, words in self._words_by_length.items() if length >= len(token) - budget for word in words]
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._word_postings.get(gram, ()))
+        return [word for word, count in shared.items() if count >= required]
+
+    def _keys_matching(self, token: str, typo_tolerant: bool) -> Set[int]:
+        words = set(self._prefixed_words(token))
+        if typo_tolerant:
+            words.update(word for word in self._typo_candidates(token) if word not in words and _token_matches(token, word))
+        keys = set()
+        for word in words:
+            keys |= self._words[word]
+        return keys
+
+    def search(self, term: str, workout_part_id: Optional[int] = None, limit: Optional[int] = None) -> List:
+        query = normalize(term)
+        if not query:
+            return []
+        tokens = query.split()
+        query_grams = trigrams(query)
+        # 모든 검색어 단어가 어떤 단어의 접두어인 이름 / 오타 범위 안에서 일치하는 이름
+        word_prefix = set.intersection(*(self._keys_matching(token, False) for token in tokens))
+        typo_match = set.intersection(*(self._keys_matching(token, True) for token in tokens))
+
+        candidates = set(typo_match)
+        for gram in query_grams:
+            candidates |= self._postings.get(gram, set())
+
+        ranked = []
+        for key in candidates:
+            entry = self._entries[key]
+            if workout_part_id is not None and entry.workout_part_id != workout_part_id:
+                continue
+            name = self._names[key]
+            grams = self._grams[key]
+            similarity = len(query_grams & grams) / len(query_grams | grams)
+            if name == query:
+                tier = EXACT
+            elif name.startswith(query):
+                tier = PREFIX
+            elif key in word_prefix:
+                tier = WORD_PREFIX
+            elif query in name:
+                tier = SUBSTRING
+            elif key in typo_match or similarity >= SIMILARITY_THRESHOLD:
+                tier = FUZZY
+            else:
+                continue
+            ranked.append(((tier, -similarity, len(name), name), entry))
+        ranked.sort(key=lambda item: item[0])
+        return [entry for _, entry in ranked[:limit]]
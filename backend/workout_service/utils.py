@@ -1,59 +1,169 @@
-from firebase_admin import auth
-from cachetools import TTLCache
-from datetime import timedelta
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from .database import get_db
-from sqlalchemy.ext.asyncio import AsyncSession
+from cachetools import TLRUCache
+from cryptography import x509
+from fastapi import Depends, Header, HTTPException, status
+from typing import Dict, Optional
+import asyncio
+import hashlib
+import jwt
 import logging
+import os
+import re
+import time
 import httpx
+from backend.common.http_client import ServiceHTTPClient
+from backend.workout_service import database
+from backend.workout_service.cache import recent_writes
 
 # User Service URL
 USER_SERVICE_URL = "http://localhost:8000"  # User Service의 URL로 변경하세요
 
-# 토큰 검증 결과를 캐시하기 위한 TTLCache 설정
-token_cache = TTLCache(maxsize=1000, ttl=timedelta(minutes=5).total_seconds())
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# 서비스 간 호출에 공유되는 커넥션 풀 (main.py lifespan에서 열고 닫음)
+http_client = ServiceHTTPClient.from_env()
+
+# Firebase ID 토큰 서명용 Google 공개 인증서
+FIREBASE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+FIREBASE_PROJECT_ID = os.getenv("FIREBASE_PROJECT_ID")
+# Cache-Control max-age가 없을 때의 인증서 유효 시간, 모르는 kid로 인한 강제 갱신 최소 간격
+FIREBASE_CERTS_DEFAULT_MAX_AGE = 3600
+FIREBASE_CERTS_FORCED_REFRESH_INTERVAL = float(os.getenv("FIREBASE_CERTS_FORCED_REFRESH_INTERVAL", "30"))
 
 # 로깅 설정
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', filename='app.log', filemode='a')
 logger = logging.getLogger(__name__)
 
+class FirebaseTokenVerifier:
+    """Verifies Firebase ID tokens without blocking the event loop.
+
+    Google's signing certificates are kept in process and only refetched once
+    their Cache-Control max-age has elapsed (or when a token references a key
+    id we have not seen yet - at most once per ``forced_refresh_interval``, so
+    tokens with made-up key ids cannot drive outbound fetches; others fail
+    fast). Verified claims are cached under a SHA-256 digest of the token
+    until the token's own ``exp``.
+    """
+
+    def __init__(self, project_id: Optional[str], certs_url: str = FIREBASE_CERTS_URL,
+                 cache_size: int = 10000, clock_skew_seconds: int = 0,
+                 forced_refresh_interval: float = FIREBASE_CERTS_FORCED_REFRESH_INTERVAL):
+        self.project_id = project_id
+        self.certs_url = certs_url
+        self.clock_skew_seconds = clock_skew_seconds
+        self.forced_refresh_interval = forced_refresh_interval
+        self._public_keys: Dict[str, object] = {}
+        self._keys_expire_at = 0.0
+        self._last_forced_refresh = float("-inf")
+        self._keys_lock = asyncio.Lock()
+        # 토큰별 만료 시각(exp)까지만 유지되는 캐시
+        self._claims_cache = TLRUCache(maxsize=cache_size, ttu=lambda _key, claims, _now: claims["exp"], timer=time.time)
+
+    @staticmethod
+    def _cache_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    def _parse_max_age(cache_control: Optional[str]) -> int:
+        match = re.search(r"max-age=(\d+)", cache_control or "")
+        return int(match.group(1)) if match else FIREBASE_CERTS_DEFAULT_MAX_AGE
+
+    def _forced_refresh_allowed(self) -> bool:
+        return time.monotonic() - self._last_forced_refresh >= self.forced_refresh_interval
+
+    async def _refresh_public_keys(self, force: bool = False):
+        async with self._keys_lock:
+            if force:
+                # 대기 중에 다른 요청이 이미 강제 갱신했으면 다시 가져오지 않는다
+                if not self._forced_refresh_allowed():
+                    return
+                self._last_forced_refresh = time.monotonic()
+            elif time.time() < self._keys_expire_at:
+                return
+            async with httpx.AsyncClient() as client:
+                response = await client.get(self.certs_url)
+                response.raise_for_status()
+            certificates = response.json()
+            self._public_keys = {
+                kid: x509.load_pem_x509_certificate(cert.encode()).public_key()
+                for kid, cert in certificates.items()
+            }
+            max_age = self._parse_max_age(response.headers.get("Cache-Control"))
+            self._keys_expire_at = time.time() + max_age
+            logger.info(f"Refreshed {len(self._public_keys)} Firebase signing keys, valid for {max_age}s")
+
+    async def _get_public_key(self, kid: str):
+        await self._refresh_public_keys()
+        if kid not in self._public_keys and self._forced_refresh_allowed():
+            # 키 교체 직후일 수 있으므로 강제로 다시 가져온다 (최소 간격 안에서는 바로 실패)
+            await self._refresh_public_keys(force=True)
+        return self._public_keys.get(kid)
+
+    async def verify(self, token: str) -> dict:
+        cache_key = self._cache_key(token)
+        cached_claims = self._claims_cache.get(cache_key)
+        if cached_claims is not None:
+            return cached_claims
+
+        header = jwt.get_unverified_header(token)
+        if header.get("alg") != "RS256" or not header.get("kid"):
+            raise jwt.InvalidTokenError("Unexpected token header")
+
+        public_key = await self._get_public_key(header["kid"])
+        if public_key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key: {header['kid']}")
+
+        claims = jwt.decode(
+            token,
+            public_key,
+            algorithms=["RS256"],
+            audience=self.project_id,
+            issuer=f"https://securetoken.google.com/{self.project_id}",
+            leeway=self.clock_skew_seconds,
+            options={"require": ["exp", "iat", "sub"]},
+        )
+        if not claims.get("sub"):
+            raise jwt.InvalidTokenError("Token has an empty subject")
+        # firebase_admin.auth.verify_id_token과 동일하게 uid 필드를 채운다
+        claims["uid"] = claims["sub"]
+
+        self._claims_cache[cache_key] = claims
+        return claims
+
+token_verifier = FirebaseTokenVerifier(FIREBASE_PROJECT_ID)
+
 async def verify_token(token: str):
-    if token in token_cache:
-        return token_cache[token]
-    
     try:
-        decoded_token = auth.verify_id_token(token)
-        token_cache[token] = decoded_token
-        return decoded_token
+        return await token_verifier.verify(token)
     except Exception as e:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials", headers={"WWW-Authenticate": "Bearer"})
+        logger.error(f"Error verifying token: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token", headers={"WWW-Authenticate": "Bearer"})
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    try:
-        decoded_token = await verify_token(token)
-        uid = decoded_token.get("uid")
-        user_type = decoded_token.get("role")
-        
-        logging.info(f"Decoded token: {decoded_token}")
-        logging.info(f"UID from token: {uid}")
-        logging.info(f"User type from token: {user_type}")
-        
-        if uid is None or user_type is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
-        # User Service API를 호출하여 사용자 정보 가져오기
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{USER_SERVICE_URL}/api/{user_type}s/byuid/{uid}", headers={"Authorization": f"Bearer {token}"})
-        
-        if response.status_code != 200:
-            raise HTTPException(status_code=401, detail="User not found or unauthorized")
-        
-        user_data = response.json()
-        logging.info(f"User data from User Service: {user_data}")
-        
-        return user_data, user_type
-    except Exception as e:
-        logging.error(f"Error in get_current_user: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=401, detail=str(e))
\ No newline at end of file
+async def get_current_user(authorization: str = Header(...)):
+    if not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Invalid authorization header")
+    token = authorization.split(" ")[1]
+    return await verify_token(token)
+
+def read_session_factory(uid: str):
+    # 최근에 쓰기를 한 사용자는 복제 지연을 피하기 위해 primary에서 읽는다
+    if recent_writes.is_pinned(uid):
+        return database.AsyncSession
+    return database.ReadAsyncSession
+
+async def get_read_db(current_user: dict = Depends(get_current_user)):
+    async with read_session_factory(current_user['uid'])() as session:
+        yield session
+
+async def get_user_profile(uid: str, user_type: str, token: str):
+    # User Service API를 호출하여 사용자 정보 가져오기
+    response = await http_client.get(
+        f"{USER_SERVICE_URL}/api/{user_type}s/byuid/{uid}",
+        headers={"Authorization": f"Bearer {token}"},
+        endpoint=f"{user_type}s_byuid",
+        hedge=True
+    )
+
+    if response.status_code != 200:
+        raise HTTPException(status_code=401, detail="User not found or unauthorized")
+
+    user_data = response.json()
+    logging.info(f"User data from User Service: {user_data}")
+    return user_data
@@ -0,0 +1,30 @@
+"""processed events
+
+Revision ID: 4c9d2e7b1f08
+Revises: 9620d7dcc16d
+Create Date: 2026-10-16 11:06:52.914360
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c9d2e7b1f08'
+down_revision: Union[str, None] = '9620d7dcc16d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('processed_events',
+    sa.Column('idempotency_key', sa.String(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('idempotency_key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('processed_events')
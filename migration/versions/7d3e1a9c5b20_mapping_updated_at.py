@@ -0,0 +1,26 @@
+"""trainer member mapping updated_at
+
+Revision ID: 7d3e1a9c5b20
+Revises: e2a7b5c90d14
+Create Date: 2026-10-16 17:06:40.912573
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3e1a9c5b20'
+down_revision: Union[str, None] = 'e2a7b5c90d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('trainer_member_mapping', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('trainer_member_mapping', 'updated_at')
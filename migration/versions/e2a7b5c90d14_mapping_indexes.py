@@ -0,0 +1,44 @@
+"""trainer member mapping indexes
+
+Revision ID: e2a7b5c90d14
+Revises: 4c9d2e7b1f08
+Create Date: 2026-10-16 13:45:31.074862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7b5c90d14'
+down_revision: Union[str, None] = '4c9d2e7b1f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 유니크 제약 전에 중복 쌍 정리: accepted > pending > expired 순, 같으면 최신 id를 남긴다
+    op.execute("""
+        DELETE FROM trainer_member_mapping
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY trainer_uid, member_uid
+                    ORDER BY CASE status WHEN 'accepted' THEN 0 WHEN 'pending' THEN 1 ELSE 2 END, id DESC
+                ) AS rn
+                FROM trainer_member_mapping
+            ) ranked
+            WHERE ranked.rn > 1
+        )
+    """)
+    op.create_unique_constraint('uq_trainer_member_mapping_pair', 'trainer_member_mapping', ['trainer_uid', 'member_uid'])
+    op.create_index('ix_trainer_member_mapping_member_status', 'trainer_member_mapping', ['member_uid', 'status'], unique=False)
+    op.create_index('ix_trainer_member_mapping_trainer_status', 'trainer_member_mapping', ['trainer_uid', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trainer_member_mapping_trainer_status', table_name='trainer_member_mapping')
+    op.drop_index('ix_trainer_member_mapping_member_status', table_name='trainer_member_mapping')
+    op.drop_constraint('uq_trainer_member_mapping_pair', 'trainer_member_mapping', type_='unique')
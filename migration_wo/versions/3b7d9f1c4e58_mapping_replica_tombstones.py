@@ -0,0 +1,27 @@
+"""mapping replica tombstones
+
+Revision ID: 3b7d9f1c4e58
+Revises: 9e4a7c2d1b63
+Create Date: 2026-10-16 21:04:37.615220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d9f1c4e58'
+down_revision: Union[str, None] = '9e4a7c2d1b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('trainer_member_mapping_replica', sa.Column('deleted', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM trainer_member_mapping_replica WHERE deleted")
+    op.drop_column('trainer_member_mapping_replica', 'deleted')
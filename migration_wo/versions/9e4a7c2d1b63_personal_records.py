@@ -0,0 +1,82 @@
+"""personal records
+
+Revision ID: 9e4a7c2d1b63
+Revises: f2b6d08e4c91
+Create Date: 2026-10-16 18:12:55.207341
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4a7c2d1b63'
+down_revision: Union[str, None] = 'f2b6d08e4c91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('personal_records',
+    sa.Column('member_uid', sa.String(), nullable=False),
+    sa.Column('workout_key', sa.Integer(), nullable=False),
+    sa.Column('best_weight', sa.Float(), nullable=False),
+    sa.Column('best_weight_reps', sa.Integer(), nullable=False),
+    sa.Column('best_weight_session_id', sa.Integer(), nullable=False),
+    sa.Column('best_e1rm', sa.Float(), nullable=False),
+    sa.Column('best_e1rm_session_id', sa.Integer(), nullable=False),
+    sa.Column('best_volume', sa.Float(), nullable=False),
+    sa.Column('best_volume_session_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['workout_key'], ['workout_key_name_map.workout_key_id'], ),
+    sa.PrimaryKeyConstraint('member_uid', 'workout_key')
+    )
+    # 기존 세션 세트로 채우기 (동률이면 먼저 세운 세션, crud._update_personal_records와 같은 규칙)
+    op.execute("""
+        INSERT INTO personal_records (
+            member_uid, workout_key,
+            best_weight, best_weight_reps, best_weight_session_id,
+            best_e1rm, best_e1rm_session_id,
+            best_volume, best_volume_session_id
+        )
+        WITH sets AS (
+            SELECT m.member_uid, s.workout_key, s.session_id, m.workout_date, s.weight, s.reps,
+                   CASE WHEN s.reps <= 1 THEN s.weight ELSE s.weight * (1 + s.reps / 30.0) END AS e1rm
+            FROM session s
+            JOIN session_id_mapping m ON m.session_id = s.session_id
+            WHERE s.reps > 0
+        ),
+        by_weight AS (
+            SELECT DISTINCT ON (member_uid, workout_key) member_uid, workout_key, weight, reps, session_id
+            FROM sets
+            ORDER BY member_uid, workout_key, weight DESC, reps DESC, workout_date, session_id
+        ),
+        by_e1rm AS (
+            SELECT DISTINCT ON (member_uid, workout_key) member_uid, workout_key, e1rm, session_id
+            FROM sets
+            ORDER BY member_uid, workout_key, e1rm DESC, workout_date, session_id
+        ),
+        volumes AS (
+            SELECT member_uid, workout_key, session_id, workout_date, sum(weight * reps) AS volume
+            FROM sets
+            GROUP BY member_uid, workout_key, session_id, workout_date
+        ),
+        by_volume AS (
+            SELECT DISTINCT ON (member_uid, workout_key) member_uid, workout_key, volume, session_id
+            FROM volumes
+            ORDER BY member_uid, workout_key, volume DESC, workout_date, session_id
+        )
+        SELECT w.member_uid, w.workout_key,
+               w.weight, w.reps, w.session_id,
+               e.e1rm, e.session_id,
+               v.volume, v.session_id
+        FROM by_weight w
+        JOIN by_e1rm e ON e.member_uid = w.member_uid AND e.workout_key = w.workout_key
+        JOIN by_volume v ON v.member_uid = w.member_uid AND v.workout_key = w.workout_key
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('personal_records')
@@ -0,0 +1,32 @@
+"""hot query indexes
+
+Revision ID: a8c41f7e92d0
+Revises: d3f85a1c6e27
+Create Date: 2026-10-16 13:42:07.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c41f7e92d0'
+down_revision: Union[str, None] = 'd3f85a1c6e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_session_id_mapping_member_date', 'session_id_mapping', ['member_uid', 'workout_date'], unique=False)
+    op.create_index('ix_session_id_mapping_trainer_date', 'session_id_mapping', ['trainer_uid', 'workout_date'], unique=False)
+    op.create_index('ix_quests_member_status', 'quests', ['member_uid', 'status'], unique=False)
+    op.create_index('ix_quests_trainer_member', 'quests', ['trainer_uid', 'member_uid'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quests_trainer_member', table_name='quests')
+    op.drop_index('ix_quests_member_status', table_name='quests')
+    op.drop_index('ix_session_id_mapping_trainer_date', table_name='session_id_mapping')
+    op.drop_index('ix_session_id_mapping_member_date', table_name='session_id_mapping')
@@ -0,0 +1,36 @@
+"""trainer member mapping replica
+
+Revision ID: b71e2c94d3a5
+Revises: 4043bde7d0ac
+Create Date: 2026-10-16 10:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71e2c94d3a5'
+down_revision: Union[str, None] = '4043bde7d0ac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('trainer_member_mapping_replica',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('trainer_uid', sa.String(), nullable=False),
+    sa.Column('member_uid', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('remaining_sessions', sa.Integer(), nullable=True),
+    sa.Column('source_ts', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tmm_replica_trainer_member_status', 'trainer_member_mapping_replica', ['trainer_uid', 'member_uid', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tmm_replica_trainer_member_status', table_name='trainer_member_mapping_replica')
+    op.drop_table('trainer_member_mapping_replica')
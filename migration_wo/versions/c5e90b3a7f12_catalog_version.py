@@ -0,0 +1,52 @@
+"""catalog version
+
+Revision ID: c5e90b3a7f12
+Revises: a8c41f7e92d0
+Create Date: 2026-10-16 15:20:44.631905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e90b3a7f12'
+down_revision: Union[str, None] = 'a8c41f7e92d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CATALOG_TABLES = ['workouts', 'workout_parts', 'workout_key_name_map', 'session_type_map']
+
+
+def upgrade() -> None:
+    op.create_table('catalog_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO catalog_version (id, version) VALUES (1, 1)")
+    # 카탈로그 테이블이 바뀌면 (어떤 경로로든) 버전을 올려 각 워커의 메모리 카탈로그가 재적재되도록
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE catalog_version SET version = version + 1, updated_at = now() WHERE id = 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in CATALOG_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_catalog_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version()
+        """)
+
+
+def downgrade() -> None:
+    for table in CATALOG_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_catalog_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_catalog_version()")
+    op.drop_table('catalog_version')
@@ -0,0 +1,28 @@
+"""updated_at stamps
+
+Revision ID: f2b6d08e4c91
+Revises: c5e90b3a7f12
+Create Date: 2026-10-16 17:05:12.384106
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6d08e4c91'
+down_revision: Union[str, None] = 'c5e90b3a7f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('session_id_mapping', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.add_column('quests', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('quests', 'updated_at')
+    op.drop_column('session_id_mapping', 'updated_at')
@@ -2,16 +2,19 @@ import pytest
 import pytest_asyncio
 import os
 import logging
+from contextlib import contextmanager
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, StaticPool
 from sqlalchemy.sql import text
 from backend.user_service.database import Base as MemberBase, get_db as get_member_db
 from backend.user_service.main import app as member_app
 from backend.workout_service.database import Base as WorkoutBase, get_db as get_workout_db
 from backend.workout_service.main import app as workout_app
 from backend.user_service import models, utils
+from backend.workout_service import utils as workout_utils, database as workout_database, models as workout_models
 from unittest.mock import patch
 
 # Set up logging
@@ -53,11 +56,63 @@ async def db_session(engine):
         yield session
         await session.rollback()
 
+async def clear_workout_data(engine):
+    async with engine.begin() as conn:
+        for table in reversed(workout_models.Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+
+@pytest_asyncio.fixture
+async def workout_engine():
+    # 테스트마다 새 엔진 (in-memory SQLite는 연결 하나를 공유해야 테이블이 유지된다)
+    engine = create_async_engine(DB_URL, poolclass=StaticPool if DB_URL.startswith("sqlite") else NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(workout_models.Base.metadata.create_all)
+    await clear_workout_data(engine)
+    yield engine
+    await clear_workout_data(engine)
+    await engine.dispose()
+
+@pytest_asyncio.fixture
+async def workout_db(workout_engine, monkeypatch):
+    """Session factory on the test database, also swapped in for code that opens its own sessions (outbox, replica, catalog)."""
+    async_session = sessionmaker(workout_engine, class_=AsyncSession, expire_on_commit=False)
+    for name, value in (("engine", workout_engine), ("read_engine", workout_engine),
+                        ("AsyncSession", async_session), ("ReadAsyncSession", async_session)):
+        monkeypatch.setattr(workout_database, name, value)
+    yield async_session
+
+class StatementCapture(list):
+    """SQL statements an engine ran while captured; ``parameters`` holds their bound parameters in the same order."""
+
+    def __init__(self):
+        super().__init__()
+        self.parameters = []
+
+@pytest.fixture
+def capture_statements():
+    """``with capture_statements(engine, "INSERT") as statements:`` records what ``engine`` runs in the block (all statements without prefixes)."""
+    @contextmanager
+    def capture(engine, *prefixes):
+        statements = StatementCapture()
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if not prefixes or statement.lstrip().upper().startswith(prefixes):
+                statements.append(statement)
+                statements.parameters.append(parameters)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return capture
+
 @pytest_asyncio.fixture
 async def user_client(db_session):
     async def override_get_db():
         yield db_session
     member_app.dependency_overrides[get_member_db] = override_get_db
+    member_app.dependency_overrides[utils.get_read_db] = override_get_db
     async with AsyncClient(transport=ASGITransport(app=member_app), base_url="http://test") as client:
         yield client
     member_app.dependency_overrides.clear()
@@ -67,6 +122,7 @@ async def workout_client(db_session):
     async def override_get_db():
         yield db_session
     workout_app.dependency_overrides[get_workout_db] = override_get_db
+    workout_app.dependency_overrides[workout_utils.get_read_db] = override_get_db
     async with AsyncClient(transport=ASGITransport(app=workout_app), base_url="http://test") as client:
         yield client
     workout_app.dependency_overrides.clear()
@@ -0,0 +1,30 @@
+from backend.common.database import create_engine_from_env, pool_status
+from backend.common.sql import clock_timestamp
+from sqlalchemy.dialects import postgresql, sqlite
+
+def test_engine_factory_reads_service_and_shared_settings(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "7")
+    monkeypatch.setenv("WORKOUT_DB_MAX_OVERFLOW", "3")
+    monkeypatch.setenv("DB_STATEMENT_CACHE_SIZE", "0")
+    monkeypatch.setenv("DB_ECHO", "true")
+    monkeypatch.setenv("APP_ENV", "production")
+
+    engine = create_engine_from_env("postgresql+asyncpg://user:pw@localhost/workout", "WORKOUT_DB_")
+    pool = engine.sync_engine.pool
+    assert pool.size() == 7
+    assert pool._max_overflow == 3
+    assert engine.echo is False
+    assert engine.url.query["prepared_statement_cache_size"] == "0"
+
+    status = pool_status(engine)
+    assert status["checked_out"] == 0
+    assert status["checkouts"] == 0
+
+def test_engine_factory_keeps_default_pool_for_sqlite():
+    engine = create_engine_from_env("sqlite+aiosqlite:///:memory:")
+    assert "size" not in pool_status(engine)
+
+def test_clock_timestamp_uses_statement_time_on_postgresql():
+    # now()는 트랜잭션 시작 시각이라 늦게 커밋된 변경이 버전 스탬프를 올리지 못할 수 있다
+    assert str(clock_timestamp().compile(dialect=postgresql.dialect())) == "clock_timestamp()"
+    assert str(clock_timestamp().compile(dialect=sqlite.dialect())) == "CURRENT_TIMESTAMP"
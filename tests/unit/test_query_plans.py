@@ -0,0 +1,148 @@
+"""Query-plan regression checks for the hot crud query shapes.
+
+Each case runs a crud function against a seeded PostgreSQL database, captures
+the SQL it issues and EXPLAINs it; a sequential scan on one of the large
+tables fails the test. Set ``TEST_EXPLAIN_DATABASE_URL`` to a scratch
+database (``postgresql+asyncpg://...``) to run them - the schema is created
+and seeded on first use.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from backend.user_service import crud as user_crud, models as user_models
+from backend.workout_service import crud as workout_crud, models as workout_models
+
+EXPLAIN_DB_URL = os.getenv("TEST_EXPLAIN_DATABASE_URL", "")
+
+pytestmark = pytest.mark.skipif(
+    not EXPLAIN_DB_URL.startswith("postgresql"),
+    reason="TEST_EXPLAIN_DATABASE_URL (PostgreSQL) is not set",
+)
+
+# 시퀀셜 스캔이 허용되지 않는 테이블 (작은 참조 테이블은 제외)
+LARGE_TABLES = {
+    "session_id_mapping", "session", "quests", "quest_workouts", "quest_workout_sets",
+    "members", "trainers", "trainer_member_mapping", "personal_records",
+}
+
+SEED_SQL = [
+    "INSERT INTO session_type_map (session_type_id, session_type) VALUES (1, 'ai'), (2, 'quest'), (3, 'custom')",
+    "INSERT INTO workout_parts (workout_part_id, workout_part_name) SELECT i, 'part' || i FROM generate_series(1, 10) i",
+    "INSERT INTO workouts (workout_id, workout_name) SELECT i, 'workout' || i FROM generate_series(1, 100) i",
+    "INSERT INTO workout_key_name_map (workout_key_id, workout_id, workout_part_id) SELECT i, i, 1 + i % 10 FROM generate_series(1, 100) i",
+    """INSERT INTO quests (quest_id, trainer_uid, member_uid, status, workout_date)
+       SELECT i, 't' || (i % 1000), 'm' || (i % 20000),
+              (ARRAY['NOT_STARTED', 'COMPLETED', 'DEADLINE_PASSED'])[1 + i % 3]::queststatus,
+              now() - i * interval '1 hour'
+       FROM generate_series(1, 40000) i""",
+    """INSERT INTO quest_workouts (quest_id, workout_key)
+       SELECT q, 1 + (q + k * 50) % 100 FROM generate_series(1, 40000) q, generate_series(0, 1) k""",
+    """INSERT INTO quest_workout_sets (quest_id, workout_key, set_number, weight, reps, rest_time)
+       SELECT q, 1 + (q + k * 50) % 100, s, 40, 10, 60
+       FROM generate_series(1, 40000) q, generate_series(0, 1) k, generate_series(1, 3) s""",
+    """INSERT INTO session_id_mapping (session_id, session_type_id, workout_date, member_uid, trainer_uid, is_pt)
+       SELECT i, 1 + i % 3, now() - i * interval '10 minutes', 'm' || (i % 20000),
+              CASE WHEN i % 4 = 0 THEN 't' || (i % 1000) END, i % 4 = 0
+       FROM generate_series(1, 100000) i""",
+    """INSERT INTO session (session_id, workout_key, set_num, weight, reps, rest_time)
+       SELECT i, 1 + i % 100, s, 40, 10, 60 FROM generate_series(1, 100000) i, generate_series(1, 3) s""",
+    """INSERT INTO personal_records (member_uid, workout_key, best_weight, best_weight_reps, best_weight_session_id,
+                                     best_e1rm, best_e1rm_session_id, best_volume, best_volume_session_id)
+       SELECT 'm' || m, k, 40, 10, m, 53.3, m, 1200, m FROM generate_series(0, 19999) m, generate_series(1, 100, 20) k""",
+    "INSERT INTO trainers (uid, email, role) SELECT 't' || i, 't' || i || '@example.com', 'trainer' FROM generate_series(0, 999) i",
+    "INSERT INTO members (uid, email, role) SELECT 'm' || i, 'm' || i || '@example.com', 'member' FROM generate_series(0, 19999) i",
+    """INSERT INTO trainer_member_mapping (trainer_uid, member_uid, status, requester_uid, remaining_sessions)
+       SELECT 't' || (i % 1000), 'm' || i,
+              (CASE i % 10 WHEN 0 THEN 'pending' WHEN 1 THEN 'expired' ELSE 'accepted' END)::mappingstatus,
+              'm' || i, 10
+       FROM generate_series(0, 19999) i""",
+]
+
+@pytest.fixture
+async def explain_db():
+    engine = create_async_engine(EXPLAIN_DB_URL, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(user_models.Base.metadata.create_all)
+        await conn.run_sync(workout_models.Base.metadata.create_all)
+        seeded = await conn.scalar(text("SELECT count(*) FROM session_id_mapping"))
+        if not seeded:
+            for statement in SEED_SQL:
+                await conn.execute(text(statement))
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE"))
+
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        yield engine, session
+    await engine.dispose()
+
+def _seq_scans(plan: dict) -> list:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in LARGE_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+async def _assert_index_only_plans(explain_db, capture_statements, call):
+    engine, session = explain_db
+    with capture_statements(engine, "SELECT", "UPDATE", "DELETE") as captured:
+        await call(session)
+
+    assert captured, "crud call issued no queries"
+    async with engine.connect() as conn:
+        for statement, parameters in zip(captured, captured.parameters):
+            if isinstance(parameters, list):
+                parameters = tuple(parameters)
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()[0]["Plan"]
+            assert not _seq_scans(plan), f"sequential scan on {_seq_scans(plan)} for:\n{statement}"
+
+WORKOUT_CASES = {
+    "session_history_for_member": lambda db: workout_crud.get_session_history(db, member_uid="m42"),
+    "session_history_for_trainer": lambda db: workout_crud.get_session_history(db, trainer_uid="t8"),
+    "trainer_feed": lambda db: workout_crud.get_session_history(
+        db, member_uids=[f"m{i}" for i in range(8, 20000, 1000)], per_member_limit=5
+    ),
+    "quests_by_trainer": lambda db: workout_crud.get_quests_by_trainer(db, "t7"),
+    "quests_by_member": lambda db: workout_crud.get_quests_by_member(db, "m42"),
+    "quests_by_trainer_and_member": lambda db: workout_crud.get_quests_by_trainer_and_member(db, "t42", "m42"),
+    "quest_by_id": lambda db: workout_crud.get_quest_by_id(db, 42),
+    "update_quests_status": lambda db: workout_crud.update_quests_status(db, "m42"),
+    "workout_records": lambda db: workout_crud.get_workout_records(db, "m42", 93),
+    "session_counts": lambda db: workout_crud.get_session_counts(
+        db, "m42", datetime.now(timezone.utc) - timedelta(days=30), datetime.now(timezone.utc)
+    ),
+    "last_session_update": lambda db: workout_crud.get_last_session_update(db, "m42"),
+    "session_history_stamp": lambda db: workout_crud.get_session_history_stamp(db, member_uid="m42"),
+    "quests_stamp": lambda db: workout_crud.get_quests_stamp(db, trainer_uid="t7"),
+    "personal_records": lambda db: workout_crud.get_personal_records(db, "m42"),
+}
+
+USER_CASES = {
+    "member_mappings_for_trainer": lambda db: user_crud.get_member_mappings(db, "t7", True),
+    "member_mappings_for_member": lambda db: user_crud.get_member_mappings(db, "m42", False),
+    "mappings_stamp": lambda db: user_crud.get_mappings_stamp(db, "t7", True),
+    "trainer_member_mapping": lambda db: user_crud.get_trainer_member_mapping(db, "t42", "m42"),
+    "remaining_sessions": lambda db: user_crud.get_remaining_sessions(db, "t42", "m42"),
+    "accepted_mapping_pairs": lambda db: user_crud.get_accepted_mapping_pairs(db, [("t42", "m42"), ("t43", "m43")]),
+    "trainer_assigned_members": lambda db: user_crud.get_trainer_assigned_members(db, "t7"),
+    "connected_member_info": lambda db: user_crud.get_specific_connected_member_info(db, "t42", "m42@example.com"),
+}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("case", sorted(WORKOUT_CASES))
+async def test_workout_queries_avoid_seq_scans(explain_db, capture_statements, case):
+    await _assert_index_only_plans(explain_db, capture_statements, WORKOUT_CASES[case])
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("case", sorted(USER_CASES))
+async def test_user_queries_avoid_seq_scans(explain_db, capture_statements, case):
+    await _assert_index_only_plans(explain_db, capture_statements, USER_CASES[case])
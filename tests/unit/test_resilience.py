@@ -0,0 +1,98 @@
+import asyncio
+import time
+import pytest
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.common.http_client import ServiceHTTPClient
+from backend.common.resilience import (
+    DEADLINE_HEADER, CircuitOpenError, DeadlineExceededError,
+    install_deadline_middleware, remaining_budget, set_deadline,
+)
+
+def _client_with(handler, **kwargs) -> ServiceHTTPClient:
+    client = ServiceHTTPClient(**kwargs)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens_and_recovers():
+    status = {"code": 500}
+    client = _client_with(lambda request: httpx.Response(status["code"]),
+                          breaker_min_requests=4, breaker_open_seconds=0.05)
+
+    for _ in range(4):
+        await client.get("http://user/api/x", endpoint="x")
+    with pytest.raises(CircuitOpenError) as refused:
+        await client.get("http://user/api/x", endpoint="x")
+    assert client.metrics()["breakers"]["x"]["state"] == "open"
+    # 프로브가 허용될 때까지 남은 시간 (1초 단위로 올림)
+    assert refused.value.status_code == 503 and refused.value.headers == {"Retry-After": "1"}
+
+    # open_seconds가 지나면 프로브 1건으로 닫힌다
+    await asyncio.sleep(0.06)
+    status["code"] = 200
+    assert (await client.get("http://user/api/x", endpoint="x")).status_code == 200
+    assert client.metrics()["breakers"]["x"]["state"] == "closed"
+
+@pytest.mark.asyncio
+async def test_hedged_get_returns_faster_copy():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return httpx.Response(200, json={"call": len(calls)})
+
+    client = _client_with(handler, hedge_default_delay=0.02, hedge_min_delay=0.01)
+    response = await client.get("http://user/api/check", endpoint="check", hedge=True)
+    assert response.json() == {"call": 2}
+    assert client.metrics()["hedges"] == {"requests": 1, "sent": 1, "won": 1}
+
+@pytest.mark.asyncio
+async def test_deadline_is_forwarded_and_enforced():
+    seen = []
+    client = _client_with(lambda request: seen.append(request.headers[DEADLINE_HEADER]) or httpx.Response(200))
+
+    set_deadline(0.5)
+    await client.get("http://user/api/x")
+    assert 0 < int(seen[0]) <= 500
+
+    set_deadline(-1)
+    with pytest.raises(DeadlineExceededError):
+        await client.get("http://user/api/x")
+    assert client.metrics()["deadline_rejections"] == 1
+
+def test_deadline_middleware_sets_budget():
+    app = FastAPI()
+    install_deadline_middleware(app)
+
+    @app.get("/budget")
+    async def budget():
+        return {"remaining": remaining_budget()}
+
+    with TestClient(app) as test_client:
+        assert test_client.get("/budget").json() == {"remaining": None}
+        assert 0 < test_client.get("/budget", headers={DEADLINE_HEADER: "2000"}).json()["remaining"] <= 2
+        assert test_client.get("/budget", headers={DEADLINE_HEADER: "0"}).status_code == 504
+
+def test_deadline_middleware_cancels_handlers_that_outlive_the_budget():
+    app = FastAPI()
+    install_deadline_middleware(app)
+    finished = []
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(1)
+        finished.append(True)
+        return {"ok": True}
+
+    with TestClient(app) as test_client:
+        started = time.monotonic()
+        response = test_client.get("/slow", headers={DEADLINE_HEADER: "50"})
+        assert response.status_code == 504 and response.json() == {"detail": "Deadline exceeded"}
+        # 핸들러가 끝날 때까지 기다리지 않고 바로 응답하고, 핸들러는 취소된다
+        assert time.monotonic() - started < 0.5
+        assert finished == []
+        assert test_client.get("/slow", headers={DEADLINE_HEADER: "5000"}).json() == {"ok": True}
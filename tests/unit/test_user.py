@@ -264,3 +264,67 @@ class TestMemberRouter:
         assert response.status_code == 200
         assert "message" in response.json()
         assert "Successfully removed the trainer-member mapping" in response.json()["message"]
+
+class TestPrincipalCache:
+    @pytest.mark.asyncio
+    async def test_get_current_user_caches_principal(self, monkeypatch):
+        from backend.user_service.cache import principal_cache
+        principal_cache.invalidate("cached_member")
+        db_member = models.Member(uid="cached_member", email="cached@example.com", first_name="Cached", last_name="Member", age=30)
+        mock_get_member = AsyncMock(return_value=db_member)
+        monkeypatch.setattr(utils, "verify_token", AsyncMock(return_value={"uid": "cached_member", "role": "member"}))
+        monkeypatch.setattr(crud, "get_member_by_uid", mock_get_member)
+
+        first, _ = await utils.get_current_user("token", db=None)
+        second, user_type = await utils.get_current_user("token", db=None)
+        assert mock_get_member.await_count == 1
+        assert user_type == "member"
+        assert second is not first
+        assert (second.uid, second.email, second.age) == ("cached_member", "cached@example.com", 30)
+
+        principal_cache.invalidate("cached_member")
+        await utils.get_current_user("token", db=None)
+        assert mock_get_member.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_update_trainer_writes_the_session_row_not_the_cached_principal(self, monkeypatch):
+        cached = models.Trainer(uid="cached_trainer", first_name="Old")
+        db_trainer = models.Trainer(uid="cached_trainer", first_name="Old")
+        monkeypatch.setattr(crud, "get_trainer_by_uid", AsyncMock(return_value=db_trainer))
+        db = AsyncMock()
+
+        updated = await crud.update_trainer(db, cached, {"first_name": "New"})
+        assert updated is db_trainer and db_trainer.first_name == "New"
+        assert cached.first_name == "Old"
+        db.refresh.assert_awaited_once_with(db_trainer)
+
+class TestTokenCache:
+    @pytest.mark.asyncio
+    async def test_concurrent_verifications_are_coalesced(self):
+        import asyncio
+        from backend.user_service.cache import TokenCache
+        cache = TokenCache(maxsize=64, ttl=300, shards=4)
+        calls = []
+
+        async def verify(token):
+            calls.append(token)
+            await asyncio.sleep(0.01)
+            return {"uid": "member1", "role": "member", "exp": 9999999999}
+
+        results = await asyncio.gather(*(cache.get_or_verify("token-a", verify) for _ in range(5)))
+        assert all(result["uid"] == "member1" for result in results)
+        assert calls == ["token-a"]
+        await cache.get_or_verify("token-a", verify)
+        assert cache.stats()["hits"] == 1
+        assert "token-a" not in str(cache._shards)
+
+    @pytest.mark.asyncio
+    async def test_entries_expire_with_token(self):
+        import time
+        from backend.user_service.cache import TokenCache
+        cache = TokenCache(maxsize=64, ttl=300, shards=4)
+        verify = AsyncMock(return_value={"uid": "member1", "exp": time.time() - 1})
+
+        await cache.get_or_verify("expired-token", verify)
+        await cache.get_or_verify("expired-token", verify)
+        assert verify.await_count == 2
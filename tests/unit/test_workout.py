@@ -1,9 +1,37 @@
+import asyncio
+import json
+import os
+import random
+import string
+import time
+import jwt
+import msgpack
 import pytest
 from unittest.mock import patch, AsyncMock, MagicMock, ANY
-from datetime import date, datetime
-from backend.workout_service import crud, utils, schemas
-from fastapi import HTTPException
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict
+from backend.workout_service import crud, database, export, loaders, mapping_replica, models, outbox, search, utils, schemas
+from backend.workout_service.cache import (
+    SessionDetailCache, TaggedReadCache, mapping_cache, read_cache, read_cache_config, recent_writes, user_name_cache,
+)
+from backend.workout_service.catalog import CatalogEntry, WorkoutCatalog
+from backend.workout_service.main import app
+from backend.workout_service.search import WorkoutSearchIndex
+from backend.common.etag import conditional
+from fastapi import HTTPException, Request, Response
+from backend.common.resilience import CircuitOpenError, DeadlineExceededError
 from types import SimpleNamespace
+from aiocache import caches
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
     
 @pytest.mark.asyncio
 async def test_create_session_no_auth(workout_client):
@@ -682,4 +710,715 @@ async def test_get_workout_name_not_found(workout_client, mock_auth):
 async def test_get_workouts_by_part_with_filter(workout_client, mock_auth):
     with patch("backend.workout_service.crud.get_workouts_by_part", return_value={}):
         response = await workout_client.get("/api/workouts-by-part?workout_part_id=1", headers={"Authorization": "Bearer mock_token"})
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+def _make_signing_cert():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken")])
+    cert = x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(
+        key.public_key()
+    ).serial_number(1).not_valid_before(datetime.utcnow()).not_valid_after(
+        datetime.utcnow() + timedelta(days=1)
+    ).sign(key, hashes.SHA256())
+    return key, cert
+
+@pytest.mark.asyncio
+async def test_token_verifier_caches_keys_and_claims():
+    key, cert = _make_signing_cert()
+    verifier = utils.FirebaseTokenVerifier("test-project")
+    now = int(time.time())
+    token = jwt.encode(
+        {"sub": "member1", "role": "member", "aud": "test-project",
+         "iss": "https://securetoken.google.com/test-project", "iat": now, "exp": now + 3600},
+        key, algorithm="RS256", headers={"kid": "kid1"}
+    )
+
+    async def fake_refresh(force=False):
+        fake_refresh.calls += 1
+        verifier._public_keys = {"kid1": cert.public_key()}
+        verifier._keys_expire_at = time.time() + 3600
+    fake_refresh.calls = 0
+
+    with patch.object(verifier, "_refresh_public_keys", side_effect=fake_refresh):
+        claims = await verifier.verify(token)
+        with patch("jwt.decode") as mock_decode:
+            cached_claims = await verifier.verify(token)
+            mock_decode.assert_not_called()
+
+    assert claims["uid"] == "member1"
+    assert cached_claims is claims
+    assert fake_refresh.calls == 1
+
+@pytest.mark.asyncio
+async def test_token_verifier_rejects_wrong_audience():
+    key, cert = _make_signing_cert()
+    verifier = utils.FirebaseTokenVerifier("test-project")
+    verifier._public_keys = {"kid1": cert.public_key()}
+    verifier._keys_expire_at = time.time() + 3600
+    now = int(time.time())
+    token = jwt.encode(
+        {"sub": "member1", "aud": "other-project",
+         "iss": "https://securetoken.google.com/other-project", "iat": now, "exp": now + 3600},
+        key, algorithm="RS256", headers={"kid": "kid1"}
+    )
+
+    with pytest.raises(jwt.InvalidTokenError):
+        await verifier.verify(token)
+
+@pytest.mark.asyncio
+async def test_token_verifier_rate_limits_forced_key_refreshes():
+    verifier = utils.FirebaseTokenVerifier("test-project", forced_refresh_interval=60)
+    verifier._public_keys = {"kid1": object()}
+    verifier._keys_expire_at = time.time() + 3600
+    response = MagicMock(headers={}, json=lambda: {}, raise_for_status=lambda: None)
+    client = MagicMock(get=AsyncMock(return_value=response))
+    client.__aenter__ = AsyncMock(return_value=client)
+    client.__aexit__ = AsyncMock(return_value=False)
+
+    with patch("backend.workout_service.utils.httpx.AsyncClient", return_value=client), \
+         patch("backend.workout_service.utils.x509.load_pem_x509_certificate"):
+        # 모르는 kid가 계속 와도 간격 안에서는 인증서를 한 번만 가져온다
+        for kid in ("unknown1", "unknown2", "unknown3"):
+            assert await verifier._get_public_key(kid) is None
+    assert client.get.await_count == 1
+    # max-age가 없으면 기본 유효 시간을 쓴다
+    assert verifier._keys_expire_at >= time.time() + utils.FIREBASE_CERTS_DEFAULT_MAX_AGE - 5
+
+@pytest.mark.asyncio
+async def test_check_trainer_member_mapping_uses_cache():
+    mapping_cache.invalidate(trainer_uid="trainer1")
+    response = MagicMock(status_code=200, text="", json=lambda: {"exists": True})
+    with patch.object(utils.http_client, "get", AsyncMock(return_value=response)) as mock_get:
+        assert await crud.check_trainer_member_mapping("trainer1", "member1", "token") is True
+        assert await crud.check_trainer_member_mapping("trainer1", "member1", "token") is True
+        assert mock_get.await_count == 1
+
+        mapping_cache.invalidate(member_uid="member1")
+        response.json = lambda: {"exists": False}
+        assert await crud.check_trainer_member_mapping("trainer1", "member1", "token") is False
+        assert await crud.check_trainer_member_mapping("trainer1", "member1", "token") is False
+        assert mock_get.await_count == 2
+
+@pytest.mark.asyncio
+async def test_check_trainer_member_mappings_batches_misses():
+    mapping_cache.invalidate(trainer_uid="trainer-batch")
+    pairs = [("trainer-batch", f"member{i}") for i in range(crud.MAPPING_CHECK_BATCH_SIZE + 1)]
+
+    async def respond(url, json, **kwargs):
+        results = [{**pair, "exists": pair["member_uid"] == "member0"} for pair in json["pairs"]]
+        return MagicMock(json=lambda: {"results": results})
+
+    with patch.object(mapping_replica, "accepted_pairs", AsyncMock(return_value=None)), \
+            patch.object(utils.http_client, "post", AsyncMock(side_effect=respond)) as mock_post:
+        results = await crud.check_trainer_member_mappings(pairs, "token")
+    assert [len(call.kwargs["json"]["pairs"]) for call in mock_post.await_args_list] == [crud.MAPPING_CHECK_BATCH_SIZE, 1]
+    assert len(results) == len(pairs)
+    assert [pair for pair, exists in results.items() if exists] == [("trainer-batch", "member0")]
+    mapping_cache.invalidate(trainer_uid="trainer-batch")
+
+@pytest.mark.asyncio
+async def test_refused_mapping_checks_answer_503_or_504(workout_client):
+    mapping_cache.invalidate(trainer_uid="trainer-refused")
+    with patch.object(mapping_replica, "is_accepted", AsyncMock(return_value=None)), \
+            patch.object(utils.http_client, "get", AsyncMock(side_effect=CircuitOpenError("check_trainer_member_mapping", 7))):
+        with pytest.raises(CircuitOpenError) as refused:
+            await crud.check_trainer_member_mapping("trainer-refused", "member1", "token")
+    assert refused.value.status_code == 503 and refused.value.headers == {"Retry-After": "7"}
+
+    app.dependency_overrides[utils.get_current_user] = lambda: {"uid": "trainer-refused", "role": "trainer"}
+    url = "/api/session_counts/member1?start_date=2024-07-01T00:00:00&end_date=2024-07-31T00:00:00"
+    headers = {"Authorization": "Bearer token"}
+    with patch.object(crud, "check_trainer_member_mapping", AsyncMock(side_effect=CircuitOpenError("check_trainer_member_mapping", 7))):
+        response = await workout_client.get(url, headers=headers)
+    assert (response.status_code, response.headers["retry-after"]) == (503, "7")
+    with patch.object(crud, "check_trainer_member_mapping", AsyncMock(side_effect=DeadlineExceededError("check_trainer_member_mapping"))):
+        response = await workout_client.get(url, headers=headers)
+    assert response.status_code == 504
+    with patch.object(crud, "get_assigned_member_uids", AsyncMock(side_effect=CircuitOpenError("trainer_assigned_members", 3))):
+        response = await workout_client.get("/api/trainer/assigned-members-sessions", headers=headers)
+    assert (response.status_code, response.headers["retry-after"]) == (503, "3")
+
+@pytest.mark.asyncio
+async def test_user_name_loader_batches_lookups():
+    user_name_cache.clear()
+    with patch("backend.workout_service.loaders.fetch_user_names", AsyncMock(return_value={"t1": "John Doe", "m1": "Jane Roe"})) as mock_fetch:
+        loader = loaders.UserNameLoader("token")
+        names = await asyncio.gather(loader.load("t1"), loader.load("m1"), loader.load("t1"), loader.load("missing"))
+        assert names == ["John Doe", "Jane Roe", "John Doe", None]
+        mock_fetch.assert_awaited_once_with(["t1", "m1", "missing"], "token")
+
+        # 두 번째 요청은 이름 캐시에서 바로 응답
+        assert await loaders.UserNameLoader("token").load("t1") == "John Doe"
+        assert mock_fetch.await_count == 1
+
+@pytest.mark.asyncio
+async def test_mapping_replica_applies_events_and_resyncs(workout_db):
+    snapshot = [
+        {"id": 1, "trainer_uid": "trainer1", "member_uid": "member1", "status": "accepted", "remaining_sessions": 5},
+        {"id": 2, "trainer_uid": "trainer1", "member_uid": "member2", "status": "pending", "remaining_sessions": 3},
+    ]
+    async with workout_db() as db:
+        with patch("backend.workout_service.mapping_replica.fetch_snapshot", AsyncMock(return_value=(100.0, snapshot))):
+            await mapping_replica.resync(db)
+    assert await mapping_replica.is_accepted("trainer1", "member1") is True
+    assert await mapping_replica.get_assigned_member_uids("trainer1") == ["member1"]
+
+    mapping_cache.set("trainer1", "member2", False)
+    events = [
+        schemas.MappingReplicaEvent(op="upsert", id=2, trainer_uid="trainer1", member_uid="member2", status="accepted", remaining_sessions=3, source_ts=101.0),
+        # 늦게 도착한 오래된 이벤트는 무시된다
+        schemas.MappingReplicaEvent(op="upsert", id=2, trainer_uid="trainer1", member_uid="member2", status="pending", remaining_sessions=3, source_ts=99.0),
+        schemas.MappingReplicaEvent(op="delete", id=1, trainer_uid="trainer1", member_uid="member1", source_ts=102.0),
+    ]
+    async with workout_db() as db:
+        assert await mapping_replica.apply_events(db, events) == 3
+    assert mapping_cache.get("trainer1", "member2") is None
+    assert await mapping_replica.accepted_pairs([("trainer1", "member1"), ("trainer1", "member2")]) == {("trainer1", "member2")}
+
+    with patch.object(utils.http_client, "get", AsyncMock()) as mock_get:
+        assert await crud.check_trainer_member_mapping("trainer1", "member2", "token") is True
+        mock_get.assert_not_awaited()
+    mapping_replica.state.synced_at = None
+
+@pytest.mark.asyncio
+async def test_mapping_replica_resync_keeps_newer_deletes(workout_db):
+    snapshot = [
+        {"id": 1, "trainer_uid": "trainer1", "member_uid": "member1", "status": "accepted", "remaining_sessions": 5},
+        {"id": 2, "trainer_uid": "trainer1", "member_uid": "member2", "status": "accepted", "remaining_sessions": 5},
+    ]
+    async with workout_db() as db:
+        with patch("backend.workout_service.mapping_replica.fetch_snapshot", AsyncMock(return_value=(100.0, snapshot))):
+            await mapping_replica.resync(db)
+        await mapping_replica.apply_events(db, [
+            schemas.MappingReplicaEvent(op="delete", id=1, trainer_uid="trainer1", member_uid="member1", source_ts=105.0),
+            # 로컬에 없던 매핑의 삭제도 tombstone으로 남는다
+            schemas.MappingReplicaEvent(op="delete", id=3, trainer_uid="trainer1", member_uid="member3", source_ts=105.0),
+            schemas.MappingReplicaEvent(op="delete", member_uid="member2", source_ts=105.0),
+        ])
+
+        # 삭제 이전에 만들어진 스냅샷이 늦게 도착해도 삭제된 매핑은 되살아나지 않는다
+        stale_snapshot = snapshot + [{"id": 3, "trainer_uid": "trainer1", "member_uid": "member3", "status": "accepted", "remaining_sessions": 1}]
+        with patch("backend.workout_service.mapping_replica.fetch_snapshot", AsyncMock(return_value=(103.0, stale_snapshot))):
+            await mapping_replica.resync(db)
+        pairs = [("trainer1", "member1"), ("trainer1", "member2"), ("trainer1", "member3")]
+        assert await mapping_replica.accepted_pairs(pairs) == set()
+        assert await mapping_replica.get_assigned_member_uids("trainer1") == []
+
+        # 삭제 이후의 스냅샷은 그대로 반영되고, 더 이상 필요 없는 tombstone은 정리된다
+        with patch("backend.workout_service.mapping_replica.fetch_snapshot", AsyncMock(return_value=(110.0, snapshot[1:]))):
+            await mapping_replica.resync(db)
+        assert await mapping_replica.accepted_pairs(pairs) == {("trainer1", "member2")}
+        remaining = await db.execute(select(models.TrainerMemberMapReplica.id).order_by(models.TrainerMemberMapReplica.id))
+        assert remaining.scalars().all() == [2]
+    mapping_replica.state.synced_at = None
+
+@pytest.mark.asyncio
+async def test_outbox_enqueue_is_idempotent_and_dispatches_in_batches(workout_db):
+    payload = {"trainer_uid": "trainer1", "member_uid": "member1", "sessions_to_add": -1}
+    async with workout_db() as db:
+        for session_id in (1, 1, 2):
+            await outbox.enqueue(db, outbox.pt_decrement_key(session_id), outbox.PT_SESSION_DECREMENT, payload)
+        await db.commit()
+
+    dispatcher = outbox.OutboxDispatcher(batch_size=10)
+    failing = AsyncMock(side_effect=Exception("user service down"))
+    with patch.object(utils.http_client, "post", failing):
+        assert await dispatcher.dispatch_once() == 2
+    # 실패한 이벤트는 backoff가 지나기 전까지 다시 가져가지 않는다
+    assert await dispatcher.dispatch_once() == 0
+
+    async with workout_db() as db:
+        await db.execute(models.OutboxEvent.__table__.update().values(next_attempt_at=outbox._utcnow()))
+        await db.commit()
+    response = MagicMock(json=lambda: {"results": [
+        {"idempotency_key": "session:1:pt-decrement", "status": "applied"},
+        {"idempotency_key": "session:2:pt-decrement", "status": "duplicate"},
+    ]})
+    with patch.object(utils.http_client, "post", AsyncMock(return_value=response)) as mock_post:
+        assert await dispatcher.dispatch_once() == 2
+        sent = mock_post.call_args.kwargs["json"]["events"]
+        assert [event["idempotency_key"] for event in sent] == ["session:1:pt-decrement", "session:2:pt-decrement"]
+
+    async with workout_db() as db:
+        events = (await db.execute(select(models.OutboxEvent))).scalars().all()
+        assert all(event.delivered_at is not None for event in events)
+        assert [event.attempts for event in events] == [1, 1]
+
+@pytest.mark.asyncio
+async def test_get_read_db_pins_recent_writers_to_primary(workout_db):
+    replica = MagicMock(side_effect=workout_db)
+
+    async def open_read_session(uid):
+        session_gen = utils.get_read_db({"uid": uid})
+        await session_gen.__anext__()
+        await session_gen.aclose()
+
+    with patch.object(database, "ReadAsyncSession", replica):
+        await open_read_session("reader1")
+        assert replica.call_count == 1
+
+        recent_writes.mark("reader1")
+        await open_read_session("reader1")
+        assert replica.call_count == 1
+
+@pytest.mark.asyncio
+async def test_sync_session_sets_only_writes_the_diff(workout_db):
+    def session_save(sets):
+        exercises = defaultdict(list)
+        for workout_key, set_num, weight in sets:
+            exercises[workout_key].append({"set_num": set_num, "weight": weight, "reps": 10, "rest_time": 60})
+        return schemas.SessionSave(session_id=77, exercises=[
+            {"workout_key": workout_key, "sets": sets} for workout_key, sets in exercises.items()
+        ])
+
+    async with workout_db() as db:
+        assert await crud._sync_session_sets(db, session_save([(1, 1, 40.0), (1, 2, 40.0), (2, 1, 20.0)])) == (3, 0)
+        await db.commit()
+        # 그대로인 세트는 건드리지 않고, 바뀐 세트/새 세트만 upsert, 빠진 세트만 삭제
+        assert await crud._sync_session_sets(db, session_save([(1, 1, 40.0), (1, 2, 45.0), (3, 1, 10.0)])) == (2, 1)
+        await db.commit()
+
+        rows = (await db.execute(
+            select(models.Session.workout_key, models.Session.set_num, models.Session.weight)
+            .where(models.Session.session_id == 77)
+            .order_by(models.Session.workout_key, models.Session.set_num)
+        )).all()
+        assert [tuple(row) for row in rows] == [(1, 1, 40.0), (1, 2, 45.0), (3, 1, 10.0)]
+        assert await crud._sync_session_sets(db, session_save([(1, 1, 40.0), (1, 2, 45.0), (3, 1, 10.0)])) == (0, 0)
+
+@pytest.mark.asyncio
+async def test_create_quest_inserts_in_constant_round_trips(workout_db, workout_engine, capture_statements):
+    quest_data = schemas.QuestCreate(member_uid="member1", workouts=[
+        {"workout_key": workout_key, "sets": [
+            {"set_number": set_number, "weight": 50.0, "reps": 10, "rest_time": 60} for set_number in (1, 2, 3)
+        ]} for workout_key in range(1, 11)
+    ])
+    with capture_statements(workout_engine, "INSERT") as statements:
+        async with workout_db() as db:
+            quest = await crud.create_quest(db, quest_data, "trainer1")
+
+    assert len(statements) == 3
+    assert quest.status == schemas.QuestStatus.NOT_STARTED
+    assert [workout.workout_key for workout in quest.workouts] == list(range(1, 11))
+    assert all(len(workout.sets) == 3 and workout.sets[0].quest_id == quest.quest_id for workout in quest.workouts)
+    async with workout_db() as db:
+        stored_sets = await db.execute(
+            select(func.count()).select_from(models.QuestWorkoutSet).where(models.QuestWorkoutSet.quest_id == quest.quest_id)
+        )
+        assert stored_sets.scalar() == 30
+
+@pytest.mark.asyncio
+async def test_session_counts_are_grouped_in_sql(workout_db):
+    day = datetime(2024, 7, 10, 9, tzinfo=timezone.utc)
+    async with workout_db() as db:
+        db.add_all([
+            models.SessionIDMap(session_id=900 + i, session_type_id=type_id, is_pt=is_pt, member_uid="counts_member", workout_date=day)
+            for i, (type_id, is_pt) in enumerate([(1, False), (1, False), (2, False), (3, False), (3, True), (2, True)])
+        ])
+        await db.commit()
+
+        counts = await crud.get_session_counts(db, "counts_member", datetime(2024, 7, 1, tzinfo=timezone.utc), datetime(2024, 8, 1, tzinfo=timezone.utc))
+    assert counts == {"ai_sessions": 2, "custom_sessions": 1, "quest_sessions": 1, "pt_sessions": 1}
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL", "").startswith("postgresql"),
+                    reason="date_trunc/timezone buckets need TEST_DATABASE_URL to point at PostgreSQL")
+async def test_session_count_buckets_start_at_local_midnight(workout_db):
+    async with workout_db() as db:
+        # 서울 기준 7/10 23시와 7/11 1시 (UTC로는 같은 날)
+        db.add_all([models.SessionTypeMap(session_type_id=1, session_type="AI"), models.SessionTypeMap(session_type_id=3, session_type="Custom")])
+        await db.flush()
+        db.add_all([
+            models.SessionIDMap(session_id=950, session_type_id=1, is_pt=False, member_uid="bucket_member", workout_date=datetime(2024, 7, 10, 14, tzinfo=timezone.utc)),
+            models.SessionIDMap(session_id=951, session_type_id=3, is_pt=True, member_uid="bucket_member", workout_date=datetime(2024, 7, 10, 16, tzinfo=timezone.utc)),
+        ])
+        await db.commit()
+        start, end = datetime(2024, 7, 1, tzinfo=timezone.utc), datetime(2024, 8, 1, tzinfo=timezone.utc)
+        days = await crud.get_session_count_buckets(db, "bucket_member", start, end, "day", "Asia/Seoul")
+        weeks = await crud.get_session_count_buckets(db, "bucket_member", start, end, "week", "Asia/Seoul")
+    assert [bucket.bucket_start for bucket in days] == [datetime(2024, 7, 9, 15, tzinfo=timezone.utc), datetime(2024, 7, 10, 15, tzinfo=timezone.utc)]
+    assert (days[0].ai_sessions, days[1].pt_sessions) == (1, 1)
+    assert [bucket.bucket_start for bucket in weeks] == [datetime(2024, 7, 7, 15, tzinfo=timezone.utc)]
+
+    async def read_db():
+        async with workout_db() as db:
+            yield db
+    app.dependency_overrides[utils.get_current_user] = lambda: {"uid": "bucket_member", "role": "member"}
+    app.dependency_overrides[utils.get_read_db] = read_db
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/session_counts/bucket_member/buckets", params={
+                "start_date": start.isoformat(), "end_date": end.isoformat(), "interval": "day", "tz": "Asia/Seoul",
+            })
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert [datetime.fromisoformat(bucket["bucket_start"]) for bucket in response.json()] == [bucket.bucket_start for bucket in days]
+
+@pytest.mark.asyncio
+async def test_session_history_pages_by_keyset_in_two_queries(workout_db, workout_engine, capture_statements):
+    async with workout_db() as db:
+        # 같은 workout_date가 겹쳐도 session_id로 순서가 정해진다
+        db.add_all([
+            models.SessionIDMap(session_id=session_id, session_type_id=1, is_pt=False, member_uid="history_member",
+                                workout_date=datetime(2024, 7, 10 + session_id % 3))
+            for session_id in range(500, 505)
+        ] + [models.Session(session_id=500, workout_key=1, set_num=1, weight=30.0, reps=12, rest_time=60)])
+        await db.commit()
+
+        with capture_statements(workout_engine) as statements:
+            first_page, cursor = await crud.get_session_history(db, member_uid="history_member", limit=3)
+        assert len(statements) == 2
+
+        second_page, last_cursor = await crud.get_session_history(db, member_uid="history_member", cursor=cursor, limit=3)
+    assert [session.session_id for session in first_page] == [503, 500, 502]
+    assert [session.session_id for session in second_page] == [504, 501]
+    assert last_cursor is None
+    assert first_page[1].sets[0].weight == 30.0 and second_page[0].sets == []
+
+    with pytest.raises(ValueError):
+        crud.decode_session_cursor("not-a-cursor")
+
+@pytest.mark.asyncio
+async def test_trainer_feed_merges_members_with_per_member_limit(workout_db):
+    async with workout_db() as db:
+        db.add_all([
+            models.SessionIDMap(session_id=600 + i, session_type_id=3, is_pt=True, member_uid=member_uid,
+                                trainer_uid="feed_trainer", workout_date=datetime(2024, 8, 1 + i))
+            for i, member_uid in enumerate(["feed_a", "feed_b", "feed_a", "feed_a", "feed_b", "feed_c"])
+        ])
+        await db.commit()
+
+        feed, cursor = await crud.get_session_history(db, member_uids=["feed_a", "feed_b"], limit=2, per_member_limit=2)
+        rest, last_cursor = await crud.get_session_history(db, member_uids=["feed_a", "feed_b"], cursor=cursor, limit=2, per_member_limit=2)
+    # feed_a의 가장 오래된 세션(600)은 회원당 2개 제한으로 빠지고, feed_c는 담당 회원이 아니다
+    assert [session.session_id for session in feed] == [604, 603]
+    assert [session.session_id for session in rest] == [602, 601]
+    assert last_cursor is None
+
+@pytest.mark.asyncio
+async def test_stream_session_history_exports_ndjson_and_csv(workout_db):
+    async with workout_db() as db:
+        db.add_all([
+            models.SessionIDMap(session_id=700, session_type_id=1, is_pt=False, member_uid="export_member", workout_date=datetime(2024, 9, 1)),
+            models.SessionIDMap(session_id=701, session_type_id=1, is_pt=False, member_uid="export_member", workout_date=datetime(2024, 9, 2)),
+            models.Session(session_id=700, workout_key=2, set_num=1, weight=20.0, reps=10, rest_time=60),
+            models.Session(session_id=700, workout_key=1, set_num=1, weight=10.0, reps=10, rest_time=60),
+        ])
+        await db.commit()
+
+        lines = [line async for line in export.ndjson_lines(crud.stream_session_history(db, member_uid="export_member", batch_size=1))]
+        rows = [line async for line in export.csv_lines(crud.stream_session_history(db, member_uid="export_member"))]
+
+    sessions = [json.loads(line) for line in lines]
+    assert [session["session_id"] for session in sessions] == [701, 700]
+    assert sessions[0]["sets"] == []
+    assert [set["workout_key"] for set in sessions[1]["sets"]] == [1, 2]
+
+    csv_text = "".join(rows).splitlines()
+    assert csv_text[0] == ",".join(export.CSV_COLUMNS)
+    assert len(csv_text) == 4
+    assert csv_text[1].startswith("701,") and csv_text[1].endswith(",,,,,")
+
+@pytest.mark.asyncio
+async def test_workout_catalog_serves_lookups_and_reloads_on_version_change(workout_db, workout_engine, capture_statements):
+    async with workout_db() as db:
+        db.add_all([
+            models.CatalogVersion(id=1, version=1),
+            models.WorkoutParts(workout_part_id=1, workout_part_name="Chest"),
+            models.WorkoutParts(workout_part_id=2, workout_part_name="Legs"),
+            models.Workouts(workout_id=1, workout_name="Bench Press", low_met=3.5, sec_per_rep=2.0),
+            models.Workouts(workout_id=2, workout_name="Back Squat"),
+            models.WorkoutKeyNameMap(workout_key_id=11, workout_id=1, workout_part_id=1),
+            models.WorkoutKeyNameMap(workout_key_id=12, workout_id=2, workout_part_id=2),
+            models.SessionTypeMap(session_type_id=1, session_type="AI"),
+        ])
+        await db.commit()
+
+        catalog = WorkoutCatalog()
+        await catalog.ensure_loaded(db)
+        with capture_statements(workout_engine) as statements:
+            assert catalog.workout_name(11) == "Bench Press"
+            assert catalog.entry(11).low_met == 3.5
+            assert catalog.session_type(1) == "AI"
+            assert [workout["workout_key"] for workout in catalog.search("back sq")] == [12]
+            assert catalog.workouts_by_part(2) == {"Legs": [{"workout_key": 12, "workout_name": "Back Squat", "workout_part": "Legs"}]}
+        assert statements == []
+
+        assert await catalog.refresh_if_changed(db) is False
+        await db.execute(models.Workouts.__table__.update().where(models.Workouts.workout_id == 1).values(workout_name="Flat Bench Press"))
+        await db.execute(models.CatalogVersion.__table__.update().values(version=2))
+        await db.commit()
+        assert await catalog.refresh_if_changed(db) is True
+        assert catalog.workout_name(11) == "Flat Bench Press"
+
+def test_workout_search_index_ranks_prefix_matches_and_tolerates_typos():
+    names = {1: ("Bench Press", 1), 2: ("Incline Bench Press", 1), 3: ("Back Squat", 2), 4: ("Bulgarian Split Squat", 2), 5: ("Leg Press", 2)}
+    index = WorkoutSearchIndex([
+        CatalogEntry(key, key, name, part_id, f"part{part_id}", None, None, None, None)
+        for key, (name, part_id) in names.items()
+    ])
+
+    def keys(term, **kwargs):
+        return [entry.workout_key for entry in index.search(term, **kwargs)]
+
+    assert keys("bench press") == [1, 2, 5]  # 정확/접두 일치가 먼저, 부분적으로 비슷한 이름은 뒤에
+    assert keys("be") == [1, 2]
+    assert keys("squat")[:2] == [3, 4]
+    assert keys("sqaut") == [3, 4]  # 철자 오타
+    assert keys("press", workout_part_id=2) == [5]
+    assert keys("press", limit=2) == keys("press")[:2]
+    assert keys("zzz") == []
+
+def test_workout_search_prefilters_typo_candidates_without_losing_matches():
+    rng = random.Random(7)
+    words = {"".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 11))) for _ in range(3000)}
+    words |= {"squat", "bench", "press", "deadlift", "bulgarian"}
+    index = search.WorkoutSearchIndex([CatalogEntry(key, key, word, 1, "part1", None, None, None, None) for key, word in enumerate(sorted(words))])
+
+    calls = []
+    edit_distance = search.edit_distance
+    def counting_edit_distance(a, b):
+        calls.append((a, b))
+        return edit_distance(a, b)
+
+    for token in ["sqaut", "bnech", "dealdift", "bulgarain", "presss", "sq", "xqzv"]:
+        expected = {key for word, keys in index._words.items() if search._token_matches(token, word) for key in keys}
+        calls.clear()
+        with patch.object(search, "edit_distance", counting_edit_distance):
+            assert index._keys_matching(token, True) == expected
+        # 사전 전체가 아니라 bigram을 충분히 공유하는 후보만 편집 거리를 계산한다
+        assert len(calls) < len(words) // 10
+
+@pytest.mark.asyncio
+async def test_session_history_etag_follows_the_version_stamp(workout_db):
+    async with workout_db() as db:
+        db.add_all([
+            models.SessionIDMap(session_id=session_id, session_type_id=1, is_pt=False, member_uid="etag_member",
+                                workout_date=datetime(2024, 8, 1), updated_at=datetime(2024, 8, 1, 0, session_id % 60))
+            for session_id in (800, 801)
+        ])
+        await db.commit()
+        stamp = await crud.get_session_history_stamp(db, member_uid="etag_member")
+
+        first = Response()
+        assert conditional(Request({"type": "http", "headers": []}), first, "sessions", *stamp) is None
+        etag = first.headers["ETag"]
+        revalidate = Request({"type": "http", "headers": [(b"if-none-match", f'W/{etag}'.encode())]})
+        not_modified = conditional(revalidate, Response(), "sessions", *stamp)
+        assert not_modified.status_code == 304 and not_modified.headers["ETag"] == etag
+
+        # 세트 변경(updated_at 갱신)과 삭제(건수 변경) 모두 스탬프를 바꾼다
+        session = await db.get(models.SessionIDMap, 801)
+        session.updated_at = datetime(2024, 8, 2)
+        await db.commit()
+        touched = await crud.get_session_history_stamp(db, member_uid="etag_member")
+        await db.delete(await db.get(models.SessionIDMap, 800))
+        await db.commit()
+        deleted = await crud.get_session_history_stamp(db, member_uid="etag_member")
+    assert stamp[0] == 2 and touched != stamp and deleted[0] == 1
+    assert conditional(revalidate, Response(), "sessions", *touched) is None
+
+@pytest.mark.asyncio
+async def test_session_detail_cache_is_bounded_and_dropped_on_save(workout_db):
+    cache = SessionDetailCache(maxsize=2, ttl=60)
+    await cache.set(1, 3, "detail_member", b'{"session_id": 1}', await cache.generation(1))
+    assert cache.get(1, 3, await cache.generation(1)) == ("detail_member", b'{"session_id": 1}')
+    # 카탈로그가 다시 적재되면 (이름이 바뀌었을 수 있으므로) 미스
+    assert cache.get(1, 4, await cache.generation(1)) is None
+    await cache.set(2, 3, "detail_member", b"{}", await cache.generation(2))
+    await cache.set(3, 3, "detail_member", b"{}", await cache.generation(3))
+    assert cache.stats()["entries"] == 2
+
+    async with workout_db() as db:
+        db.add(models.SessionIDMap(session_id=1200, session_type_id=1, is_pt=False, member_uid="detail_member"))
+        await db.commit()
+
+    await cache.set(1200, 3, "detail_member", b"{}", await cache.generation(1200))
+    # 저장 전에 시작된 조회 (커밋 이전 내용을 읽는 중)
+    generation = await cache.generation(1200)
+    save = schemas.SessionSave(session_id=1200, exercises=[
+        {"workout_key": 1, "sets": [{"set_num": 1, "weight": 50.0, "reps": 8, "rest_time": 90}]}
+    ])
+    with patch.object(crud, "session_detail_cache", cache):
+        async with workout_db() as db:
+            await crud.save_session(db, save, {"uid": "detail_member", "role": "member"}, "Bearer token")
+    assert cache.get(1200, 3, await cache.generation(1200)) is None
+    # 저장 이후에 끝난 그 조회는 이전 내용을 다시 캐시하지 못한다
+    assert await cache.set(1200, 3, "detail_member", b'{"stale": true}', generation) is False
+    assert cache.get(1200, 3, await cache.generation(1200)) is None and cache.stats()["stale_sets"] == 1
+    assert await cache.set(1200, 3, "detail_member", b"{}", await cache.generation(1200)) is True
+
+@pytest.mark.asyncio
+async def test_session_detail_cache_save_retires_other_workers_copies(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    monkeypatch.setenv("READ_CACHE_BACKEND", "redis")
+    # 같은 Redis에 세대를 두는 두 워커
+    server = fakeredis.FakeServer()
+    workers = []
+    for alias in ("detail_worker1", "detail_worker2"):
+        caches.add(alias, read_cache_config())
+        caches.get(alias).client = fakeredis.aioredis.FakeRedis(server=server)
+        workers.append(SessionDetailCache(ttl=600, alias=alias))
+    saving, other = workers
+
+    assert await other.set(1210, 3, "detail_member", b'{"sets": 1}', await other.generation(1210))
+    assert other.get(1210, 3, await other.generation(1210)) == ("detail_member", b'{"sets": 1}')
+    # 한 워커에서 저장하면 다른 워커의 복사본도 다음 조회에서 버려진다
+    await saving.invalidate(1210)
+    assert other.get(1210, 3, await other.generation(1210)) is None
+    assert await other.set(1210, 3, "detail_member", b'{"sets": 2}', await other.generation(1210))
+    assert other.get(1210, 3, await saving.generation(1210)) == ("detail_member", b'{"sets": 2}')
+    assert saving.stats()["errors"] == other.stats()["errors"] == 0
+
+@pytest.mark.asyncio
+async def test_read_cache_serves_msgpack_until_the_member_tag_is_bumped(workout_db, workout_engine, capture_statements):
+    quest_data = schemas.QuestCreate(member_uid="cached_member", workouts=[
+        {"workout_key": 1, "sets": [{"set_number": 1, "weight": 60.0, "reps": 5, "rest_time": 120}]}
+    ])
+    async with workout_db() as db:
+        quest = await crud.create_quest(db, quest_data, "cached_trainer")
+        first = await crud.get_quests_by_member(db, "cached_member")
+        with capture_statements(workout_engine) as statements:
+            second = await crud.get_quests_by_member(db, "cached_member")
+        assert statements == []
+        assert second == first and second[0].workouts[0].sets[0].weight == 60.0
+
+        # 값은 msgpack 바이트로 저장된다
+        version = await read_cache.cache.increment("tag:cached_member", 0)
+        stored = await read_cache.cache.get(f"get_quests_by_member:cached_member:{version}:", loads_fn=lambda value: value)
+        assert msgpack.loads(stored)[0]["quest_id"] == quest.quest_id
+
+        # 쓰기 경로가 회원 태그를 올리면 이전 항목은 모두 무시된다
+        assert await crud.delete_quest(db, quest.quest_id)
+        assert await crud.get_quests_by_member(db, "cached_member") == []
+
+@pytest.mark.asyncio
+async def test_read_cache_on_redis_is_shared_and_follows_tag_bumps(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    monkeypatch.setenv("READ_CACHE_BACKEND", "redis")
+    # 같은 Redis를 쓰는 두 워커
+    server = fakeredis.FakeServer()
+    workers = []
+    for alias in ("redis_worker1", "redis_worker2"):
+        caches.add(alias, read_cache_config())
+        caches.get(alias).client = fakeredis.aioredis.FakeRedis(server=server)
+        workers.append(TaggedReadCache(alias=alias, ttl=60))
+
+    calls = []
+    def counted(cache):
+        @cache.cached(Dict[str, int])
+        async def session_totals(db, member_uid, month):
+            calls.append((member_uid, month))
+            return {"sessions": len(calls)}
+        return session_totals
+
+    first, second = (counted(cache) for cache in workers)
+    assert await first(None, "redis_member", 7) == {"sessions": 1}
+    assert await second(None, "redis_member", 7) == {"sessions": 1}  # 다른 워커가 채운 항목 적중
+    assert await second(None, "redis_member", 8) == {"sessions": 2}  # 다른 인자는 미스
+    assert (workers[0].stats(), workers[1].stats()) == ({"hits": 0, "misses": 1, "errors": 0, "replica_reads": 0}, {"hits": 1, "misses": 1, "errors": 0, "replica_reads": 0})
+
+    # 한 워커의 태그 증가가 Redis를 통해 모든 워커의 이전 항목을 무효화한다
+    await workers[0].invalidate("redis_member")
+    assert await workers[1].cache.get("tag:redis_member", loads_fn=int) == 1
+    assert await second(None, "redis_member", 7) == {"sessions": 3}
+    assert await first(None, "redis_member", 7) == {"sessions": 3}
+    assert await first(None, "other_member", 7) == {"sessions": 4}
+    assert workers[0].stats()["errors"] == workers[1].stats()["errors"] == 0
+
+@pytest.mark.asyncio
+async def test_personal_records_follow_saves_and_corrections(workout_db):
+    async with workout_db() as db:
+        db.add_all([
+            models.SessionIDMap(session_id=1300, session_type_id=3, is_pt=False, member_uid="pr_member", workout_date=datetime(2024, 10, 1)),
+            models.SessionIDMap(session_id=1301, session_type_id=3, is_pt=False, member_uid="pr_member", workout_date=datetime(2024, 10, 8)),
+        ])
+        await db.commit()
+
+    async def save(session_id, exercises):
+        sets = lambda pairs: [{"set_num": i, "weight": weight, "reps": reps, "rest_time": 60} for i, (weight, reps) in enumerate(pairs, 1)]
+        session_save = schemas.SessionSave(session_id=session_id, exercises=[
+            {"workout_key": workout_key, "sets": sets(pairs)} for workout_key, pairs in exercises.items()
+        ])
+        async with workout_db() as db:
+            await crud.save_session(db, session_save, {"uid": "pr_member", "role": "member"}, "Bearer token")
+        async with workout_db() as db:
+            return {record.workout_key: record for record in await crud.get_personal_records(db, "pr_member")}
+
+    records = await save(1300, {1: [(100.0, 5), (100.0, 3)], 2: [(50.0, 10)]})
+    assert (records[1].best_weight, records[1].best_weight_reps, records[1].best_volume) == (100.0, 5, 800.0)
+    assert records[2].best_weight_session_id == 1300
+
+    # 더 가벼운 중량의 고반복: 중량 기록은 유지, 추정 1RM/볼륨은 새 세션
+    records = await save(1301, {1: [(90.0, 10)]})
+    assert (records[1].best_weight, records[1].best_weight_session_id) == (100.0, 1300)
+    assert (records[1].best_e1rm, records[1].best_e1rm_session_id) == (120.0, 1301)
+    assert (records[1].best_volume, records[1].best_volume_session_id) == (900.0, 1301)
+
+    # 기록을 세운 세션을 낮춰 다시 저장하면 이력에서 다시 계산, 세트가 사라진 운동의 기록은 삭제
+    records = await save(1301, {1: [(90.0, 5)]})
+    assert records[1].best_e1rm_session_id == 1300 and records[1].best_e1rm == pytest.approx(100 * (1 + 5 / 30))
+    assert (records[1].best_volume, records[1].best_volume_session_id) == (800.0, 1300)
+    records = await save(1300, {1: [(100.0, 5), (100.0, 3)]})
+    assert 2 not in records
+
+@pytest.mark.asyncio
+async def test_personal_records_upsert_never_lowers_a_record(workout_db, monkeypatch):
+    async with workout_db() as db:
+        db.add_all([
+            models.SessionIDMap(session_id=1310, session_type_id=3, is_pt=False, member_uid="pr_race", workout_date=datetime(2024, 10, 1)),
+            models.SessionIDMap(session_id=1311, session_type_id=3, is_pt=False, member_uid="pr_race", workout_date=datetime(2024, 10, 2)),
+        ])
+        await db.commit()
+
+    async def save(session_id, pairs):
+        session_save = schemas.SessionSave(session_id=session_id, exercises=[{"workout_key": 1, "sets": [
+            {"set_num": i, "weight": weight, "reps": reps, "rest_time": 60} for i, (weight, reps) in enumerate(pairs, 1)
+        ]}])
+        async with workout_db() as db:
+            await crud.save_session(db, session_save, {"uid": "pr_race", "role": "member"}, "Bearer token")
+        async with workout_db() as db:
+            return {record.workout_key: record for record in await crud.get_personal_records(db, "pr_race")}
+
+    # 0회 세트는 기록이 아니다
+    records = await save(1310, [(200.0, 0), (100.0, 5)])
+    assert (records[1].best_weight, records[1].best_weight_reps, records[1].best_volume) == (100.0, 5, 500.0)
+
+    # 동시에 들어온 첫 기록처럼 기존 행을 못 본 채 병합해도, 더 낮은 값은 저장된 기록을 덮지 않는다
+    merge_bests = crud._merge_bests
+    monkeypatch.setattr(crud, "_merge_bests", lambda record, bests, session_id: merge_bests(None, bests, session_id))
+    records = await save(1311, [(90.0, 4), (60.0, 1)])
+    assert (records[1].best_weight, records[1].best_weight_reps, records[1].best_weight_session_id) == (100.0, 5, 1310)
+    assert (records[1].best_volume, records[1].best_volume_session_id) == (500.0, 1310)
+    assert (records[1].best_e1rm, records[1].best_e1rm_session_id) == (pytest.approx(100 * (1 + 5 / 30)), 1310)
+
+@pytest.mark.asyncio
+async def test_read_cache_is_not_filled_from_a_lagging_replica(workout_db, workout_engine, monkeypatch):
+    # 아직 퀘스트가 복제되지 않은 복제본
+    replica_engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    monkeypatch.setattr(database, "read_engine", replica_engine)
+    replica = sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    quest_data = schemas.QuestCreate(member_uid="lagging_member", workouts=[
+        {"workout_key": 1, "sets": [{"set_number": 1, "weight": 40.0, "reps": 8, "rest_time": 90}]}
+    ])
+    try:
+        replica_reads = read_cache.stats()["replica_reads"]
+        # 다른 워커의 쓰기가 태그를 올린 뒤, 이 워커는 지연된 복제본에서 읽는다
+        async with workout_db() as db:
+            quest = await crud.create_quest(db, quest_data, "lagging_trainer")
+        async with replica() as db:
+            assert await crud.get_quests_by_member(db, "lagging_member") == []
+
+        # 복제본의 빈 결과는 캐시되지 않았으므로 primary 조회가 새 퀘스트를 채운다
+        async with workout_db() as db:
+            assert [q.quest_id for q in await crud.get_quests_by_member(db, "lagging_member")] == [quest.quest_id]
+        assert read_cache.stats()["replica_reads"] == replica_reads + 1
+        # 이후 복제본 조회는 primary가 채운 항목에 적중한다
+        async with replica() as db:
+            assert [q.quest_id for q in await crud.get_quests_by_member(db, "lagging_member")] == [quest.quest_id]
+        assert read_cache.stats()["replica_reads"] == replica_reads + 1
+    finally:
+        await replica_engine.dispose()